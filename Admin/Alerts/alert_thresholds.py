@@ -0,0 +1,46 @@
+import cx_Oracle
+from Database import pool
+
+# Low-stock levels used by RaiseStockAlerts: a product's own threshold wins over its
+# category's, and products with neither alert at 50. None clears a threshold.
+
+def set_product_threshold(product_name, threshold):
+    try:
+        with pool.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE Products SET low_stock_threshold = :1 WHERE name = :2", [threshold, product_name])
+            if cursor.rowcount == 0:
+                return {"error": "Product not found."}
+            conn.commit()
+            return {"success": f"Alert threshold for {product_name} set to {threshold}."}
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        return {"error": f"❌ Oracle Error: {error.message}"}
+
+
+def set_category_threshold(category, threshold):
+    try:
+        with pool.get_connection() as conn:
+            cursor = conn.cursor()
+            if threshold is None:
+                cursor.execute("DELETE FROM Category_Stock_Thresholds WHERE category = :1", [category])
+            else:
+                cursor.execute("""
+                    MERGE INTO Category_Stock_Thresholds t
+                    USING (SELECT :category AS category, :threshold AS threshold FROM dual) n
+                    ON (t.category = n.category)
+                    WHEN MATCHED THEN UPDATE SET t.threshold = n.threshold
+                    WHEN NOT MATCHED THEN INSERT (category, threshold) VALUES (n.category, n.threshold)
+                """, category=category, threshold=threshold)
+            conn.commit()
+            return {"success": f"Alert threshold for {category} set to {threshold}."}
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        return {"error": f"❌ Oracle Error: {error.message}"}
+
+
+def fetch_category_thresholds():
+    with pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT category, threshold FROM Category_Stock_Thresholds ORDER BY category")
+        return dict(cursor.fetchall())
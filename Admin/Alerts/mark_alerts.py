@@ -1,19 +1,20 @@
-import cx_Oracle
-import os
-from dotenv import load_dotenv
-load_dotenv()
+from Database import pool
 
-dsn = cx_Oracle.makedsn("localhost", 1521, service_name="orcl")
-username = os.getenv("db_username")
-password = os.getenv("db_password")
+def mark_alert_as_processed(product_id, alert_date):
+    return mark_alerts_as_processed([(product_id, alert_date)])
 
-conn = cx_Oracle.connect(user=username, password=password, dsn=dsn)
 
-def mark_alert_as_processed(product_id, alert_date):
-    cursor = conn.cursor()
-    cursor.execute("""
-        UPDATE Inventory_Alerts
-        SET is_processed = 1
-        WHERE product_id = :1 AND alert_date = :2
-    """, (product_id, alert_date))
-    conn.commit()
\ No newline at end of file
+def mark_alerts_as_processed(keys):
+    # keys: [(product_id, alert_date)]. One array-bound UPDATE and one commit for all of them;
+    # returns how many pending alerts were marked.
+    if not keys:
+        return 0
+    with pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany("""
+            UPDATE Inventory_Alerts
+            SET is_processed = 1
+            WHERE product_id = :1 AND alert_date = :2 AND is_processed = 0
+        """, list(keys))
+        conn.commit()
+        return cursor.rowcount
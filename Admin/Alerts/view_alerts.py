@@ -1,23 +1,65 @@
 import cx_Oracle
-import os
-from dotenv import load_dotenv
-import pandas as pd
-load_dotenv()
+from Database import pool
+from Database.fetch import FETCH_ARRAYSIZE, fetch_dataframe, tune_cursor
 
-dsn = cx_Oracle.makedsn("localhost", 1521, service_name="orcl")
-username = os.getenv("db_username")
-password = os.getenv("db_password")
-
-conn = cx_Oracle.connect(user=username, password=password, dsn=dsn)
+ALERT_DTYPES = {
+    "PRODUCT_ID": "int32",
+    "PRODUCT_NAME": "category",
+    "ALERT_DATE": "datetime64[ns]",
+    "ALERT_TYPE": "category",
+    "IS_PROCESSED": "int8",
+}
 
 def fetch_inventory_alerts():
-    cursor = conn.cursor()
-    out_cursor = cursor.var(cx_Oracle.CURSOR)
-    
-    cursor.callfunc("GetInventoryAlerts", out_cursor)
-    results = out_cursor.getvalue()
-    
-    columns = [col[0] for col in results.description]
-    rows = results.fetchall()
-    df = pd.DataFrame(rows, columns=columns)
-    return df
\ No newline at end of file
+    with pool.get_connection() as conn:
+        cursor = conn.cursor()
+        results = cursor.callfunc("GetInventoryAlerts", cx_Oracle.CURSOR)
+        results.arraysize = FETCH_ARRAYSIZE
+        
+        df = fetch_dataframe(results, dtypes=ALERT_DTYPES)
+        return df
+
+
+PAGE_SIZE = 50
+
+
+def fetch_alerts_page(processed=False, after=None, page_size=PAGE_SIZE):
+    # Keyset pagination over idx_alerts_pending, newest first: `after` is the (alert_date, product_id)
+    # of the last row of the previous page, so every page is one short index range scan.
+    # Returns {"rows": DataFrame, "next_after": key or None, "pending": number of pending alerts}.
+    bind_vars = {'processed': int(processed), 'page_size': page_size + 1}
+    keyset = ""
+    if after is not None:
+        keyset = "AND (ia.alert_date < :after_date OR (ia.alert_date = :after_date AND ia.product_id < :after_id))"
+        bind_vars['after_date'], bind_vars['after_id'] = after
+
+    query = f"""
+        SELECT ia.product_id, p.name AS product_name, ia.alert_date, ia.alert_type, ia.message, ia.is_processed
+        FROM Inventory_Alerts ia
+        JOIN Products p ON ia.product_id = p.product_id
+        WHERE ia.is_processed = :processed
+        {keyset}
+        ORDER BY ia.alert_date DESC, ia.product_id DESC
+        FETCH FIRST :page_size ROWS ONLY
+    """
+
+    try:
+        with pool.get_connection() as conn:
+            cursor = tune_cursor(conn.cursor(), arraysize=page_size + 1)
+            cursor.execute(query, bind_vars)
+            df = fetch_dataframe(cursor, dtypes=ALERT_DTYPES)
+            cursor.execute("SELECT COUNT(*) FROM Inventory_Alerts WHERE is_processed = 0")
+            pending = cursor.fetchone()[0]
+
+            has_more = len(df) > page_size
+            df = df.iloc[:page_size]
+            last = df.iloc[-1] if has_more else None
+            return {
+                "rows": df,
+                "next_after": (last["ALERT_DATE"].to_pydatetime(), int(last["PRODUCT_ID"])) if has_more else None,
+                "pending": pending,
+            }
+
+    except cx_Oracle.DatabaseError as e:
+        return {"error": str(e)}
+
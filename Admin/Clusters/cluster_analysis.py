@@ -1,40 +1,27 @@
 import cx_Oracle
-import os
-from dotenv import load_dotenv
+from collections import namedtuple
+from Database import pool
+from Database.fetch import fetch_refcursor
+from Database.output import MAX_BUFFER_SIZE, call_with_output
 
-load_dotenv()
+ClusterStats = namedtuple("ClusterStats", ["cluster_id", "avg_quantity", "avg_price", "avg_sales", "avg_popularity_score"])
 
-dsn = cx_Oracle.makedsn("localhost", 1521, service_name="orcl")
-username = os.getenv("db_username")
-password = os.getenv("db_password")
 
 def filter_clusters(min_quantity=None, min_price=None, min_sales=None, min_popularity=None, num_clusters=None):
     output_lines = []
     try:
-        connection = cx_Oracle.connect(
-            user=username,
-            password=password,
-            dsn=dsn,
-        )
+        connection = pool.get_connection()
         cursor = connection.cursor()
-        cursor.callproc("DBMS_OUTPUT.ENABLE")
 
-        cursor.callproc("FilterClustersByStats", [
+        # Six lines (about 250 bytes) per cluster; without num_clusters, every cluster can match
+        buffer_size = min(2000 + 500 * num_clusters, MAX_BUFFER_SIZE) if num_clusters else MAX_BUFFER_SIZE
+        output_lines.extend(call_with_output(cursor, "FilterClustersByStats", [
             min_quantity,
             min_price,
             min_sales,
             min_popularity,
             num_clusters  
-        ])
-
-        status_var = cursor.var(cx_Oracle.NUMBER)
-        line_var = cursor.var(cx_Oracle.STRING)
-
-        while True:
-            cursor.callproc("DBMS_OUTPUT.GET_LINE", (line_var, status_var))
-            if status_var.getvalue() != 0:
-                break
-            output_lines.append(line_var.getvalue())
+        ], buffer_size=buffer_size))
 
     except cx_Oracle.DatabaseError as e:
         error, = e.args
@@ -45,3 +32,20 @@ def filter_clusters(min_quantity=None, min_price=None, min_sales=None, min_popul
             connection.close()
 
     return output_lines
+
+
+def get_filtered_clusters(min_quantity=None, min_price=None, min_sales=None, min_popularity=None, num_clusters=None):
+    try:
+        with pool.get_connection() as connection:
+            cursor = connection.cursor()
+            return fetch_refcursor(cursor, "GetClustersByStats", [
+                min_quantity,
+                min_price,
+                min_sales,
+                min_popularity,
+                num_clusters
+            ], ClusterStats)
+
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        return {"error": f"❌ Database Error: {error.message}"}
@@ -1,18 +1,41 @@
 import cx_Oracle
-import os
-from dotenv import load_dotenv
+import pandas as pd
+from Database import pool
 
-load_dotenv()
+BATCH_SIZE = 10000
+
+REJECTED_SQL = """
+    SELECT r.product_id, r.new_cluster_id,
+           CASE WHEN p.product_id IS NULL THEN 'Product not found.' ELSE 'Cluster not found.' END
+    FROM Cluster_Reassignments r
+    LEFT JOIN Products p ON p.product_id = r.product_id
+    LEFT JOIN Clusters c ON c.cluster_id = r.new_cluster_id
+    WHERE p.product_id IS NULL OR c.cluster_id IS NULL
+    ORDER BY r.product_id
+"""
+
+DELETE_REJECTED_SQL = """
+    DELETE FROM Cluster_Reassignments r
+    WHERE NOT EXISTS (SELECT 1 FROM Products p WHERE p.product_id = r.product_id)
+       OR NOT EXISTS (SELECT 1 FROM Clusters c WHERE c.cluster_id = r.new_cluster_id)
+"""
+
+# One statement for the whole set: the compound triggers on Products net the
+# changes per cluster and per (cluster, category) and write each row once
+APPLY_SQL = """
+    MERGE INTO Products p
+    USING Cluster_Reassignments r
+    ON (p.product_id = r.product_id)
+    WHEN MATCHED THEN
+        UPDATE SET p.cluster_id = r.new_cluster_id
+        WHERE DECODE(p.cluster_id, r.new_cluster_id, 0, 1) = 1
+"""
 
-# Oracle DB setup
-dsn = cx_Oracle.makedsn("localhost", 1521, service_name="orcl")
-username = os.getenv("db_username")
-password = os.getenv("db_password")
 
 def reassign_product_cluster(product_id, new_cluster_id):
 
     try:
-        connection = cx_Oracle.connect(user=username, password=password, dsn=dsn)
+        connection = pool.get_connection()
         cursor = connection.cursor()
 
         cursor.callproc("ReassignProductCluster", [product_id, new_cluster_id])
@@ -25,3 +48,69 @@ def reassign_product_cluster(product_id, new_cluster_id):
     finally:
         if 'connection' in locals():
             connection.close()
+
+
+def read_reassignment_csv(file):
+    # Accepts a path or an uploaded file with product_id and new_cluster_id columns.
+    # Returns (pairs, failures); rows that are not two integers become failures.
+    df = pd.read_csv(file, dtype=str)
+    df.columns = [c.strip().lower() for c in df.columns]
+    missing = {"product_id", "new_cluster_id"} - set(df.columns)
+    if missing:
+        raise ValueError(f"CSV is missing column(s): {', '.join(sorted(missing))}")
+
+    pairs, failures = [], []
+    for product_id, new_cluster_id in zip(df["product_id"].tolist(), df["new_cluster_id"].tolist()):
+        try:
+            pairs.append((int(product_id), int(new_cluster_id)))
+        except (TypeError, ValueError):
+            failures.append((product_id, new_cluster_id, "Not an integer pair."))
+    return pairs, failures
+
+
+def reassign_product_clusters(pairs, failures=None):
+    # Moves every (product_id, new_cluster_id) pair in one transaction. Unknown
+    # products or clusters are reported per row and skipped; the rest commit together.
+    failures = list(failures or [])
+    latest = {}
+    for product_id, new_cluster_id in pairs:
+        if product_id in latest:
+            failures.append((product_id, latest[product_id], "Superseded by a later row for the same product."))
+        latest[product_id] = new_cluster_id
+    rows = list(latest.items())
+
+    try:
+        with pool.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.setinputsizes(int, int)
+            staged = len(rows)
+            for start in range(0, len(rows), BATCH_SIZE):
+                batch = rows[start:start + BATCH_SIZE]
+                cursor.executemany("""
+                    INSERT INTO Cluster_Reassignments (product_id, new_cluster_id) VALUES (:1, :2)
+                """, batch, batcherrors=True)
+                errors = cursor.getbatcherrors()
+                failures.extend(batch[e.offset] + (e.message,) for e in errors)
+                staged -= len(errors)
+
+            cursor.execute(REJECTED_SQL)
+            rejected = cursor.fetchall()
+            failures.extend(rejected)
+            if rejected:
+                cursor.execute(DELETE_REJECTED_SQL)
+
+            cursor.execute(APPLY_SQL)
+            moved = cursor.rowcount
+            conn.commit()
+
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        return {"error": f"❌ Oracle Error: {error.message}"}
+
+    unchanged = staged - len(rejected) - moved
+    return {
+        "success": f"✅ {moved} products reassigned, {unchanged} already in place, {len(failures)} failed.",
+        "moved": moved,
+        "unchanged": unchanged,
+        "failures": failures,
+    }
@@ -0,0 +1,114 @@
+# Compares the incrementally maintained cluster totals with a full recompute from Products.
+#
+#   python -m Admin.Clusters.verify_cluster_stats          # report drift
+#   python -m Admin.Clusters.verify_cluster_stats --fix    # report, then run RecomputeClusterStats
+#   python -m Admin.Clusters.verify_cluster_stats --skip-quantity
+import argparse
+import sys
+import cx_Oracle
+from Database import pool
+
+TOLERANCE = 0.005
+
+VERIFY_SQL = """
+    SELECT
+        c.cluster_id,
+        c.product_count, NVL(a.product_count, 0),
+        c.sum_quantity, NVL(a.sum_quantity, 0),
+        c.sum_price, NVL(a.sum_price, 0),
+        c.sum_sales, NVL(a.sum_sales, 0),
+        c.sum_popularity_score, NVL(a.sum_popularity_score, 0),
+        c.avg_quantity, ROUND(a.sum_quantity / NULLIF(a.product_count, 0), 2),
+        c.avg_price, ROUND(a.sum_price / NULLIF(a.product_count, 0), 2),
+        c.avg_sales, ROUND(a.sum_sales / NULLIF(a.product_count, 0), 2),
+        c.avg_popularity_score, ROUND(a.sum_popularity_score / NULLIF(a.product_count, 0), 2)
+    FROM
+        Clusters c
+        LEFT JOIN (
+            SELECT cluster_id,
+                   COUNT(*) AS product_count,
+                   NVL(SUM(quantity), 0) AS sum_quantity,
+                   NVL(SUM(price), 0) AS sum_price,
+                   NVL(SUM(sales), 0) AS sum_sales,
+                   NVL(SUM(rating), 0) AS sum_popularity_score
+            FROM Products
+            GROUP BY cluster_id
+        ) a ON a.cluster_id = c.cluster_id
+    ORDER BY
+        c.cluster_id
+"""
+
+FIELDS = [
+    "product_count", "sum_quantity", "sum_price", "sum_sales", "sum_popularity_score",
+    "avg_quantity", "avg_price", "avg_sales", "avg_popularity_score",
+]
+# Not maintained by trg_cluster_stats (stock changes on every purchase); refreshed by the hourly
+# RECOMPUTE_CLUSTER_STATS job, so they can lag by up to an hour of purchases
+PERIODIC_FIELDS = {"sum_quantity", "avg_quantity"}
+
+
+def verify_cluster_stats(tolerance=TOLERANCE, include_quantity=True):
+    # Returns {"mismatches": [{"cluster_id", "field", "stored", "expected"}, ...], "clusters": n}
+    try:
+        with pool.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.arraysize = 1000
+            cursor.execute(VERIFY_SQL)
+            mismatches = []
+            clusters = 0
+            for row in cursor:
+                clusters += 1
+                cluster_id, values = row[0], row[1:]
+                for i, field in enumerate(FIELDS):
+                    if field in PERIODIC_FIELDS and not include_quantity:
+                        continue
+                    stored, expected = values[2 * i], values[2 * i + 1]
+                    if expected is None:
+                        continue    # empty cluster: averages are left as they were
+                    if stored is None or abs(stored - expected) > tolerance:
+                        mismatches.append({"cluster_id": cluster_id, "field": field,
+                                           "stored": stored, "expected": expected})
+            return {"mismatches": mismatches, "clusters": clusters}
+
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        return {"error": f"❌ Oracle Error: {error.message}"}
+
+
+def recompute_cluster_stats():
+    try:
+        with pool.get_connection() as conn:
+            conn.cursor().callproc("RecomputeClusterStats")
+            return {"success": "✅ Cluster statistics recomputed from Products."}
+
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        return {"error": f"❌ Oracle Error: {error.message}"}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify incrementally maintained cluster statistics")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--fix", action="store_true", help="run RecomputeClusterStats when drift is found")
+    parser.add_argument("--skip-quantity", action="store_true",
+                        help="do not compare sum_quantity and avg_quantity, which are refreshed hourly rather than per change")
+    args = parser.parse_args(argv)
+
+    result = verify_cluster_stats(args.tolerance, include_quantity=not args.skip_quantity)
+    if "error" in result:
+        print(result["error"])
+        return 1
+
+    for m in result["mismatches"]:
+        print(f"Cluster {m['cluster_id']}: {m['field']} stored={m['stored']} expected={m['expected']}")
+    print(f"{len(result['mismatches'])} mismatches across {result['clusters']} clusters.")
+
+    if result["mismatches"] and args.fix:
+        fixed = recompute_cluster_stats()
+        print(fixed.get("success") or fixed["error"])
+        return 0 if "success" in fixed else 1
+    return 1 if result["mismatches"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,56 +1,33 @@
 import cx_Oracle
-import os
-import json
-from dotenv import load_dotenv
+from Database import pool
 
-load_dotenv()
-
-# Oracle DB setup
-dsn = cx_Oracle.makedsn("localhost", 1521, service_name="orcl")
-username = os.getenv("db_username")
-password = os.getenv("db_password")
-
-def format_category_distribution(raw_clob):
-    # Read and clean the CLOB
-    if hasattr(raw_clob, 'read'):
-        raw_data = raw_clob.read()
-    else:
-        raw_data = raw_clob
-
-    try:
-        # Try to parse as JSON
-        parsed = json.loads(raw_data)
-        if isinstance(parsed, dict):
-            return [f"{k}: {v}" for k, v in parsed.items()]
-        elif isinstance(parsed, list):
-            return [str(item) for item in parsed]
-    except json.JSONDecodeError:
-        # Fall back to comma-separated
-        return [entry.strip() for entry in raw_data.split(",") if entry.strip()]
-
-    return [raw_data]  # Fallback
 
 def fetch_cluster_details(cluster_id):
     try:
-        connection = cx_Oracle.connect(user=username, password=password, dsn=dsn)
+        connection = pool.get_connection()
         cursor = connection.cursor()
 
+        # Category counts come from the index-organized Cluster_Category_Counts,
+        # largest first; clusters without products still return their stats row
         cursor.execute("""
-            SELECT cluster_id, avg_quantity, avg_price, avg_sales, avg_popularity_score, category_distribution
-            FROM Clusters
-            WHERE cluster_id = :cluster_id
+            SELECT c.cluster_id, c.avg_quantity, c.avg_price, c.avg_sales, c.avg_popularity_score,
+                   cc.category, cc.cnt
+            FROM Clusters c
+            LEFT JOIN Cluster_Category_Counts cc ON cc.cluster_id = c.cluster_id
+            WHERE c.cluster_id = :cluster_id
+            ORDER BY cc.cnt DESC, cc.category
         """, {'cluster_id': cluster_id})
 
-        row = cursor.fetchone()
-        if row:
-            clean_categories = format_category_distribution(row[5])
+        rows = cursor.fetchall()
+        if rows:
+            row = rows[0]
             return {
                 "Cluster ID": row[0],
                 "Average Quantity": row[1],
                 "Average Price": row[2],
                 "Average Sales": row[3],
                 "Popularity Score": row[4],
-                "Category Distribution": clean_categories
+                "Category Distribution": [f"{r[5]}: {r[6]}" for r in rows if r[5] is not None]
             }
         else:
             return {"error": f"No cluster found with ID {cluster_id}"}
@@ -1,16 +1,8 @@
-import cx_Oracle
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-dsn = cx_Oracle.makedsn("localhost", 1521, service_name="orcl")
-username = os.getenv("db_username")
-password = os.getenv("db_password")
+from Database import pool
 
 def update_product(product_id, name=None, category=None, price=None, quantity=None, sales=None, rating=None, supplier_id=None):
     try:
-        conn = cx_Oracle.connect(user=username, password=password, dsn=dsn)
+        conn = pool.get_connection()
         cursor = conn.cursor()
 
         fields = []
@@ -42,13 +34,32 @@ def update_product(product_id, name=None, category=None, price=None, quantity=No
         if not fields:
             return {"error": "No fields to update."}
 
-        query = f"UPDATE products SET {', '.join(fields)} WHERE product_id = :{len(values) + 1}"
-        values.append(product_id)
+        stripes = cursor.var(int)
+        query = (f"UPDATE products SET {', '.join(fields)} WHERE product_id = :{len(values) + 1} "
+                 f"RETURNING stock_stripes INTO :{len(values) + 2}")
+        values += [product_id, stripes]
 
         cursor.execute(query, tuple(values))
+        if quantity is not None and (stripes.getvalue() or [0])[0] > 0:
+            # Re-splits the new total across the stripes of a striped product
+            cursor.callproc("StripeProductStock", [product_id, None, quantity])
         conn.commit()
         return {"success": f"Product ID {product_id} updated."}
     except Exception as e:
         return {"error": str(e)}
+    finally:
+        if 'conn' in locals():
+            conn.close()
 
 
+def set_stock_stripes(product_id, stripes):
+    # stripes > 1 splits a hot product's stock across that many rows; 0 turns striping off
+    try:
+        with pool.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.callproc("StripeProductStock", [product_id, stripes])
+            if stripes > 1:
+                return {"success": f"Product ID {product_id} stock split across {stripes} stripes."}
+            return {"success": f"Product ID {product_id} stock is no longer striped."}
+    except Exception as e:
+        return {"error": str(e)}
@@ -1,16 +1,8 @@
 import cx_Oracle
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# === DB connection setup ===
-dsn = cx_Oracle.makedsn("localhost", 1521, service_name="orcl")
-username = os.getenv("db_username")
-password = os.getenv("db_password")
+from Database import pool
 
 def create_connection():
-    return cx_Oracle.connect(user=username, password=password, dsn=dsn)
+    return pool.get_connection()
 
 def fetch_product_data_by_name(product_name):
     try:
@@ -21,7 +13,7 @@ def fetch_product_data_by_name(product_name):
                     p.product_id,
                     p.name,
                     p.category,
-                    p.quantity,
+                    ps.quantity,
                     p.price,
                     p.sales,
                     p.rating,
@@ -29,6 +21,7 @@ def fetch_product_data_by_name(product_name):
                     p.supplier_id,
                     s.name AS supplier_name
                 FROM Products p
+                JOIN Product_Stock ps ON ps.product_id = p.product_id
                 LEFT JOIN Suppliers s ON p.supplier_id = s.supplier_id
                 WHERE LOWER(p.name) = LOWER(:name)
             """, {'name': product_name})
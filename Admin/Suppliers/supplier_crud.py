@@ -1,17 +1,9 @@
 import cx_Oracle
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# Oracle DB setup
-dsn = cx_Oracle.makedsn("localhost", 1521, service_name="orcl")
-username = os.getenv("db_username")
-password = os.getenv("db_password")
+from Database import pool
 
 def create_supplier(supplier_id, name, location, contact_info):
     try:
-        connection = cx_Oracle.connect(user=username, password=password, dsn=dsn)
+        connection = pool.get_connection()
         cursor = connection.cursor()
 
         insert_query = """
@@ -33,7 +25,7 @@ def create_supplier(supplier_id, name, location, contact_info):
 
 def update_supplier(supplier_id, name=None, location=None, contact_info=None):
     try:
-        connection = cx_Oracle.connect(user=username, password=password, dsn=dsn)
+        connection = pool.get_connection()
         cursor = connection.cursor()
 
         update_fields = []
@@ -83,7 +75,7 @@ def update_supplier(supplier_id, name=None, location=None, contact_info=None):
 
 def delete_supplier(supplier_id):
     try:
-        connection = cx_Oracle.connect(user=username, password=password, dsn=dsn)
+        connection = pool.get_connection()
         cursor = connection.cursor()
 
         delete_query = "DELETE FROM Suppliers WHERE supplier_id = :1"
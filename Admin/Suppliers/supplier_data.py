@@ -1,39 +1,20 @@
 import cx_Oracle
-import os
-from dotenv import load_dotenv
+from collections import namedtuple
+from Database import pool
+from Database.fetch import fetch_refcursor
+from Database.output import call_with_output
 
-load_dotenv()
+SupplierInfo = namedtuple("SupplierInfo", ["supplier_id", "name", "location", "contact_info"])
 
-# === DB connection setup ===
-dsn = cx_Oracle.makedsn("localhost", 1521, service_name="orcl")
-username = os.getenv("db_username")
-password = os.getenv("db_password")
 
 def fetch_supplier_info(supplier_name):
     output_lines = []
     try:
-        connection = cx_Oracle.connect(
-            user=username,
-            password=password,
-            dsn=dsn,
-        )
+        connection = pool.get_connection()
         cursor = connection.cursor()
 
-        # Enable DBMS_OUTPUT
-        cursor.callproc("DBMS_OUTPUT.ENABLE")
-
-        # Call the stored procedure
-        cursor.callproc("PrintSupplierInfo", [supplier_name])
-
-        statusVar = cursor.var(cx_Oracle.NUMBER)
-        lineVar = cursor.var(cx_Oracle.STRING)
-
-        # Read DBMS_OUTPUT lines
-        while True:
-            cursor.callproc("DBMS_OUTPUT.GET_LINE", (lineVar, statusVar))
-            if statusVar.getvalue() != 0:
-                break
-            output_lines.append(lineVar.getvalue())
+        # Call the stored procedure; it prints at most four short lines (2000 bytes is the smallest buffer allowed)
+        output_lines.extend(call_with_output(cursor, "PrintSupplierInfo", [supplier_name], buffer_size=2000))
 
     except cx_Oracle.DatabaseError as e:
         error, = e.args
@@ -44,3 +25,16 @@ def fetch_supplier_info(supplier_name):
             connection.close()
 
     return output_lines
+
+
+def get_supplier_info(supplier_name):
+    # Returns a SupplierInfo, None when the supplier does not exist, or an error dict
+    try:
+        with pool.get_connection() as connection:
+            cursor = connection.cursor()
+            rows = fetch_refcursor(cursor, "GetSupplierInfo", [supplier_name], SupplierInfo)
+            return rows[0] if rows else None
+
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        return {"error": f"❌ Database error: {error.message}"}
@@ -1,17 +1,12 @@
 # supplier_groupby.py
 import cx_Oracle
-import os
-from dotenv import load_dotenv
-load_dotenv()
+from Database import pool
 
 def fetch_supplier_groupby():
-    dsn = cx_Oracle.makedsn("localhost", 1521, service_name="orcl")
-    username = os.getenv("db_username")
-    password = os.getenv("db_password")
-
     results = []
+    conn = None
     try:
-        conn = cx_Oracle.connect(user=username, password=password, dsn=dsn)
+        conn = pool.get_connection()
         cursor = conn.cursor()
         cursor.execute("""
             SELECT NVL(location, 'Unknown'), COUNT(*) AS total_suppliers
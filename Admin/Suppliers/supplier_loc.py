@@ -1,34 +1,20 @@
 import cx_Oracle
-import os
-from dotenv import load_dotenv
-load_dotenv()
+from Database import pool
+from Database.fetch import fetch_refcursor
+from Database.output import MAX_BUFFER_SIZE, call_with_output
+from Admin.Suppliers.supplier_data import SupplierInfo
 
 def fetch_suppliers_by_location(city=None, country=None):
-    dsn = cx_Oracle.makedsn("localhost", 1521, service_name="orcl")
-    username = os.getenv("db_username")
-    password = os.getenv("db_password")
-
     results = []
     conn = None
 
     try:
-        conn = cx_Oracle.connect(user=username, password=password, dsn=dsn)
+        conn = pool.get_connection()
         cursor = conn.cursor()
-        cursor.callproc("DBMS_OUTPUT.ENABLE")
-
-        # Call the procedure that prints info via DBMS_OUTPUT
-        cursor.callproc("GetSuppliersByLocation", [city, country])
 
-        # Fetch lines printed via DBMS_OUTPUT
-        statusVar = cursor.var(cx_Oracle.NUMBER)
-        lineVar = cursor.var(cx_Oracle.STRING)
-
-        while True:
-            cursor.callproc("DBMS_OUTPUT.GET_LINE", (lineVar, statusVar))
-            # print(lineVar.getvalue())
-            if statusVar.getvalue() != 0:
-                break
-            results.append(lineVar.getvalue())  
+        # Call the procedure that prints info via DBMS_OUTPUT; any number of suppliers can match,
+        # so this takes the largest bounded buffer
+        results.extend(call_with_output(cursor, "GetSuppliersByLocation", [city, country], buffer_size=MAX_BUFFER_SIZE))
 
         # Ensure even if no output, return something meaningful
         if not any(results):
@@ -41,3 +27,13 @@ def fetch_suppliers_by_location(city=None, country=None):
             conn.close()
 
     return results
+
+
+def get_suppliers_by_location(city=None, country=None):
+    try:
+        with pool.get_connection() as conn:
+            cursor = conn.cursor()
+            return fetch_refcursor(cursor, "FindSuppliersByLocation", [city, country], SupplierInfo)
+
+    except cx_Oracle.DatabaseError as e:
+        return {"error": f"❌ Database Error: {str(e)}"}
@@ -1,26 +1,20 @@
 import cx_Oracle
-import os
+from Database import pool
+from Database.fetch import tune_cursor, fetch_dataframe
 import pandas as pd
-from dotenv import load_dotenv
 import streamlit as st
 
-# Load credentials
-load_dotenv()
-dsn = cx_Oracle.makedsn("localhost", 1521, service_name="orcl")
-username = os.getenv("db_username")
-password = os.getenv("db_password")
-
 def create_connection():
-    return cx_Oracle.connect(user=username, password=password, dsn=dsn)
+    return pool.get_connection()
 
 def fetch_non_admin_users():
     """Fetch all non-admin users from the database."""
     try:
         conn = create_connection()
-        cursor = conn.cursor()
+        cursor = tune_cursor(conn.cursor())
         cursor.execute("SELECT user_id, name, role FROM User_Data WHERE LOWER(role) != 'admin' ORDER BY name")
-        rows = cursor.fetchall()
-        return pd.DataFrame(rows, columns=["User ID", "Name", "Role"])
+        return fetch_dataframe(cursor, columns=["User ID", "Name", "Role"],
+                               dtypes={"User ID": "int32", "Name": "category", "Role": "category"})
     except cx_Oracle.DatabaseError as e:
         st.error(f"❌ Error fetching users: {str(e)}")
         return pd.DataFrame()
@@ -0,0 +1,94 @@
+# Counts round trips needed to read DBMS_OUTPUT line by line (the old
+# GET_LINE loop) versus in batches with Database/output.py.
+#
+#   python Benchmarks/dbms_output_benchmark.py --lines 500
+#   python Benchmarks/dbms_output_benchmark.py --category Laptops
+#
+# Reading round trips needs SELECT access to V$MYSTAT and V$STATNAME.
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cx_Oracle
+from Database import pool
+from Database.output import enable_output, drain_output
+
+ROUND_TRIPS_SQL = """
+    SELECT ms.value
+    FROM v$mystat ms
+    JOIN v$statname sn ON sn.statistic# = ms.statistic#
+    WHERE sn.name = 'SQL*Net roundtrips to/from client'
+"""
+
+# Stands in for a ~500 line recommendation without depending on catalog contents
+SYNTHETIC_OUTPUT_SQL = """
+    BEGIN
+        FOR i IN 1 .. :num_lines LOOP
+            DBMS_OUTPUT.PUT_LINE(' - Product ' || i || ' | ₹' || (i * 10) || ' | Rating ' || MOD(i, 100) || '%');
+        END LOOP;
+    END;
+"""
+
+
+def round_trips(cursor):
+    cursor.execute(ROUND_TRIPS_SQL)
+    return cursor.fetchone()[0]
+
+
+def produce_output(cursor, args):
+    if args.category:
+        cursor.callproc("RecommendItemsByCategory", [args.category])
+    else:
+        cursor.execute(SYNTHETIC_OUTPUT_SQL, num_lines=args.lines)
+
+
+def read_line_by_line(cursor):
+    status_var = cursor.var(cx_Oracle.NUMBER)
+    line_var = cursor.var(cx_Oracle.STRING)
+    output_lines = []
+    while True:
+        cursor.callproc("DBMS_OUTPUT.GET_LINE", (line_var, status_var))
+        if status_var.getvalue() != 0:
+            break
+        output_lines.append(line_var.getvalue())
+    return output_lines
+
+
+def measure(cursor, label, args, reader):
+    enable_output(cursor)
+    produce_output(cursor, args)
+
+    # Reading the statistic costs a round trip of its own
+    before = round_trips(cursor)
+    overhead = round_trips(cursor) - before
+    before += overhead
+    start = time.perf_counter()
+    lines = reader(cursor)
+    elapsed = time.perf_counter() - start
+    after = round_trips(cursor)
+
+    trips = after - before - overhead
+    print(f"{label:<22} lines={len(lines):<6} round trips={trips:<6} time={elapsed * 1000:.1f} ms")
+    return trips
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DBMS_OUTPUT drain round-trip benchmark")
+    parser.add_argument("--lines", type=int, default=500, help="lines of synthetic output")
+    parser.add_argument("--category", help="use RecommendItemsByCategory with this category or product name instead")
+    args = parser.parse_args()
+
+    with pool.get_connection() as conn:
+        cursor = conn.cursor()
+        before = measure(cursor, "GET_LINE loop", args, read_line_by_line)
+        after = measure(cursor, "GET_LINES batches", args, drain_output)
+
+    if after:
+        print(f"Round trips reduced {before / after:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
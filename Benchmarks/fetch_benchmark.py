@@ -0,0 +1,72 @@
+# Compares the old fetchall() -> DataFrame path with Database/fetch.py's
+# columnar fetch on a generated transaction-shaped result set.
+#
+#   python Benchmarks/fetch_benchmark.py --rows 1000000
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from Database import pool
+from Database.fetch import tune_cursor, fetch_dataframe
+from User.Transactions.view import TRANSACTION_DTYPES
+
+# Same columns as the admin transaction history, generated so no data has to be loaded first
+ROWS_SQL = """
+    SELECT
+        LEVEL AS transaction_id,
+        'Product ' || MOD(LEVEL, 5000) AS product_name,
+        CASE WHEN MOD(LEVEL, 3) = 0 THEN 'Stock In' ELSE 'Stock Out' END AS transaction_type,
+        MOD(LEVEL, 20) - 10 AS quantity_change,
+        SYSDATE - MOD(LEVEL, 365) AS transaction_date,
+        'user' || MOD(LEVEL, 200) AS user_name
+    FROM dual
+    CONNECT BY LEVEL <= :num_rows
+"""
+
+
+def old_path(cursor, num_rows):
+    cursor.execute(ROWS_SQL, num_rows=num_rows)
+    columns = [desc[0] for desc in cursor.description]
+    rows = cursor.fetchall()
+    return pd.DataFrame(rows, columns=columns)
+
+
+def new_path(cursor, num_rows):
+    tune_cursor(cursor)
+    cursor.execute(ROWS_SQL, num_rows=num_rows)
+    return fetch_dataframe(cursor, dtypes=TRANSACTION_DTYPES)
+
+
+def measure(label, fn, num_rows):
+    gc.collect()
+    with pool.get_connection() as conn:
+        cursor = conn.cursor()
+        tracemalloc.start()
+        start = time.perf_counter()
+        df = fn(cursor, num_rows)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    frame_mb = df.memory_usage(deep=True).sum() / 2**20
+    print(f"{label:<16} rows={len(df):<9} time={elapsed:6.2f} s  rows/s={len(df) / elapsed:>11,.0f}  "
+          f"peak={peak / 2**20:8.1f} MB  frame={frame_mb:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch-to-DataFrame benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    measure("fetchall", old_path, args.rows)
+    measure("columnar", new_path, args.rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# Parallel product load of Initial_Insertion/pipeline.py with the cluster and catalog
+# triggers firing on every insert, versus disabled for the load and rebuilt once after it.
+#
+#   python Benchmarks/pipeline_benchmark.py --rows 200000 --writers 4
+#
+# Generates a CSV against the existing Suppliers and Clusters, loads it in both modes, and
+# deletes the generated products after each run. Use a test schema.
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Admin.Clusters.verify_cluster_stats import verify_cluster_stats
+from Database import config, pool
+from Initial_Insertion import pipeline
+from Initial_Insertion.bulk_load import PRODUCT_COLUMNS
+
+CATEGORIES = ['Electronics', 'Books', 'Clothing', 'Home', 'Toys', 'Sports', 'Beauty', 'Grocery']
+
+
+def write_csv(path, rows):
+    with pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT NVL(MAX(product_id), 0) FROM Products")
+        first_id = cursor.fetchone()[0] + 1
+        cursor.execute("SELECT name FROM Suppliers")
+        suppliers = [r[0] for r in cursor.fetchall()]
+        cursor.execute("SELECT cluster_id FROM Clusters")
+        clusters = [r[0] for r in cursor.fetchall()]
+    if not suppliers or not clusters:
+        raise SystemExit("❌ Load Suppliers and Clusters first (python -m Initial_Insertion.bulk_load).")
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(PRODUCT_COLUMNS)
+        for product_id in range(first_id, first_id + rows):
+            writer.writerow([product_id, f"Bench product {product_id}", random.choice(CATEGORIES),
+                             random.randint(0, 500), round(random.uniform(1, 2000), 2), random.randint(0, 10000),
+                             round(random.uniform(0, 9.9), 2), random.choice(clusters), random.choice(suppliers)])
+    return first_id, first_id + rows - 1
+
+
+def delete_products(first_id, last_id):
+    # Without the triggers, then rebuilt, so cleanup does not dominate the run
+    pipeline.set_maintenance_triggers(False)
+    try:
+        with pool.get_connection() as conn:
+            conn.cursor().execute("DELETE FROM Products WHERE product_id BETWEEN :1 AND :2", [first_id, last_id])
+            conn.commit()
+    finally:
+        pipeline.set_maintenance_triggers(True)
+    pipeline.rebuild_derived_state()
+
+
+def run(label, csv_path, work_dir, args, disable_triggers):
+    checkpoint = pipeline.Checkpoint(os.path.join(work_dir, f"{label}.checkpoint.json"), csv_path, args.chunk_size)
+    start = time.perf_counter()
+    if disable_triggers:
+        pipeline.set_maintenance_triggers(False)
+    try:
+        progress = pipeline.load_products_parallel(csv_path, checkpoint, args.chunk_size, args.workers, args.writers)
+    finally:
+        if disable_triggers:
+            pipeline.set_maintenance_triggers(True)
+    loaded = time.perf_counter() - start
+    if disable_triggers:
+        pipeline.rebuild_derived_state()
+    elapsed = time.perf_counter() - start
+
+    # Quantity totals are only exact after a rebuild; with the triggers on they wait for the hourly job
+    result = verify_cluster_stats(include_quantity=disable_triggers)
+    consistent = "mismatches" in result and not result["mismatches"]
+    print(f"{label:<18} rows={progress.inserted:<9} load={loaded:7.2f} s  total={elapsed:7.2f} s  "
+          f"rows/s={progress.inserted / elapsed:>10,.0f}  cluster stats {'✅' if consistent else '❌'}")
+    return progress.inserted == args.rows and consistent, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline product load with and without maintenance triggers")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--chunk-size", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--writers", type=int, default=min(4, config.POOL_MAX))
+    args = parser.parse_args()
+
+    if args.writers > config.POOL_MAX:
+        parser.error(f"--writers cannot exceed db_pool_max ({config.POOL_MAX})")
+    print(f"{args.rows} products, {args.writers} writers, {args.workers} transform processes")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        csv_path = os.path.join(work_dir, "bench_products.csv")
+        first_id, last_id = write_csv(csv_path, args.rows)
+        results = []
+        for label, disable_triggers in (("triggers on", False), ("triggers deferred", True)):
+            try:
+                results.append(run(label, csv_path, work_dir, args, disable_triggers))
+            finally:
+                delete_products(first_id, last_id)
+
+    print(f"Speedup: {results[0][1] / results[1][1]:.2f}x")
+    sys.exit(0 if all(passed for passed, _ in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
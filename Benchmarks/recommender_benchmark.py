@@ -0,0 +1,91 @@
+# Query latency of the in-memory nearest-neighbour index (User/Products/similarity.py)
+# against the PL/SQL cluster recommender (GetRecommendedItems).
+#
+#   python Benchmarks/recommender_benchmark.py --synthetic 1000000     # index only, no database
+#   python Benchmarks/recommender_benchmark.py --queries 200           # both engines on the live catalog
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from Database import pool
+from Database.fetch import fetch_refcursor
+from User.Products import similarity
+from User.Products.prod_cluster import RecommendedItem
+
+CATEGORIES = ["Laptop", "Smartphone", "Tablet", "Camera", "Headphones", "Smartwatch"]
+
+
+def percentiles(label, seconds):
+    ms = np.array(seconds) * 1000
+    print(f"{label:<22} queries={len(ms):<5} p50={np.percentile(ms, 50):8.2f} ms  "
+          f"p95={np.percentile(ms, 95):8.2f} ms  p99={np.percentile(ms, 99):8.2f} ms")
+
+
+def synthetic_index(rows):
+    rng = np.random.default_rng(42)
+    features = np.column_stack([
+        rng.uniform(50, 2500, rows),
+        rng.integers(0, 1000, rows),
+        rng.uniform(0, 1, rows),
+    ]).astype(np.float32)
+    categories = rng.choice(CATEGORIES, rows)
+    start = time.perf_counter()
+    index = similarity.SimilarityIndex(np.arange(1, rows + 1), categories, features)
+    print(f"Built index of {rows} products in {time.perf_counter() - start:.2f} s")
+    return index
+
+
+def time_index(index, product_ids, k):
+    timings = []
+    for product_id in product_ids:
+        start = time.perf_counter()
+        index.top_k(product_id, k)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def time_plsql(categories):
+    timings = []
+    with pool.get_connection() as conn:
+        cursor = conn.cursor()
+        for category in categories:
+            start = time.perf_counter()
+            fetch_refcursor(cursor, "GetRecommendedItems", [category], RecommendedItem)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nearest-neighbour vs PL/SQL recommendation latency")
+    parser.add_argument("--synthetic", type=int, help="benchmark the index alone on this many generated products")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        index = synthetic_index(args.synthetic)
+        ids = random.Random(42).sample(range(1, args.synthetic + 1), min(args.queries, args.synthetic))
+        percentiles("nearest neighbours", time_index(index, ids, args.k))
+        return
+
+    start = time.perf_counter()
+    index = similarity.get_index()
+    print(f"Loaded index of {index.size} products in {time.perf_counter() - start:.2f} s")
+    rng = random.Random(42)
+    ids = [int(i) for i in rng.sample(list(index.ids[:index.size]), min(args.queries, index.size))]
+    percentiles("nearest neighbours", time_index(index, ids, args.k))
+
+    with pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT category FROM Products")
+        categories = [r[0] for r in cursor]
+    percentiles("GetRecommendedItems", time_plsql([rng.choice(categories) for _ in range(args.queries)]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# Measures a cold import of app.py in fresh interpreters and checks that no
+# database logon happens before the first query.
+#
+#   python Benchmarks/startup_benchmark.py --runs 10
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r'''
+import json, runpy, socket, sys, time
+sys.path.insert(0, ".")
+logons = []
+
+import cx_Oracle
+
+def _counting(name, fn):
+    def wrapper(*args, **kwargs):
+        logons.append(name)
+        return fn(*args, **kwargs)
+    return wrapper
+
+cx_Oracle.connect = _counting("cx_Oracle.connect", cx_Oracle.connect)
+cx_Oracle.SessionPool = _counting("cx_Oracle.SessionPool", cx_Oracle.SessionPool)
+
+_socket_connect = socket.socket.connect
+def _connect(self, address):
+    logons.append("socket.connect %s" % (address,))
+    return _socket_connect(self, address)
+socket.socket.connect = _connect
+
+start = time.perf_counter()
+error = None
+try:
+    runpy.run_path("app.py", run_name="__main__")
+except Exception as e:
+    error = repr(e)
+elapsed = time.perf_counter() - start
+print("RESULT " + json.dumps({"seconds": elapsed, "logons": logons, "error": error}))
+'''
+
+
+def run_once():
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    for line in proc.stdout.splitlines():
+        if line.startswith("RESULT "):
+            return json.loads(line[len("RESULT "):])
+    raise RuntimeError(f"Child process produced no result:\n{proc.stderr}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-import benchmark for app.py")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    results = [run_once() for _ in range(args.runs)]
+    timings = [r["seconds"] for r in results]
+    logons = [name for r in results for name in r["logons"]]
+    errors = {r["error"] for r in results if r["error"]}
+
+    print(f"Runs:            {args.runs}")
+    print(f"Median import:   {statistics.median(timings) * 1000:.1f} ms")
+    print(f"Fastest import:  {min(timings) * 1000:.1f} ms")
+    print(f"Slowest import:  {max(timings) * 1000:.1f} ms")
+    print(f"Logons/sockets:  {len(logons)}")
+    for name in sorted(set(logons)):
+        print(f"  - {name}")
+    for error in errors:
+        print(f"⚠️ app.py raised during import: {error}")
+
+    if logons:
+        print("❌ app.py touched the network during startup.")
+        sys.exit(1)
+    print("✅ No network I/O during startup.")
+
+
+if __name__ == "__main__":
+    main()
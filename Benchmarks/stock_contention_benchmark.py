@@ -0,0 +1,154 @@
+# Load test for the stock update path: N concurrent buyers hammer one product,
+# then the product's stock is checked against the Transactions rows written.
+#
+#   python Benchmarks/stock_contention_benchmark.py --product-id 42 --buyers 8 --purchases 200 --stock 1000
+#   python Benchmarks/stock_contention_benchmark.py --product-id 42 --path name    # through ConductTransaction
+#   python Benchmarks/stock_contention_benchmark.py --product-id 42 --stripes 8    # unstriped, then 8 stock stripes
+#
+# Writes real Transactions rows (and low-stock alerts); run it against a test schema.
+# --buyers cannot exceed db_pool_max, since every buyer holds a pooled connection.
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from Database import config, pool
+from User.Transactions import conduct
+
+STOCK_SQL = """
+    SELECT p.name, ps.quantity
+    FROM Products p
+    JOIN Product_Stock ps ON ps.product_id = p.product_id
+    WHERE p.product_id = :1
+"""
+
+
+def snapshot(product_id):
+    with pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(STOCK_SQL, [product_id])
+        name, quantity = cursor.fetchone()
+        cursor.execute("SELECT NVL(MAX(transaction_id), 0) FROM Transactions")
+        return name, quantity, cursor.fetchone()[0]
+
+
+def set_stock(product_id, quantity, stripes=None):
+    # stripes None keeps the product's current striping
+    with pool.get_connection() as conn:
+        conn.cursor().callproc("StripeProductStock", [product_id, stripes, quantity])
+
+
+def logged_change(product_id, after_transaction_id):
+    with pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT COUNT(*), NVL(SUM(quantity_change), 0)
+            FROM Transactions
+            WHERE product_id = :1 AND transaction_id > :2
+        """, [product_id, after_transaction_id])
+        return cursor.fetchone()
+
+
+def buyer(buy, purchases, results, barrier):
+    latencies, ok, out_of_stock, errors = [], 0, 0, []
+    barrier.wait()
+    for _ in range(purchases):
+        start = time.perf_counter()
+        result = buy()
+        latencies.append(time.perf_counter() - start)
+        if "success" in result:
+            ok += 1
+        elif "Not enough stock" in result["error"]:
+            out_of_stock += 1
+        else:
+            errors.append(result["error"])
+    results.append((latencies, ok, out_of_stock, errors))
+
+
+def run(args, stripes=None):
+    # One timed round; returns (all checks passed, calls per second)
+    if args.stock is not None or stripes is not None:
+        set_stock(args.product_id, args.stock, stripes)
+    name, start_quantity, last_transaction_id = snapshot(args.product_id)
+
+    if args.path == "id":
+        buy = lambda: conduct.conduct_transaction_by_id(args.product_id, -args.quantity, args.user_id)
+    else:
+        buy = lambda: conduct.call_conduct_transaction(name, -args.quantity, args.user_id)
+
+    results = []
+    barrier = threading.Barrier(args.buyers + 1)
+    threads = [threading.Thread(target=buyer, args=(buy, args.purchases, results, barrier)) for _ in range(args.buyers)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = np.concatenate([np.array(r[0]) for r in results]) * 1000
+    ok = sum(r[1] for r in results)
+    out_of_stock = sum(r[2] for r in results)
+    errors = [e for r in results for e in r[3]]
+    _, end_quantity, _ = snapshot(args.product_id)
+    logged_rows, logged_sum = logged_change(args.product_id, last_transaction_id)
+    throughput = len(latencies) / elapsed
+
+    mode = f"{stripes} stripes" if stripes else "unstriped" if stripes == 0 else "current striping"
+    print(f"{args.buyers} buyers x {args.purchases} purchases of {args.quantity} on '{name}' via {args.path}, {mode}")
+    print(f"throughput={throughput:,.0f} calls/s  ok={ok}  out_of_stock={out_of_stock}  errors={len(errors)}")
+    print(f"latency p50={np.percentile(latencies, 50):.2f} ms  p99={np.percentile(latencies, 99):.2f} ms  "
+          f"max={latencies.max():.2f} ms")
+    print(f"stock {start_quantity} -> {end_quantity}; {logged_rows} transactions totalling {logged_sum}")
+
+    checks = {
+        "stock never negative": end_quantity >= 0,
+        "no lost update (start + logged = end)": start_quantity + logged_sum == end_quantity,
+        "every success logged once": logged_rows == ok and logged_sum == -ok * args.quantity,
+        "refusals only when stock ran out": out_of_stock == 0 or end_quantity < args.quantity,
+    }
+    for label, passed in checks.items():
+        print(f"{'✅' if passed else '❌'} {label}")
+    for message in errors[:5]:
+        print(f"   error: {message}")
+    return all(checks.values()) and not errors, throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent buyers on one hot product")
+    parser.add_argument("--product-id", type=int, required=True)
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--buyers", type=int, default=min(8, config.POOL_MAX))
+    parser.add_argument("--purchases", type=int, default=100, help="purchases per buyer")
+    parser.add_argument("--quantity", type=int, default=1, help="units per purchase")
+    parser.add_argument("--stock", type=int, help="reset the product's stock to this before each run")
+    parser.add_argument("--path", choices=["id", "name"], default="id",
+                        help="ConductTransactionById (default) or ConductTransaction by product name")
+    parser.add_argument("--stripes", type=int,
+                        help="run unstriped, then with the stock split across this many stripes, and compare")
+    args = parser.parse_args()
+
+    if args.buyers > config.POOL_MAX:
+        parser.error(f"--buyers cannot exceed db_pool_max ({config.POOL_MAX})")
+    if args.stripes is not None and args.stock is None:
+        args.stock = snapshot(args.product_id)[1]     # both runs start from the same stock
+
+    if args.stripes is None:
+        passed, _ = run(args)
+        sys.exit(0 if passed else 1)
+
+    passed, baseline = run(args, 0)
+    print()
+    striped_passed, striped = run(args, args.stripes)
+    set_stock(args.product_id, None, 0)
+    print(f"\n{args.stripes} stripes: {striped / baseline:.2f}x the unstriped throughput")
+    sys.exit(0 if passed and striped_passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# Throughput of the write-behind purchase buffer (conduct.WriteBehindBuffer) against the
+# synchronous ConductTransactionById path, with concurrent buyers on one hot product.
+#
+#   python Benchmarks/write_behind_benchmark.py --product-id 42 --buyers 8 --purchases 500 --stock 100000
+#
+# Each mode starts from the same --stock. After the buffered run the buffer is drained, and
+# both runs are checked against the Transactions rows they wrote. Use a test schema.
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from Benchmarks.stock_contention_benchmark import buyer, logged_change, set_stock, snapshot
+from Database import config
+from User.Transactions import conduct
+
+
+def run_buyers(buy, buyers, purchases):
+    results = []
+    barrier = threading.Barrier(buyers + 1)
+    threads = [threading.Thread(target=buyer, args=(buy, purchases, results, barrier)) for _ in range(buyers)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    return results, time.perf_counter() - start
+
+
+def report(label, results, elapsed, drain=0.0):
+    latencies = np.concatenate([np.array(r[0]) for r in results]) * 1000
+    ok = sum(r[1] for r in results)
+    errors = [e for r in results for e in r[3]]
+    print(f"{label:<13} throughput={len(latencies) / (elapsed + drain):8,.0f} calls/s  "
+          f"p50={np.percentile(latencies, 50):6.2f} ms  p99={np.percentile(latencies, 99):6.2f} ms  "
+          f"ok={ok}  refused={sum(r[2] for r in results)}  errors={len(errors)}"
+          + (f"  (drain {drain * 1000:.0f} ms)" if drain else ""))
+    for message in errors[:3]:
+        print(f"   error: {message}")
+    return ok, errors
+
+
+def check(label, product_id, start_quantity, last_transaction_id, ok, quantity):
+    _, end_quantity, _ = snapshot(product_id)
+    logged_rows, logged_sum = logged_change(product_id, last_transaction_id)
+    passed = (end_quantity >= 0 and start_quantity + logged_sum == end_quantity
+              and logged_rows == ok and logged_sum == -ok * quantity)
+    print(f"{'✅' if passed else '❌'} {label}: stock {start_quantity} -> {end_quantity}, "
+          f"{logged_rows} transactions totalling {logged_sum}")
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write-behind buffer vs synchronous purchases")
+    parser.add_argument("--product-id", type=int, required=True)
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--buyers", type=int, default=min(8, config.POOL_MAX))
+    parser.add_argument("--purchases", type=int, default=500, help="purchases per buyer")
+    parser.add_argument("--quantity", type=int, default=1, help="units per purchase")
+    parser.add_argument("--stock", type=int, default=100000, help="stock each mode starts from")
+    parser.add_argument("--flush-interval", type=float, default=config.TX_FLUSH_INTERVAL)
+    parser.add_argument("--flush-rows", type=int, default=config.TX_FLUSH_ROWS)
+    args = parser.parse_args()
+
+    if args.buyers > config.POOL_MAX:
+        parser.error(f"--buyers cannot exceed db_pool_max ({config.POOL_MAX})")
+    print(f"{args.buyers} buyers x {args.purchases} purchases of {args.quantity} on product {args.product_id}")
+    passed = []
+
+    set_stock(args.product_id, args.stock)
+    _, start_quantity, last_transaction_id = snapshot(args.product_id)
+    results, elapsed = run_buyers(
+        lambda: conduct.conduct_transaction_by_id(args.product_id, -args.quantity, args.user_id),
+        args.buyers, args.purchases)
+    ok, errors = report("synchronous", results, elapsed)
+    passed.append(check("synchronous", args.product_id, start_quantity, last_transaction_id, ok, args.quantity)
+                  and not errors)
+
+    set_stock(args.product_id, args.stock)
+    _, start_quantity, last_transaction_id = snapshot(args.product_id)
+    with tempfile.TemporaryDirectory() as work_dir:
+        buffer = conduct.WriteBehindBuffer(os.path.join(work_dir, "write_behind.log"),
+                                           args.flush_interval, args.flush_rows)
+        results, elapsed = run_buyers(
+            lambda: conduct.buffered_transaction(args.product_id, -args.quantity, args.user_id, buffer),
+            args.buyers, args.purchases)
+        start = time.perf_counter()
+        buffer.close()
+        drain = time.perf_counter() - start
+        ok, errors = report("write-behind", results, elapsed, drain)
+        print(f"   {buffer.flushes} flushes, last error: {buffer.last_error}")
+    passed.append(check("write-behind", args.product_id, start_quantity, last_transaction_id, ok, args.quantity)
+                  and not errors)
+
+    sys.exit(0 if all(passed) else 1)
+
+
+if __name__ == "__main__":
+    main()
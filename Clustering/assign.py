@@ -0,0 +1,138 @@
+# Places products into existing clusters without re-running the clustering.
+#
+# cluster_pipeline.py saves a small model directory after each run:
+#   scaler.npy        (2, 4) float32: StandardScaler mean and scale
+#   prototypes.npy    (k, 4) float32: mean scaled feature vector of each cluster
+#   cluster_ids.npy   (k,)   int32:   cluster id of each prototype row
+#   model.json        categories (in encoding order), run details; written last
+#   predictor.pkl     optional UMAP + HDBSCAN models for approximate prediction
+#
+# The arrays are memory-mapped, so loading is cheap and nearest-prototype
+# assignment is a handful of NumPy operations on a (k, 4) matrix. Only NumPy is
+# needed unless the HDBSCAN method is asked for.
+import json
+import os
+import pickle
+import threading
+import numpy as np
+from Database import config
+
+NOISE = -1
+METHODS = ("nearest", "hdbscan")
+
+_model = None
+_lock = threading.Lock()
+
+
+class ClusterModel:
+    def __init__(self, model_dir, mtime):
+        with open(os.path.join(model_dir, "model.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.model_dir = model_dir
+        self.mtime = mtime
+        self.category_codes = {c: i for i, c in enumerate(self.meta["categories"])}
+        scaler = np.load(os.path.join(model_dir, "scaler.npy"), mmap_mode="r")
+        self.mean, self.scale = np.array(scaler[0]), np.array(scaler[1])
+        self.prototypes = np.load(os.path.join(model_dir, "prototypes.npy"), mmap_mode="r")
+        self.cluster_ids = np.load(os.path.join(model_dir, "cluster_ids.npy"), mmap_mode="r")
+        self.prototype_norms = np.einsum("ij,ij->i", self.prototypes, self.prototypes)
+        self._predictor = None
+
+    def scale_features(self, categories, price, sales, rating):
+        # Returns the scaled (n, 4) matrix and a mask of rows whose category the model knows
+        codes = np.array([self.category_codes.get(c, -1) for c in categories], dtype=np.float32)
+        X = np.column_stack([
+            np.asarray(price, dtype=np.float32),
+            np.asarray(sales, dtype=np.float32),
+            np.asarray(rating, dtype=np.float32),
+            codes,
+        ])
+        return (X - self.mean) / self.scale, codes >= 0
+
+    def nearest(self, X):
+        # argmin ||x - p||^2 = argmin (||p||^2 - 2 x.p); ||x||^2 is the same for every prototype
+        distances = self.prototype_norms - 2.0 * (X @ self.prototypes.T)
+        return np.asarray(self.cluster_ids)[np.argmin(distances, axis=1)]
+
+    def approximate(self, X):
+        import hdbscan
+        if self._predictor is None:
+            with open(os.path.join(self.model_dir, "predictor.pkl"), "rb") as f:
+                self._predictor = pickle.load(f)
+        embedding = self._predictor["umap"].transform(X)
+        labels, _ = hdbscan.approximate_predict(self._predictor["hdbscan"], embedding)
+        return labels
+
+
+def load_model(model_dir=None):
+    # Process-wide model, reloaded when a new clustering run replaces model.json
+    global _model
+    model_dir = model_dir or config.CLUSTER_MODEL_DIR
+    try:
+        mtime = os.stat(os.path.join(model_dir, "model.json")).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    model = _model
+    if model is None or model.model_dir != model_dir or model.mtime != mtime:
+        with _lock:
+            if _model is None or _model.model_dir != model_dir or _model.mtime != mtime:
+                _model = ClusterModel(model_dir, mtime)
+            model = _model
+    return model
+
+
+def assign_clusters(categories, price, sales, rating, method="nearest", model_dir=None):
+    # Vectorized assignment for many products; unknown categories go to the fallback cluster
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}")
+    model = load_model(model_dir)
+    if model is None:
+        raise FileNotFoundError(
+            f"No clustering model in {model_dir or config.CLUSTER_MODEL_DIR}; run python -m Clustering.cluster_pipeline"
+        )
+    X, known = model.scale_features(list(categories), price, sales, rating)
+    labels = model.nearest(X) if method == "nearest" else model.approximate(X)
+    return np.where(known, labels, NOISE).astype(np.int64)
+
+
+def assign_cluster(category, price, sales, rating, method="nearest", model_dir=None):
+    # Single product; returns None when no model has been saved yet
+    try:
+        return int(assign_clusters([category], [price], [sales], [rating], method, model_dir)[0])
+    except FileNotFoundError:
+        return None
+
+
+def save_model(model_dir, scaler, categories, X_scaled, labels, run_details, predictor=None):
+    # Called by cluster_pipeline.py; prototypes are the per-cluster means of the non-noise rows
+    os.makedirs(model_dir, exist_ok=True)
+    mask = labels != NOISE
+    cluster_ids, inverse = np.unique(labels[mask], return_inverse=True)
+    counts = np.bincount(inverse).astype(np.float64)
+    prototypes = np.empty((len(cluster_ids), X_scaled.shape[1]), dtype=np.float32)
+    for j in range(X_scaled.shape[1]):
+        prototypes[:, j] = np.bincount(inverse, weights=X_scaled[mask, j], minlength=len(cluster_ids)) / counts
+
+    arrays = {
+        "scaler.npy": np.vstack([scaler.mean_, scaler.scale_]).astype(np.float32),
+        "prototypes.npy": prototypes,
+        "cluster_ids.npy": cluster_ids.astype(np.int32),
+    }
+    for name, values in arrays.items():
+        tmp = os.path.join(model_dir, name + ".tmp.npy")
+        np.save(tmp, values)
+        os.replace(tmp, os.path.join(model_dir, name))
+
+    if predictor is not None:
+        tmp = os.path.join(model_dir, "predictor.pkl.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(predictor, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, os.path.join(model_dir, "predictor.pkl"))
+    elif os.path.exists(os.path.join(model_dir, "predictor.pkl")):
+        os.remove(os.path.join(model_dir, "predictor.pkl"))    # belongs to an earlier run
+
+    # model.json last: readers reload when it changes
+    tmp = os.path.join(model_dir, "model.json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"categories": list(categories), "clusters": len(cluster_ids), **run_details}, f)
+    os.replace(tmp, os.path.join(model_dir, "model.json"))
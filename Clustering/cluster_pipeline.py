@@ -0,0 +1,313 @@
+# Command-line version of clustering_model.ipynb: scale, drop outliers with an
+# IsolationForest, embed with UMAP, pick HDBSCAN parameters by silhouette score
+# and write the labels straight to Products.cluster_id.
+#
+#   python -m Clustering.cluster_pipeline                   # cluster the catalog in the database
+#   python -m Clustering.cluster_pipeline --csv Clustering/dataset_dbms.csv --dry-run
+#   python -m Clustering.cluster_pipeline --workers 16 --silhouette-sample 20000
+#
+# The UMAP embedding is the slow step and depends only on the input and the UMAP
+# settings, so it is cached under Clustering/cache/ keyed by a hash of both. The
+# grid is searched in a process pool; workers memory-map the cached embedding
+# instead of receiving a copy of it. After the labels are written, the model used
+# by Clustering/assign.py to place new products is saved to the model directory.
+import argparse
+import hashlib
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+import cx_Oracle
+import hdbscan
+import numpy as np
+import pandas as pd
+import umap
+from sklearn.ensemble import IsolationForest
+from sklearn.metrics import silhouette_score
+from sklearn.preprocessing import StandardScaler
+from Admin.Clusters.update_product_cluster import reassign_product_clusters
+from Clustering.assign import save_model
+from Database import config, pool
+from Database.fetch import tune_cursor, fetch_dataframe
+
+CACHE_DIR = os.path.join("Clustering", "cache")
+FEATURES = ['price', 'sales', 'popularity_score', 'category_encoded']
+NOISE = -1      # HDBSCAN noise and IsolationForest outliers share the fallback cluster
+
+CONTAMINATION = 0.03
+UMAP_PARAMS = {"n_neighbors": 2, "min_dist": 0.03, "n_components": 1}
+PARAM_GRID = {
+    'min_cluster_size': [3, 5, 10, 15, 20, 25, 30],
+    'min_samples': [1, 2, 3, 4, 5, 6],
+}
+CLUSTER_SELECTION_EPSILON = 0.1
+SILHOUETTE_SAMPLE = 20000   # silhouette is O(n^2); larger inputs are scored on a random sample
+SEED = 42
+
+PRODUCTS_SQL = """
+    SELECT product_id, category, price, sales, rating AS popularity_score
+    FROM Products
+    ORDER BY product_id
+"""
+PRODUCT_DTYPES = {
+    "PRODUCT_ID": "int64",
+    "CATEGORY": "category",
+    "PRICE": "float32",
+    "SALES": "float32",
+    "POPULARITY_SCORE": "float32",
+}
+
+
+def load_products(csv_path=None):
+    # Products from the database, or from a CSV with the notebook's columns
+    if csv_path:
+        df = pd.read_csv(csv_path, usecols=['product_id', 'category', 'price', 'sales', 'popularity_score'])
+        df = df.dropna()
+        df['category'] = df['category'].astype('category')
+        return df
+
+    with pool.get_connection() as conn:
+        cursor = tune_cursor(conn.cursor(), 10000)
+        cursor.execute(PRODUCTS_SQL)
+        df = fetch_dataframe(cursor, dtypes=PRODUCT_DTYPES)
+    df.columns = [c.lower() for c in df.columns]
+    return df.dropna()
+
+
+def feature_matrix(df, categories=None):
+    # float32 (n, 4) matrix; categories are coded in sorted order, as .cat.codes did in the notebook
+    categories = sorted(df['category'].unique()) if categories is None else list(categories)
+    codes = pd.Categorical(df['category'], categories=categories).codes
+    X = np.empty((len(df), len(FEATURES)), dtype=np.float32)
+    X[:, 0] = df['price'].to_numpy(dtype=np.float32)
+    X[:, 1] = df['sales'].to_numpy(dtype=np.float32)
+    X[:, 2] = df['popularity_score'].to_numpy(dtype=np.float32)
+    X[:, 3] = codes
+    return X, categories
+
+
+def remove_outliers(X, contamination=CONTAMINATION, seed=SEED):
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X).astype(np.float32, copy=False)
+    iso = IsolationForest(contamination=contamination, random_state=seed, n_jobs=-1)
+    inliers = iso.fit_predict(X_scaled) == 1
+    return scaler, iso, X_scaled, inliers
+
+
+def embedding_path(X, umap_params, seed, cache_dir=CACHE_DIR):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(X).tobytes())
+    digest.update(repr(sorted(umap_params.items())).encode())
+    digest.update(str(seed).encode())
+    return os.path.join(cache_dir, f"umap_{digest.hexdigest()}.npy")
+
+
+def embed(X, umap_params=UMAP_PARAMS, seed=SEED, cache_dir=CACHE_DIR):
+    # Returns the path of the cached float32 embedding, fitting UMAP only on a cache miss.
+    # The fitted UMAP model is pickled next to it (same name, .pkl) for approximate prediction.
+    path = embedding_path(X, umap_params, seed, cache_dir)
+    if os.path.exists(path):
+        print(f"⏭️ Reusing cached embedding {path}")
+        return path
+
+    start = time.perf_counter()
+    reducer = umap.UMAP(random_state=seed, low_memory=True, **umap_params)
+    X_umap = reducer.fit_transform(X)
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(path[:-len(".npy")] + ".pkl", "wb") as f:
+        pickle.dump(reducer, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp = path + ".tmp.npy"
+    np.save(tmp, X_umap.astype(np.float32))
+    os.replace(tmp, path)
+    print(f"✅ UMAP embedding of {len(X)} rows in {time.perf_counter() - start:.1f} s -> {path}")
+    return path
+
+
+def silhouette(X, labels, sample_size=SILHOUETTE_SAMPLE, seed=SEED):
+    # Silhouette over non-noise points; None when fewer than two clusters remain
+    mask = labels != NOISE
+    if len(np.unique(labels[mask])) < 2:
+        return None
+    X, labels = X[mask], labels[mask]
+    if sample_size and len(labels) > sample_size:
+        return float(silhouette_score(X, labels, sample_size=sample_size, random_state=seed))
+    return float(silhouette_score(X, labels))
+
+
+def fit_hdbscan(X, min_cluster_size, min_samples, prediction_data=False):
+    return hdbscan.HDBSCAN(
+        min_cluster_size=min_cluster_size,
+        min_samples=min_samples,
+        cluster_selection_epsilon=CLUSTER_SELECTION_EPSILON,
+        core_dist_n_jobs=1,
+        prediction_data=prediction_data,
+    ).fit(X)
+
+
+# === Process-pool side ===
+_embedding = None
+_sample_size = SILHOUETTE_SAMPLE
+
+
+def _init_worker(path, sample_size):
+    global _embedding, _sample_size
+    _embedding = np.load(path, mmap_mode='r')
+    _sample_size = sample_size
+
+
+def score_params(min_cluster_size, min_samples):
+    start = time.perf_counter()
+    labels = fit_hdbscan(_embedding, min_cluster_size, min_samples).labels_
+    return {
+        "min_cluster_size": min_cluster_size,
+        "min_samples": min_samples,
+        "score": silhouette(_embedding, labels, _sample_size),
+        "clusters": int(labels.max()) + 1,
+        "noise": int((labels == NOISE).sum()),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def search_grid(path, grid=PARAM_GRID, workers=None, sample_size=SILHOUETTE_SAMPLE):
+    # Scores every (min_cluster_size, min_samples) pair; returns results best first
+    combos = list(product(grid['min_cluster_size'], grid['min_samples']))
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(path, sample_size)) as executor:
+        futures = [executor.submit(score_params, mcs, ms) for mcs, ms in combos]
+        for future in as_completed(futures):
+            r = future.result()
+            results.append(r)
+            score = "n/a" if r["score"] is None else f"{r['score']:.4f}"
+            print(f"[grid {len(results)}/{len(combos)}] min_cluster_size={r['min_cluster_size']} "
+                  f"min_samples={r['min_samples']}: silhouette={score}, {r['clusters']} clusters, "
+                  f"{r['noise']} noise ({r['seconds']:.1f} s)")
+    return sorted((r for r in results if r["score"] is not None), key=lambda r: r["score"], reverse=True)
+
+
+def write_labels(product_ids, labels, prune=True, chunk_rows=None):
+    # Creates any new cluster rows, moves products with bulk reassignments (the
+    # triggers recompute counts and averages), then drops clusters left empty.
+    # With chunk_rows, each slice of that many products is its own transaction, which
+    # keeps memory bounded for memory-mapped inputs.
+    chunk_rows = chunk_rows or len(labels)
+    cluster_ids = {NOISE}
+    for start in range(0, len(labels), chunk_rows):
+        cluster_ids.update(int(c) for c in np.unique(labels[start:start + chunk_rows]))
+    cluster_ids = sorted(cluster_ids)
+    with pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.setinputsizes(int)
+        cursor.executemany("""
+            MERGE INTO Clusters c
+            USING (SELECT :1 AS cluster_id FROM dual) src
+            ON (c.cluster_id = src.cluster_id)
+            WHEN NOT MATCHED THEN INSERT (cluster_id) VALUES (src.cluster_id)
+        """, [(c,) for c in cluster_ids])
+        conn.commit()
+
+    result = {"moved": 0, "unchanged": 0, "failures": []}
+    for start in range(0, len(labels), chunk_rows):
+        part = reassign_product_clusters(list(zip(
+            np.asarray(product_ids[start:start + chunk_rows]).tolist(),
+            np.asarray(labels[start:start + chunk_rows]).tolist(),
+        )))
+        if "error" in part:
+            return part
+        for key in ("moved", "unchanged", "failures"):
+            result[key] += part[key]
+    result["success"] = (f"✅ {result['moved']} products reassigned, {result['unchanged']} already in place, "
+                         f"{len(result['failures'])} failed.")
+    if not prune:
+        return result
+
+    with pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            DELETE FROM Clusters c
+            WHERE c.cluster_id != :noise
+              AND NOT EXISTS (SELECT 1 FROM Products p WHERE p.cluster_id = c.cluster_id)
+        """, noise=NOISE)
+        result["pruned"] = cursor.rowcount
+        conn.commit()
+    return result
+
+
+def run(csv_path=None, workers=None, sample_size=SILHOUETTE_SAMPLE, cache_dir=CACHE_DIR, dry_run=False, prune=True,
+        model_dir=None, save_predictor=False):
+    start = time.perf_counter()
+    df = load_products(csv_path)
+    X, categories = feature_matrix(df)
+    print(f"✅ {len(df)} products, {len(categories)} categories ({time.perf_counter() - start:.1f} s)")
+
+    scaler, iso, X_scaled, inliers = remove_outliers(X)
+    print(f"✅ {int((~inliers).sum())} outliers removed")
+
+    path = embed(X_scaled[inliers], cache_dir=cache_dir)
+    ranked = search_grid(path, workers=workers, sample_size=sample_size)
+    if not ranked:
+        raise SystemExit("❌ No parameter combination produced at least two clusters.")
+    best = ranked[0]
+    print(f"✅ Best silhouette {best['score']:.4f} with min_cluster_size={best['min_cluster_size']}, "
+          f"min_samples={best['min_samples']}")
+
+    clusterer = fit_hdbscan(np.load(path, mmap_mode='r'), best['min_cluster_size'], best['min_samples'],
+                            prediction_data=save_predictor)
+    labels = np.full(len(df), NOISE, dtype=np.int32)
+    labels[inliers] = clusterer.labels_
+
+    run_info = {
+        "products": len(df), "categories": categories, "best": best, "grid": ranked,
+        "product_ids": df['product_id'].to_numpy(), "labels": labels,
+    }
+    if not dry_run:
+        result = write_labels(run_info["product_ids"], labels, prune)
+        run_info["write"] = result
+        if "error" in result:
+            print(result["error"])
+            return run_info
+        print(result["success"] + (f" {result['pruned']} empty clusters removed." if "pruned" in result else ""))
+
+        model_dir = model_dir or config.CLUSTER_MODEL_DIR
+        predictor = None
+        umap_path = path[:-len(".npy")] + ".pkl"
+        if save_predictor and os.path.exists(umap_path):
+            with open(umap_path, "rb") as f:
+                predictor = {"umap": pickle.load(f), "hdbscan": clusterer}
+        elif save_predictor:
+            print(f"⚠️ {umap_path} is missing; clear {cache_dir} to refit UMAP and save the predictor")
+        details = {k: best[k] for k in ("min_cluster_size", "min_samples", "score")}
+        save_model(model_dir, scaler, categories, X_scaled[inliers], labels[inliers],
+                   {"products": len(df), **details}, predictor)
+        print(f"✅ Assignment model saved to {model_dir}")
+    print(f"🏁 Done in {time.perf_counter() - start:.1f} s")
+    return run_info
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-cluster the product catalog")
+    parser.add_argument("--csv", help="read products from this CSV instead of the database")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="grid-search processes")
+    parser.add_argument("--silhouette-sample", type=int, default=SILHOUETTE_SAMPLE,
+                        help="score silhouettes on this many points (0 = all)")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="where UMAP embeddings are cached")
+    parser.add_argument("--dry-run", action="store_true", help="search and report without writing labels")
+    parser.add_argument("--keep-empty", action="store_true", help="keep clusters that end up with no products")
+    parser.add_argument("--model-dir", help="where the assignment model is saved (default: cluster_model_dir)")
+    parser.add_argument("--save-predictor", action="store_true",
+                        help="also save UMAP + HDBSCAN models for method='hdbscan' assignment")
+    args = parser.parse_args(argv)
+
+    try:
+        run_info = run(args.csv, args.workers, args.silhouette_sample, args.cache_dir, args.dry_run, not args.keep_empty,
+                       args.model_dir, args.save_predictor)
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        print(f"❌ Database error: {error.message}")
+        return 1
+    return 1 if "error" in run_info.get("write", {}) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
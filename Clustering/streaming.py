@@ -0,0 +1,244 @@
+# Out-of-core variant of cluster_pipeline.py for catalogs that do not fit in memory.
+#
+#   python -m Clustering.streaming --memory-mb 1024 --sample-size 200000
+#   python -m Clustering.streaming --csv extract.csv --assign hdbscan --dry-run
+#
+# Nothing here holds the whole catalog in RAM:
+#   1. features are streamed (database cursor or CSV chunks) into float32 memory-mapped files
+#   2. the scaler and the IsolationForest are fitted on a random sample
+#   3. the full set is scaled and screened for outliers chunk by chunk, into another memmap
+#   4. UMAP + the HDBSCAN grid search run on a sample of the inliers only
+#   5. every other product is assigned in chunks, by nearest prototype or HDBSCAN approximate prediction
+# Chunk sizes follow --memory-mb; the clustering sample is the only other large in-memory array.
+import argparse
+import os
+import pickle
+import shutil
+import sys
+import time
+import cx_Oracle
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+from sklearn.preprocessing import StandardScaler
+from Clustering.assign import load_model, save_model
+from Clustering.cluster_pipeline import (
+    CACHE_DIR, CONTAMINATION, FEATURES, NOISE, PRODUCTS_SQL, SEED, SILHOUETTE_SAMPLE,
+    embed, fit_hdbscan, search_grid, write_labels,
+)
+from Database import config, pool
+from Database.fetch import tune_cursor
+
+MEMORY_MB = 512
+SAMPLE_SIZE = 200000        # products clustered directly; the rest are assigned
+FIT_SAMPLE_SIZE = 1000000   # products used to fit the scaler and outlier model
+ROW_BYTES = 256             # rough per-row cost of a chunk while it is parsed and transformed
+WORK_DIR = os.path.join(CACHE_DIR, "stream")
+ASSIGN_METHODS = ("nearest", "hdbscan")
+
+
+def chunk_rows_for(memory_mb):
+    return max(10000, memory_mb * 2**20 // ROW_BYTES)
+
+
+class FeatureStore:
+    # Append-only float32 feature rows plus int64 product ids, spilled to disk as they arrive.
+    # Categories are coded in first-seen order while streaming and recoded to sorted order later.
+    def __init__(self, work_dir):
+        os.makedirs(work_dir, exist_ok=True)
+        self.work_dir = work_dir
+        self.category_index = {}
+        self.rows = 0
+        self._features = open(self.path("features.f32"), "wb")
+        self._ids = open(self.path("product_ids.i64"), "wb")
+
+    def path(self, name):
+        return os.path.join(self.work_dir, name)
+
+    def append(self, df):
+        df = df.dropna()
+        categories = pd.Categorical(df['category'])
+        to_global = np.array([self.category_index.setdefault(c, len(self.category_index))
+                              for c in categories.categories], dtype=np.float32)
+        X = np.empty((len(df), len(FEATURES)), dtype=np.float32)
+        X[:, 0] = df['price'].to_numpy(dtype=np.float32)
+        X[:, 1] = df['sales'].to_numpy(dtype=np.float32)
+        X[:, 2] = df['popularity_score'].to_numpy(dtype=np.float32)
+        X[:, 3] = to_global[categories.codes]
+        self._features.write(X.tobytes())
+        self._ids.write(df['product_id'].to_numpy(dtype=np.int64).tobytes())
+        self.rows += len(df)
+
+    def close(self):
+        self._features.close()
+        self._ids.close()
+        # Sorted category order matches feature_matrix() in cluster_pipeline.py
+        self.categories = sorted(self.category_index)
+        self.recode = np.empty(len(self.categories), dtype=np.float32)
+        for code, category in enumerate(self.categories):
+            self.recode[self.category_index[category]] = code
+        self.features = np.memmap(self.path("features.f32"), dtype=np.float32, mode="r",
+                                  shape=(self.rows, len(FEATURES)))
+        self.product_ids = np.memmap(self.path("product_ids.i64"), dtype=np.int64, mode="r", shape=(self.rows,))
+
+    def raw(self, index):
+        # Rows (slice or sorted index array) with sorted category codes
+        X = np.array(self.features[index])
+        X[:, 3] = self.recode[X[:, 3].astype(np.int64)]
+        return X
+
+    def memmap(self, name, dtype, shape):
+        return np.memmap(self.path(name), dtype=dtype, mode="w+", shape=shape)
+
+
+def stream_products(store, chunk_rows, csv_path=None):
+    if csv_path:
+        columns = ['product_id', 'category', 'price', 'sales', 'popularity_score']
+        for chunk in pd.read_csv(csv_path, usecols=columns, chunksize=chunk_rows):
+            store.append(chunk)
+        return
+
+    with pool.get_connection() as conn:
+        cursor = tune_cursor(conn.cursor(), min(chunk_rows, 50000))
+        cursor.execute(PRODUCTS_SQL)
+        columns = [d[0].lower() for d in cursor.description]
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+            store.append(pd.DataFrame(rows, columns=columns))
+
+
+def random_rows(rng, n, size):
+    # Sorted random row numbers, so memmap reads go front to back
+    return np.sort(rng.choice(n, size=min(n, size), replace=False))
+
+
+def run(csv_path=None, memory_mb=MEMORY_MB, sample_size=SAMPLE_SIZE, fit_sample_size=FIT_SAMPLE_SIZE,
+        assign="nearest", workers=None, silhouette_sample=SILHOUETTE_SAMPLE, work_dir=WORK_DIR,
+        model_dir=None, dry_run=False, prune=True, keep_work=False):
+    start = time.perf_counter()
+    rng = np.random.default_rng(SEED)
+    chunk_rows = chunk_rows_for(memory_mb)
+    model_dir = model_dir or config.CLUSTER_MODEL_DIR
+    if dry_run:
+        model_dir = os.path.join(work_dir, "model")    # the live model must match the labels in the database
+
+    # 1. Spill features to disk
+    store = FeatureStore(work_dir)
+    stream_products(store, chunk_rows, csv_path)
+    store.close()
+    n = store.rows
+    print(f"✅ {n} products, {len(store.categories)} categories streamed in {chunk_rows}-row chunks "
+          f"({time.perf_counter() - start:.1f} s)")
+
+    # 2. Scaler and outlier model from a sample
+    X_fit = store.raw(random_rows(rng, n, fit_sample_size))
+    scaler = StandardScaler().fit(X_fit)
+    iso = IsolationForest(contamination=CONTAMINATION, random_state=SEED, n_jobs=-1)
+    iso.fit(scaler.transform(X_fit).astype(np.float32))
+    del X_fit
+
+    # 3. Scale and screen everything, chunk by chunk
+    scaled = store.memmap("scaled.f32", np.float32, (n, len(FEATURES)))
+    inliers = store.memmap("inliers.bool", np.bool_, (n,))
+    for lo in range(0, n, chunk_rows):
+        X = scaler.transform(store.raw(slice(lo, lo + chunk_rows))).astype(np.float32)
+        scaled[lo:lo + len(X)] = X
+        inliers[lo:lo + len(X)] = iso.predict(X) == 1
+    scaled.flush()
+    inliers.flush()
+    print(f"✅ {n - int(inliers.sum())} outliers screened out")
+
+    # 4. Cluster a sample of the inliers; oversample to allow for the outliers dropped
+    candidates = random_rows(rng, n, int(sample_size / (1 - CONTAMINATION) * 1.05))
+    sample_rows = candidates[inliers[candidates]]
+    if len(sample_rows) > sample_size:
+        sample_rows = np.sort(rng.choice(sample_rows, size=sample_size, replace=False))
+    X_sample = np.array(scaled[sample_rows])
+    path = embed(X_sample)
+    ranked = search_grid(path, workers=workers, sample_size=silhouette_sample)
+    if not ranked:
+        raise SystemExit("❌ No parameter combination produced at least two clusters.")
+    best = ranked[0]
+    print(f"✅ Best silhouette {best['score']:.4f} on {len(sample_rows)} sampled products with "
+          f"min_cluster_size={best['min_cluster_size']}, min_samples={best['min_samples']}")
+    clusterer = fit_hdbscan(np.load(path, mmap_mode='r'), best['min_cluster_size'], best['min_samples'],
+                            prediction_data=(assign == "hdbscan"))
+
+    predictor = None
+    umap_path = path[:-len(".npy")] + ".pkl"
+    if assign == "hdbscan" and not os.path.exists(umap_path):
+        print(f"⚠️ {umap_path} is missing; assigning by nearest prototype instead")
+        assign = "nearest"
+    if assign == "hdbscan":
+        with open(umap_path, "rb") as f:
+            predictor = {"umap": pickle.load(f), "hdbscan": clusterer}
+    details = {k: best[k] for k in ("min_cluster_size", "min_samples", "score")}
+    save_model(model_dir, scaler, store.categories, X_sample, clusterer.labels_,
+               {"products": n, "sampled": len(sample_rows), **details}, predictor)
+    model = load_model(model_dir)
+    del X_sample
+
+    # 5. Assign everyone else in chunks; sampled products keep their own HDBSCAN labels
+    labels = store.memmap("labels.i32", np.int32, (n,))
+    for lo in range(0, n, chunk_rows):
+        X = np.array(scaled[lo:lo + chunk_rows])
+        mask = np.array(inliers[lo:lo + len(X)])
+        chunk_labels = np.full(len(X), NOISE, dtype=np.int32)
+        if mask.any():
+            chunk_labels[mask] = model.nearest(X[mask]) if assign == "nearest" else model.approximate(X[mask])
+        labels[lo:lo + len(X)] = chunk_labels
+        print(f"[assign] {min(lo + chunk_rows, n)}/{n}")
+    labels[sample_rows] = clusterer.labels_
+    labels.flush()
+
+    run_info = {"products": n, "sampled": len(sample_rows), "categories": store.categories,
+                "best": best, "grid": ranked, "model_dir": model_dir}
+    if not dry_run:
+        result = write_labels(store.product_ids, labels, prune, chunk_rows)
+        run_info["write"] = result
+        if "error" in result:
+            print(result["error"])
+            return run_info
+        print(result["success"] + (f" {result['pruned']} empty clusters removed." if "pruned" in result else ""))
+        print(f"✅ Assignment model saved to {model_dir}")
+
+    if not keep_work:
+        del scaled, inliers, labels, store
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print(f"🏁 Done in {time.perf_counter() - start:.1f} s")
+    return run_info
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-cluster a catalog that does not fit in memory")
+    parser.add_argument("--csv", help="read products from this CSV instead of the database")
+    parser.add_argument("--memory-mb", type=int, default=MEMORY_MB, help="memory budget for streamed chunks")
+    parser.add_argument("--sample-size", type=int, default=SAMPLE_SIZE, help="products clustered directly")
+    parser.add_argument("--fit-sample-size", type=int, default=FIT_SAMPLE_SIZE,
+                        help="products used to fit the scaler and outlier model")
+    parser.add_argument("--assign", choices=ASSIGN_METHODS, default="nearest",
+                        help="how products outside the sample get their cluster")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="grid-search processes")
+    parser.add_argument("--silhouette-sample", type=int, default=SILHOUETTE_SAMPLE)
+    parser.add_argument("--work-dir", default=WORK_DIR, help="where the memory-mapped arrays are kept")
+    parser.add_argument("--model-dir", help="where the assignment model is saved (default: cluster_model_dir)")
+    parser.add_argument("--dry-run", action="store_true", help="cluster and report without writing labels")
+    parser.add_argument("--keep-empty", action="store_true", help="keep clusters that end up with no products")
+    parser.add_argument("--keep-work", action="store_true", help="keep the memory-mapped arrays afterwards")
+    args = parser.parse_args(argv)
+
+    try:
+        run_info = run(args.csv, args.memory_mb, args.sample_size, args.fit_sample_size, args.assign, args.workers,
+                       args.silhouette_sample, args.work_dir, args.model_dir, args.dry_run, not args.keep_empty,
+                       args.keep_work)
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        print(f"❌ Database error: {error.message}")
+        return 1
+    return 1 if "error" in run_info.get("write", {}) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+import threading
+import time
+from collections import namedtuple
+from Database import config, pool
+
+# Process-wide copy of the selectbox lists, shared by every Streamlit session
+CatalogSnapshot = namedtuple("CatalogSnapshot", ["version", "product_names", "category_names", "cluster_ids", "supplier_names"])
+
+# One read-consistent query returns all four lists plus the version they belong to
+SNAPSHOT_SQL = """
+    SELECT 'PRODUCT' AS kind, name AS text_value, NULL AS num_value FROM Products
+    UNION ALL
+    SELECT 'CATEGORY', category, NULL FROM (SELECT DISTINCT category FROM Products)
+    UNION ALL
+    SELECT 'CLUSTER', NULL, cluster_id FROM (SELECT DISTINCT cluster_id FROM Products)
+    UNION ALL
+    SELECT 'SUPPLIER', name, NULL FROM Suppliers
+    UNION ALL
+    SELECT 'VERSION', NULL, version FROM Catalog_Version WHERE id = 1
+    ORDER BY 1, 2, 3
+"""
+
+VERSION_SQL = "SELECT version FROM Catalog_Version WHERE id = 1"
+
+_snapshot = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _load_snapshot(cursor):
+    cursor.arraysize = 5000
+    cursor.execute(SNAPSHOT_SQL)
+    lists = {"PRODUCT": [], "CATEGORY": [], "CLUSTER": [], "SUPPLIER": []}
+    version = None
+    for kind, text_value, num_value in cursor:
+        if kind == "VERSION":
+            version = num_value
+        elif kind == "CLUSTER":
+            lists[kind].append(num_value)
+        else:
+            lists[kind].append(text_value)
+    return CatalogSnapshot(
+        version=version,
+        product_names=tuple(lists["PRODUCT"]),
+        category_names=tuple(lists["CATEGORY"]),
+        cluster_ids=tuple(lists["CLUSTER"]),
+        supplier_names=tuple(lists["SUPPLIER"]),
+    )
+
+
+def get_snapshot():
+    # Reloads only when the trigger-maintained version has moved; otherwise costs at most
+    # one single-row lookup every CATALOG_CHECK_INTERVAL seconds
+    global _snapshot, _checked_at
+    with _lock:
+        now = time.monotonic()
+        if _snapshot is not None and now - _checked_at < config.CATALOG_CHECK_INTERVAL:
+            return _snapshot
+
+        with pool.get_connection() as conn:
+            cursor = conn.cursor()
+            if _snapshot is not None:
+                cursor.execute(VERSION_SQL)
+                row = cursor.fetchone()
+                if row and row[0] == _snapshot.version:
+                    _checked_at = now
+                    return _snapshot
+            _snapshot = _load_snapshot(cursor)
+            _checked_at = now
+        return _snapshot
+
+
+def invalidate():
+    global _snapshot
+    with _lock:
+        _snapshot = None
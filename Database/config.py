@@ -0,0 +1,39 @@
+import cx_Oracle
+import os
+from dotenv import load_dotenv
+
+# Single place where .env is read; importing this module never touches the network
+load_dotenv()
+
+# === DB connection setup ===
+DB_HOST = os.getenv("db_host", "localhost")
+DB_PORT = int(os.getenv("db_port", 1521))
+DB_SERVICE = os.getenv("db_service", "orcl")
+
+dsn = cx_Oracle.makedsn(DB_HOST, DB_PORT, service_name=DB_SERVICE)
+username = os.getenv("db_username")
+password = os.getenv("db_password")
+
+# === Pool settings ===
+POOL_MIN = int(os.getenv("db_pool_min", 1))
+POOL_MAX = int(os.getenv("db_pool_max", 8))
+POOL_INCREMENT = int(os.getenv("db_pool_increment", 1))
+STMT_CACHE_SIZE = int(os.getenv("db_stmt_cache_size", 40))
+PING_INTERVAL = int(os.getenv("db_pool_ping_interval", 60))          # seconds idle before a session is pinged on acquire
+ACQUIRE_TIMEOUT = int(os.getenv("db_pool_acquire_timeout", 5000))    # milliseconds to wait for a free session
+IDLE_TIMEOUT = int(os.getenv("db_pool_idle_timeout", 300))           # seconds before idle sessions above min are closed
+
+# === Catalog cache ===
+CATALOG_CHECK_INTERVAL = float(os.getenv("catalog_check_interval", 1.0))  # seconds between catalog version checks
+
+# === Similarity recommender ===
+SIMILARITY_REFRESH_INTERVAL = float(os.getenv("similarity_refresh_interval", 5.0))  # seconds between change-log reads
+
+# === Clustering ===
+CLUSTER_MODEL_DIR = os.getenv("cluster_model_dir", os.path.join("Clustering", "model"))  # written by Clustering/cluster_pipeline.py
+
+# === Write-behind purchases (User/Transactions/conduct.py) ===
+TX_WRITE_BEHIND = os.getenv("tx_write_behind", "false").lower() in ("1", "true", "yes")
+TX_LOG_PATH = os.getenv("tx_log_path", os.path.join("User", "Transactions", "write_behind.log"))
+TX_FLUSH_INTERVAL = float(os.getenv("tx_flush_interval", 0.5))   # seconds between micro-batch flushes
+TX_FLUSH_ROWS = int(os.getenv("tx_flush_rows", 500))             # flush early once this many purchases are waiting
@@ -0,0 +1,116 @@
+import cx_Oracle
+import time
+from array import array
+import numpy as np
+import pandas as pd
+
+# Rows per round trip when reading result sets
+FETCH_ARRAYSIZE = 1000
+
+
+def fetch_refcursor(cursor, function_name, args, record_type, arraysize=FETCH_ARRAYSIZE):
+    # Calls a PL/SQL function that returns a SYS_REFCURSOR and reads it in arrays of `arraysize` rows
+    ref_cursor = cursor.callfunc(function_name, cx_Oracle.CURSOR, args)
+    try:
+        ref_cursor.arraysize = arraysize
+        ref_cursor.rowfactory = record_type
+        return ref_cursor.fetchall()
+    finally:
+        ref_cursor.close()
+
+
+def tune_cursor(cursor, arraysize=FETCH_ARRAYSIZE):
+    # Call before execute(): prefetchrows only applies to the next statement
+    cursor.arraysize = arraysize
+    cursor.prefetchrows = arraysize + 1
+    return cursor
+
+
+class _CategoryBuffer:
+    # Dictionary-encodes values as they arrive so each distinct string is kept once
+    def __init__(self):
+        self.codes = array("i")
+        self.index = {}
+
+    def extend(self, values):
+        index = self.index
+        self.codes.extend(-1 if v is None else index.setdefault(v, len(index)) for v in values)
+
+    def finish(self):
+        codes = np.frombuffer(self.codes, dtype=np.int32) if len(self.codes) else np.empty(0, dtype=np.int32)
+        return pd.Categorical.from_codes(codes, categories=list(self.index))
+
+
+class _NumericBuffer:
+    # Packs each batch into a typed array right away. NULLs become NaN in float columns; in
+    # integer columns they are masked and the column comes back as the pandas nullable type
+    # (Int8, Int32, ...) instead of failing the fetch.
+    def __init__(self, dtype):
+        self.dtype = np.dtype(dtype)
+        self.chunks = []
+        self.masks = []     # per chunk, None when the chunk has no NULLs
+
+    def extend(self, values):
+        if self.dtype.kind in "iu" and None in values:
+            self.masks.append(np.array([v is None for v in values]))
+            values = [0 if v is None else v for v in values]
+        else:
+            self.masks.append(None)
+        self.chunks.append(np.array(values, dtype=self.dtype))
+
+    def finish(self):
+        if not self.chunks:
+            return np.empty(0, dtype=self.dtype)
+        data = np.concatenate(self.chunks)
+        if all(mask is None for mask in self.masks):
+            return data
+        mask = np.concatenate([np.zeros(len(chunk), dtype=bool) if mask is None else mask
+                               for chunk, mask in zip(self.chunks, self.masks)])
+        return pd.arrays.IntegerArray(data, mask)
+
+
+class _ObjectBuffer:
+    def __init__(self, dtype=None):
+        self.dtype = dtype
+        self.values = []
+
+    def extend(self, values):
+        self.values.extend(values)
+
+    def finish(self):
+        return pd.Series(self.values, dtype=self.dtype)
+
+
+def _make_buffer(dtype):
+    if dtype == "category":
+        return _CategoryBuffer()
+    if dtype is not None and np.dtype(dtype).kind in "iuf":
+        return _NumericBuffer(dtype)
+    return _ObjectBuffer(dtype)
+
+
+def fetch_dataframe(cursor, columns=None, dtypes=None):
+    # Streams an executed cursor batch by batch (cursor.arraysize rows per round trip) into
+    # per-column buffers, so the full result never exists as a list of row tuples.
+    # `dtypes` maps column name -> "category", a numpy dtype such as "int32", or any pandas dtype.
+    # Fetch statistics are left in df.attrs (rows, fetch_seconds, rows_per_second).
+    start = time.perf_counter()
+    names = columns or [d[0] for d in cursor.description]
+    dtypes = dtypes or {}
+    buffers = [_make_buffer(dtypes.get(name)) for name in names]
+
+    rows = 0
+    while True:
+        batch = cursor.fetchmany()
+        if not batch:
+            break
+        rows += len(batch)
+        for buffer, values in zip(buffers, zip(*batch)):
+            buffer.extend(values)
+
+    df = pd.DataFrame({name: buffer.finish() for name, buffer in zip(names, buffers)})
+    elapsed = time.perf_counter() - start
+    df.attrs["rows"] = rows
+    df.attrs["fetch_seconds"] = elapsed
+    df.attrs["rows_per_second"] = rows / elapsed if elapsed > 0 else float(rows)
+    return df
@@ -0,0 +1,38 @@
+# Lines fetched per DBMS_OUTPUT.GET_LINES call (one round trip each)
+LINES_PER_CALL = 100
+# Bytes reserved per fetched line; the procedures here print short report lines
+LINE_SIZE = 4000
+# Largest bounded DBMS_OUTPUT buffer Oracle accepts
+MAX_BUFFER_SIZE = 1000000
+
+
+def enable_output(cursor, buffer_size=MAX_BUFFER_SIZE):
+    # DISABLE purges lines a previous user of this pooled session may have left behind.
+    # Size the buffer to the expected output: it stays allocated in the pooled session.
+    cursor.execute("""
+        BEGIN
+            DBMS_OUTPUT.DISABLE;
+            DBMS_OUTPUT.ENABLE(:buffer_size);
+        END;
+    """, buffer_size=buffer_size)
+
+
+def drain_output(cursor, lines_per_call=LINES_PER_CALL):
+    lines_var = cursor.arrayvar(str, lines_per_call, LINE_SIZE)
+    num_lines_var = cursor.var(int)
+    lines = []
+    while True:
+        num_lines_var.setvalue(0, lines_per_call)
+        cursor.callproc("DBMS_OUTPUT.GET_LINES", (lines_var, num_lines_var))
+        num_lines = num_lines_var.getvalue()
+        lines.extend(line or "" for line in lines_var.getvalue()[:num_lines])
+        if num_lines < lines_per_call:
+            break
+    return lines
+
+
+def call_with_output(cursor, procedure_name, args, buffer_size=MAX_BUFFER_SIZE, lines_per_call=LINES_PER_CALL):
+    # Runs a procedure that reports through DBMS_OUTPUT and returns everything it printed
+    enable_output(cursor, buffer_size)
+    cursor.callproc(procedure_name, args)
+    return drain_output(cursor, lines_per_call)
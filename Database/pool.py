@@ -0,0 +1,70 @@
+import cx_Oracle
+import threading
+import time
+from Database import config
+
+_pool = None
+_lock = threading.Lock()
+_stats = {"acquired": 0, "waits": 0, "wait_seconds": 0.0, "timeouts": 0}
+
+
+def get_pool():
+    # The pool is created on first use so importing a module never logs on
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = cx_Oracle.SessionPool(
+                    user=config.username,
+                    password=config.password,
+                    dsn=config.dsn,
+                    min=config.POOL_MIN,
+                    max=config.POOL_MAX,
+                    increment=config.POOL_INCREMENT,
+                    threaded=True,
+                    getmode=cx_Oracle.SPOOL_ATTRVAL_TIMEDWAIT,
+                    wait_timeout=config.ACQUIRE_TIMEOUT,
+                    timeout=config.IDLE_TIMEOUT,
+                    stmtcachesize=config.STMT_CACHE_SIZE,
+                    ping_interval=config.PING_INTERVAL,
+                )
+    return _pool
+
+
+def get_connection():
+    # Closing the returned connection (or leaving its `with` block) releases it back to the pool
+    pool = get_pool()
+    exhausted = pool.busy >= pool.max
+    start = time.perf_counter()
+    try:
+        conn = pool.acquire()
+    except cx_Oracle.DatabaseError:
+        with _lock:
+            _stats["timeouts"] += 1
+        raise
+
+    with _lock:
+        _stats["acquired"] += 1
+        if exhausted:
+            _stats["waits"] += 1
+            _stats["wait_seconds"] += time.perf_counter() - start
+    return conn
+
+
+def pool_stats():
+    with _lock:
+        stats = dict(_stats)
+    stats["wait_seconds"] = round(stats["wait_seconds"], 4)
+    if _pool is None:
+        stats.update({"open": 0, "busy": 0, "min": config.POOL_MIN, "max": config.POOL_MAX})
+    else:
+        stats.update({"open": _pool.opened, "busy": _pool.busy, "min": _pool.min, "max": _pool.max})
+    return stats
+
+
+def close_pool():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.close(force=True)
+            _pool = None
@@ -1,6 +1,5 @@
 import cx_Oracle
 import pandas as pd
-import json
 from dotenv import load_dotenv
 import os
 load_dotenv()
@@ -27,19 +26,10 @@ category_counts = df.groupby('cluster')['category'] \
                     .value_counts() \
                     .unstack(fill_value=0)
 
-json_list = []
-for cl in cluster_group['cluster']:
-    raw = category_counts.loc[cl].to_dict()               
-    non_zero = {cat: cnt for cat, cnt in raw.items() if cnt > 0}
-    js = json.dumps(non_zero)                              
-    json_list.append(js)
-
-cluster_group['category_distribution'] = json_list
-
+# Cluster_Category_Counts is filled by trg_cluster_category_counts when Product.py runs
 print("\n🔍 Cluster 105 debug:")
 rc = category_counts.loc[105].to_dict()
 print("  raw counts:", rc)
-print("  json string:", cluster_group.loc[cluster_group['cluster']==105, 'category_distribution'].iloc[0])
 
 try:
     # Connect to DB
@@ -57,23 +47,19 @@ try:
         avg_price = round(row['price'], 2)
         avg_sales = round(row['sales'], 2)
         avg_popularity_score = round(row['popularity_score'], 2)
-        category_distribution_clob = cursor.var(cx_Oracle.CLOB)
-        category_distribution_clob.setvalue(0, str(row['category_distribution']))
-
 
         cursor.execute("""
             INSERT INTO Clusters (
                 cluster_id, avg_quantity, avg_price, avg_sales,
-                avg_popularity_score, category_distribution
+                avg_popularity_score
             )
-            VALUES (:1, :2, :3, :4, :5, :6)
+            VALUES (:1, :2, :3, :4, :5)
         """, (
             cluster_id,
             avg_quantity,
             avg_price,
             avg_sales,
-            avg_popularity_score,
-            category_distribution_clob
+            avg_popularity_score
         ))
 
         print(f"Inserted cluster: {cluster_id}")
@@ -84,14 +70,15 @@ try:
     print("\n✅ Changes committed to the database.")
 
     # Verify inserted data
-    cursor.execute("SELECT * FROM Clusters")
+    cursor.execute("""
+        SELECT cluster_id, avg_quantity, avg_price, avg_sales, avg_popularity_score
+        FROM Clusters
+    """)
     rows = cursor.fetchall()
     for row in rows:
-        cluster_id, avg_qty, avg_price, avg_sales, avg_pop_score, cat_dist_lob = row
-        cat_dist_str = cat_dist_lob.read() if cat_dist_lob else None
+        cluster_id, avg_qty, avg_price, avg_sales, avg_pop_score = row
         print(f"Cluster ID: {cluster_id}, Avg Qty: {avg_qty}, Avg Price: {avg_price}, "
-            f"Avg Sales: {avg_sales}, Popularity: {avg_pop_score}, "
-            f"Category Distribution: {cat_dist_str}")
+            f"Avg Sales: {avg_sales}, Popularity: {avg_pop_score}")
 
 except cx_Oracle.DatabaseError as e:
     error, = e.args
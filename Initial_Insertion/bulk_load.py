@@ -0,0 +1,257 @@
+# Bulk loader for the initial catalog: array-bound executemany() with batch
+# errors instead of one INSERT per row. Run from the repository root:
+#
+#   python -m Initial_Insertion.bulk_load                       # suppliers, clusters, products
+#   python -m Initial_Insertion.bulk_load --tables products --batch-size 10000 --commit-every 5
+#   python -m Initial_Insertion.bulk_load --error-report load_errors.csv
+import argparse
+import csv
+import os
+import random
+import sys
+import time
+import cx_Oracle
+import pandas as pd
+from Clustering.assign import assign_clusters, load_model
+from Database import config, pool
+
+CSV_FILE_PATH = os.path.join("Clustering", "dataset_dbms.csv")
+BATCH_SIZE = 5000
+COMMIT_EVERY = 10   # batches per commit
+
+PRODUCT_COLUMNS = [
+    'product_id', 'name', 'category',
+    'quantity', 'price', 'sales',
+    'popularity_score', 'cluster', 'supplier'
+]
+CLUSTER_COLUMNS = ['cluster', 'quantity', 'price', 'sales', 'popularity_score']
+
+# Same placeholder contact data as Suppliers.py
+locations = ['Tokyo, Japan', 'Cupertino, USA', 'Seoul, South Korea', 'Beijing, China', 'Berlin, Germany']
+contacts = ['support@company.com', 'help@brand.net', 'info@example.org', 'contact@vendor.com']
+phones = ['+81-3-1234-5678', '+1-800-275-2273', '+86-10-9999-8888', '+49-30-4567890']
+
+
+def random_or_null(choices):
+    return random.choice(choices) if random.random() > 0.5 else None
+
+
+def read_chunks(csv_path, columns, chunk_size):
+    for chunk in pd.read_csv(csv_path, usecols=columns, chunksize=chunk_size):
+        yield chunk[columns].dropna()
+
+
+class BatchReport:
+    # Collects per-batch outcomes so one bad row never stops the load
+    def __init__(self, table):
+        self.table = table
+        self.batches = []
+
+    def add(self, batch_no, keys, batch_errors):
+        errors = [(keys[err.offset], err.code, err.message) for err in batch_errors]
+        self.batches.append({"batch": batch_no, "rows": len(keys), "inserted": len(keys) - len(errors), "errors": errors})
+        status = "✅" if not errors else f"⚠️ {len(errors)} rejected"
+        print(f"[{self.table}] batch {batch_no}: {len(keys) - len(errors)}/{len(keys)} rows {status}")
+
+    @property
+    def inserted(self):
+        return sum(b["inserted"] for b in self.batches)
+
+    @property
+    def rejected(self):
+        return sum(len(b["errors"]) for b in self.batches)
+
+    def error_rows(self):
+        for b in self.batches:
+            for key, code, message in b["errors"]:
+                yield [self.table, b["batch"], key, code, message]
+
+
+def execute_batch(conn, cursor, sql, rows, keys, batch_no, report, commit_every):
+    cursor.executemany(sql, rows, batcherrors=True)
+    report.add(batch_no, keys, cursor.getbatcherrors())
+    if batch_no % commit_every == 0:
+        conn.commit()
+
+
+def load_suppliers(conn, csv_path, batch_size, commit_every):
+    report = BatchReport("Suppliers")
+    names = {}
+    for chunk in pd.read_csv(csv_path, usecols=['supplier'], chunksize=batch_size):
+        for name in chunk['supplier'].dropna().tolist():
+            names.setdefault(name, None)
+
+    cursor = conn.cursor()
+    cursor.execute("SELECT NVL(MAX(supplier_id), 0) FROM Suppliers")
+    next_id = cursor.fetchone()[0] + 1
+
+    cursor.setinputsizes(int, 100, 100, 255)
+    names = list(names)
+    for batch_no, start in enumerate(range(0, len(names), batch_size), start=1):
+        rows = []
+        for offset, name in enumerate(names[start:start + batch_size]):
+            contact = random_or_null(contacts)
+            phone = random_or_null(phones)
+            contact_info = f"{contact}, {phone}" if contact and phone else None
+            rows.append((next_id + start + offset, name, random_or_null(locations), contact_info))
+        execute_batch(conn, cursor, """
+            INSERT INTO Suppliers (supplier_id, name, location, contact_info)
+            VALUES (:1, :2, :3, :4)
+        """, rows, [r[1] for r in rows], batch_no, report, commit_every)
+    conn.commit()
+    return report
+
+
+def aggregate_clusters(csv_path, chunk_size):
+    # Streaming version of the groupby in Cluster.py: sums and counts per cluster.
+    # Category counts are not computed here; trg_cluster_category_counts fills
+    # Cluster_Category_Counts as the products are inserted.
+    sums = None
+    for chunk in read_chunks(csv_path, CLUSTER_COLUMNS, chunk_size):
+        grouped = chunk.groupby('cluster')[['quantity', 'price', 'sales', 'popularity_score']].agg(['sum', 'count'])
+        sums = grouped if sums is None else sums.add(grouped, fill_value=0)
+
+    rows = []
+    if sums is None:
+        return rows
+    for cluster, stats in sums.iterrows():
+        rows.append((
+            int(cluster),
+            round(stats[('quantity', 'sum')] / stats[('quantity', 'count')], 2),
+            round(stats[('price', 'sum')] / stats[('price', 'count')], 2),
+            round(stats[('sales', 'sum')] / stats[('sales', 'count')], 2),
+            round(stats[('popularity_score', 'sum')] / stats[('popularity_score', 'count')], 2),
+        ))
+    return rows
+
+
+def load_clusters(conn, csv_path, batch_size, commit_every):
+    report = BatchReport("Clusters")
+    rows = aggregate_clusters(csv_path, batch_size)
+
+    cursor = conn.cursor()
+    cursor.setinputsizes(int, float, float, float, float)
+    for batch_no, start in enumerate(range(0, len(rows), batch_size), start=1):
+        batch = rows[start:start + batch_size]
+        execute_batch(conn, cursor, """
+            INSERT INTO Clusters (
+                cluster_id, avg_quantity, avg_price, avg_sales, avg_popularity_score
+            )
+            VALUES (:1, :2, :3, :4, :5)
+        """, batch, [r[0] for r in batch], batch_no, report, commit_every)
+    conn.commit()
+    return report
+
+
+def product_columns(csv_path):
+    # Extracts without a cluster column are assigned clusters from the saved clustering model
+    header = pd.read_csv(csv_path, nrows=0).columns
+    return PRODUCT_COLUMNS if 'cluster' in header else [c for c in PRODUCT_COLUMNS if c != 'cluster']
+
+
+def check_cluster_model(csv_path):
+    # Products from an extract without a cluster column need the saved model; checked before loading anything
+    if 'cluster' in product_columns(csv_path) or load_model() is not None:
+        return True
+    print(f"❌ {csv_path} has no cluster column and there is no clustering model in {config.CLUSTER_MODEL_DIR}. "
+          f"Run python -m Clustering.cluster_pipeline first.")
+    return False
+
+
+def supplier_ids_by_name(conn):
+    cursor = conn.cursor()
+    cursor.arraysize = 5000
+    cursor.execute("SELECT name, supplier_id FROM Suppliers")
+    return dict(cursor.fetchall())
+
+
+def product_rows(chunk, supplier_ids):
+    # tolist() hands the driver native Python values (cx_Oracle cannot bind numpy scalars)
+    if 'cluster' not in chunk.columns:
+        chunk = chunk.assign(cluster=assign_clusters(
+            chunk['category'].tolist(), chunk['price'], chunk['sales'], chunk['popularity_score']
+        ))
+    return list(zip(
+        chunk['product_id'].astype(int).tolist(),
+        chunk['name'].tolist(),
+        chunk['category'].tolist(),
+        chunk['quantity'].astype(int).tolist(),
+        chunk['price'].round(2).tolist(),
+        chunk['sales'].astype(int).tolist(),
+        chunk['popularity_score'].round(2).tolist(),
+        chunk['cluster'].astype(int).tolist(),
+        [supplier_ids.get(name) for name in chunk['supplier'].tolist()],
+    ))
+
+
+def load_products(conn, csv_path, batch_size, commit_every):
+    report = BatchReport("Products")
+    supplier_ids = supplier_ids_by_name(conn)
+
+    cursor = conn.cursor()
+    cursor.setinputsizes(int, 100, 50, int, float, int, float, int, int)
+    for batch_no, chunk in enumerate(read_chunks(csv_path, product_columns(csv_path), batch_size), start=1):
+        rows = product_rows(chunk, supplier_ids)
+        execute_batch(conn, cursor, """
+            INSERT INTO Products (
+                product_id, name, category, quantity,
+                price, sales, rating, cluster_id, supplier_id
+            ) VALUES (
+                :1, :2, :3, :4, :5, :6, :7, :8, :9
+            )
+        """, rows, [r[0] for r in rows], batch_no, report, commit_every)
+    conn.commit()
+    return report
+
+
+LOADERS = {
+    "suppliers": load_suppliers,
+    "clusters": load_clusters,
+    "products": load_products,
+}
+
+
+def write_error_report(path, reports):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["table", "batch", "key", "ora_code", "message"])
+        for report in reports:
+            writer.writerows(report.error_rows())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-load the catalog CSV into Oracle")
+    parser.add_argument("--csv", default=CSV_FILE_PATH)
+    parser.add_argument("--tables", nargs="+", choices=list(LOADERS), default=list(LOADERS),
+                        help="tables to load, in dependency order (suppliers, clusters, products)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows per executemany() call")
+    parser.add_argument("--commit-every", type=int, default=COMMIT_EVERY, help="batches per commit")
+    parser.add_argument("--error-report", help="write rejected rows to this CSV file")
+    args = parser.parse_args(argv)
+
+    if "products" in args.tables and not check_cluster_model(args.csv):
+        return 1
+
+    reports = []
+    try:
+        with pool.get_connection() as conn:
+            print("✅ Connected to Oracle Database.")
+            for table in [t for t in LOADERS if t in args.tables]:
+                start = time.perf_counter()
+                report = LOADERS[table](conn, args.csv, args.batch_size, args.commit_every)
+                reports.append(report)
+                print(f"✅ {report.table}: {report.inserted} inserted, {report.rejected} rejected "
+                      f"in {time.perf_counter() - start:.1f} s")
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        print(f"❌ Database error: {error.message}")
+        return 1
+
+    if args.error_report:
+        write_error_report(args.error_report, reports)
+        print(f"📝 Error report written to {args.error_report}")
+    return 1 if any(r.rejected for r in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
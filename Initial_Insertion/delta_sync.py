@@ -0,0 +1,241 @@
+# Incremental re-sync of the catalog from a new CSV. Every incoming row is
+# hashed and compared with a hash of the row already in the database; only
+# new or changed rows are sent, through array-bound MERGE statements.
+#
+# Stock belongs to the live database (it falls with every sale), so quantity is only
+# taken from the CSV for new products. So is cluster_id, which reassign_product_clusters
+# and the clustering pipeline change, unless --overwrite-clusters is given.
+#
+#   python -m Initial_Insertion.delta_sync --csv Clustering/dataset_dbms.csv
+#   python -m Initial_Insertion.delta_sync --dry-run
+#   python -m Initial_Insertion.delta_sync --tables products --overwrite-clusters
+import argparse
+import hashlib
+import sys
+import time
+import cx_Oracle
+from Database import pool
+from Initial_Insertion.bulk_load import (
+    BATCH_SIZE, COMMIT_EVERY, CSV_FILE_PATH,
+    BatchReport, aggregate_clusters, contacts, locations, phones,
+    product_columns, product_rows, random_or_null, read_chunks, supplier_ids_by_name, write_error_report,
+)
+
+
+def _normalize(value):
+    # NUMBER columns come back as int or float depending on the value, so all numbers
+    # are compared at the two decimals the catalog stores
+    if value is None:
+        return ""
+    if isinstance(value, (int, float)):
+        return f"{float(value):.2f}"
+    return str(value)
+
+
+def row_hash(values):
+    return hashlib.blake2b("\x1f".join(_normalize(v) for v in values).encode(), digest_size=16).digest()
+
+
+def current_hashes(conn, sql, key_index=0, transform=None):
+    cursor = conn.cursor()
+    cursor.arraysize = 10000
+    cursor.prefetchrows = 10001
+    cursor.execute(sql)
+    hashes = {}
+    for row in cursor:
+        if transform:
+            row = transform(row)
+        hashes[row[key_index]] = row_hash(row)
+    return hashes
+
+
+class SyncStats:
+    def __init__(self, table):
+        self.table = table
+        self.scanned = 0
+        self.new = 0
+        self.changed = 0
+
+    def __str__(self):
+        unchanged = self.scanned - self.new - self.changed
+        return f"{self.table}: {self.scanned} scanned, {self.new} new, {self.changed} changed, {unchanged} unchanged"
+
+
+def merge_in_batches(conn, sql, rows, input_sizes, batch_size, commit_every, report, dry_run):
+    if dry_run or not rows:
+        return
+    cursor = conn.cursor()
+    cursor.setinputsizes(*input_sizes)
+    for batch_no, start in enumerate(range(0, len(rows), batch_size), start=1):
+        batch = rows[start:start + batch_size]
+        cursor.executemany(sql, batch, batcherrors=True)
+        report.add(batch_no, [r[0] for r in batch], cursor.getbatcherrors())
+        if batch_no % commit_every == 0:
+            conn.commit()
+    conn.commit()
+
+
+def sync_suppliers(conn, csv_path, batch_size, commit_every, dry_run):
+    # The CSV only names suppliers, so the delta is the set of names not yet in the table
+    stats, report = SyncStats("Suppliers"), BatchReport("Suppliers")
+    existing = supplier_ids_by_name(conn)
+    incoming = {}
+    for chunk in read_chunks(csv_path, ['supplier'], batch_size):
+        for name in chunk['supplier'].tolist():
+            incoming.setdefault(name, None)
+    stats.scanned = len(incoming)
+
+    cursor = conn.cursor()
+    cursor.execute("SELECT NVL(MAX(supplier_id), 0) FROM Suppliers")
+    next_id = cursor.fetchone()[0] + 1
+
+    rows = []
+    for name in incoming:
+        if name in existing:
+            continue
+        contact = random_or_null(contacts)
+        phone = random_or_null(phones)
+        contact_info = f"{contact}, {phone}" if contact and phone else None
+        rows.append((next_id + len(rows), name, random_or_null(locations), contact_info))
+    stats.new = len(rows)
+
+    merge_in_batches(conn, """
+        MERGE INTO Suppliers s
+        USING (SELECT :1 AS supplier_id, :2 AS name, :3 AS location, :4 AS contact_info FROM dual) src
+        ON (s.name = src.name)
+        WHEN NOT MATCHED THEN
+            INSERT (supplier_id, name, location, contact_info)
+            VALUES (src.supplier_id, src.name, src.location, src.contact_info)
+    """, rows, (int, 100, 100, 255), batch_size, commit_every, report, dry_run)
+    return stats, report
+
+
+def sync_clusters(conn, csv_path, batch_size, commit_every, dry_run):
+    # Only clusters missing from the database are inserted. Existing averages belong to
+    # trg_cluster_stats and RecomputeClusterStats, which keep them in step with their sums;
+    # the CSV's averages only seed a new cluster until its products arrive.
+    stats, report = SyncStats("Clusters"), BatchReport("Clusters")
+    cursor = conn.cursor()
+    cursor.arraysize = 10000
+    cursor.execute("SELECT cluster_id FROM Clusters")
+    existing = {cluster_id for cluster_id, in cursor}
+
+    rows = []
+    for row in aggregate_clusters(csv_path, batch_size):
+        stats.scanned += 1
+        if row[0] not in existing:
+            stats.new += 1
+            rows.append(row)
+
+    merge_in_batches(conn, """
+        MERGE INTO Clusters c
+        USING (
+            SELECT :1 AS cluster_id, :2 AS avg_quantity, :3 AS avg_price, :4 AS avg_sales,
+                   :5 AS avg_popularity_score
+            FROM dual
+        ) src
+        ON (c.cluster_id = src.cluster_id)
+        WHEN NOT MATCHED THEN
+            INSERT (cluster_id, avg_quantity, avg_price, avg_sales, avg_popularity_score)
+            VALUES (src.cluster_id, src.avg_quantity, src.avg_price, src.avg_sales, src.avg_popularity_score)
+    """, rows, (int, float, float, float, float), batch_size, commit_every, report, dry_run)
+    return stats, report
+
+
+# Positions in a product_rows() row
+PRODUCT_QUANTITY, PRODUCT_CLUSTER = 3, 7
+
+
+def sync_products(conn, csv_path, batch_size, commit_every, dry_run, overwrite_clusters=False):
+    # Existing products are compared and updated on every column except quantity and
+    # (unless overwrite_clusters) cluster_id; new products are inserted with all of them
+    stats, report = SyncStats("Products"), BatchReport("Products")
+    skipped = {PRODUCT_QUANTITY} if overwrite_clusters else {PRODUCT_QUANTITY, PRODUCT_CLUSTER}
+    compared = [i for i in range(9) if i not in skipped]
+    existing = current_hashes(conn, f"""
+        SELECT product_id, name, category, price, sales, rating,
+               {"cluster_id, " if overwrite_clusters else ""}supplier_id
+        FROM Products
+    """)
+    supplier_ids = supplier_ids_by_name(conn)
+
+    rows = []
+    for chunk in read_chunks(csv_path, product_columns(csv_path), batch_size):
+        for row in product_rows(chunk, supplier_ids):
+            stats.scanned += 1
+            previous = existing.get(row[0])
+            if previous is None:
+                stats.new += 1
+            elif previous == row_hash([row[i] for i in compared]):
+                continue
+            else:
+                stats.changed += 1
+            rows.append(row)
+
+    merge_in_batches(conn, f"""
+        MERGE INTO Products p
+        USING (
+            SELECT :1 AS product_id, :2 AS name, :3 AS category, :4 AS quantity, :5 AS price,
+                   :6 AS sales, :7 AS rating, :8 AS cluster_id, :9 AS supplier_id
+            FROM dual
+        ) src
+        ON (p.product_id = src.product_id)
+        WHEN MATCHED THEN UPDATE SET
+            p.name = src.name,
+            p.category = src.category,
+            p.price = src.price,
+            p.sales = src.sales,
+            p.rating = src.rating,
+            {"p.cluster_id = src.cluster_id," if overwrite_clusters else ""}
+            p.supplier_id = src.supplier_id
+        WHEN NOT MATCHED THEN
+            INSERT (product_id, name, category, quantity, price, sales, rating, cluster_id, supplier_id)
+            VALUES (src.product_id, src.name, src.category, src.quantity, src.price,
+                    src.sales, src.rating, src.cluster_id, src.supplier_id)
+    """, rows, (int, 100, 50, int, float, int, float, int, int), batch_size, commit_every, report, dry_run)
+    return stats, report
+
+
+SYNCERS = {
+    "suppliers": sync_suppliers,
+    "clusters": sync_clusters,
+    "products": sync_products,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge only new or changed catalog rows from a CSV")
+    parser.add_argument("--csv", default=CSV_FILE_PATH)
+    parser.add_argument("--tables", nargs="+", choices=list(SYNCERS), default=list(SYNCERS),
+                        help="tables to sync, in dependency order (suppliers, clusters, products)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows per MERGE executemany() call")
+    parser.add_argument("--commit-every", type=int, default=COMMIT_EVERY, help="batches per commit")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would change")
+    parser.add_argument("--error-report", help="write rejected rows to this CSV file")
+    parser.add_argument("--overwrite-clusters", action="store_true",
+                        help="also replace the cluster of existing products with the CSV's (undoes reassignments)")
+    args = parser.parse_args(argv)
+
+    reports = []
+    try:
+        with pool.get_connection() as conn:
+            for table in [t for t in SYNCERS if t in args.tables]:
+                start = time.perf_counter()
+                options = {"overwrite_clusters": args.overwrite_clusters} if table == "products" else {}
+                stats, report = SYNCERS[table](conn, args.csv, args.batch_size, args.commit_every, args.dry_run,
+                                               **options)
+                reports.append(report)
+                print(f"✅ {stats} ({report.rejected} rejected) in {time.perf_counter() - start:.1f} s")
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        print(f"❌ Database error: {error.message}")
+        return 1
+
+    if args.error_report:
+        write_error_report(args.error_report, reports)
+        print(f"📝 Error report written to {args.error_report}")
+    return 1 if any(r.rejected for r in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
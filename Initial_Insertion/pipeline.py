@@ -0,0 +1,272 @@
+# Streaming, resumable ingestion for production-size catalog extracts.
+#
+# Suppliers and Clusters are loaded first (they are small, and Products
+# reference them), then the product CSV is streamed in chunks: a process
+# pool validates and transforms each chunk, and a set of writer threads
+# inserts the results over pooled connections, one commit per chunk.
+# Finished phases and committed chunks are recorded in a checkpoint file, so
+# rerunning the same command after a crash continues where it stopped.
+#
+# The Products triggers that keep cluster statistics, cluster category counts and the
+# catalog version up to date are disabled during the product load (they update shared
+# rows, so the writers would queue behind each other) and their state is rebuilt once at
+# the end. Other sessions' Products changes are not tracked meanwhile either, so run it
+# in a maintenance window, or pass --keep-triggers.
+#
+#   python -m Initial_Insertion.pipeline --csv extract.csv --workers 8 --writers 4
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import cx_Oracle
+import pandas as pd
+from Database import config, pool
+from Initial_Insertion.bulk_load import (
+    CSV_FILE_PATH, check_cluster_model, load_clusters, load_suppliers, product_columns, product_rows,
+    supplier_ids_by_name,
+)
+
+CHUNK_SIZE = 50000
+UNIQUE_VIOLATION = 1    # ORA-00001: row already loaded by an earlier, interrupted run
+# Products triggers that update one shared row per cluster, category or catalog on every insert
+MAINTENANCE_TRIGGERS = ("trg_catalog_version_products", "trg_cluster_stats", "trg_cluster_category_counts")
+
+PRODUCT_INSERT_SQL = """
+    INSERT INTO Products (
+        product_id, name, category, quantity,
+        price, sales, rating, cluster_id, supplier_id
+    ) VALUES (
+        :1, :2, :3, :4, :5, :6, :7, :8, :9
+    )
+"""
+
+
+class Checkpoint:
+    # Completed phases plus committed product chunks, rewritten atomically after every change.
+    # Chunks finish out of order, so the file keeps a watermark (every chunk up to it is
+    # committed) and the committed chunk numbers above it.
+    def __init__(self, path, csv_path, chunk_size):
+        self.path = path
+        self.lock = threading.Lock()
+        self.state = {"csv": os.path.abspath(csv_path), "chunk_size": chunk_size,
+                      "phases": [], "watermark": -1, "committed": []}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("csv") != self.state["csv"] or saved.get("chunk_size") != chunk_size:
+                raise SystemExit(f"❌ {path} belongs to a different file or chunk size; remove it to start over.")
+            self.state = saved
+        self.committed = set(self.state["committed"])
+
+    def phase_done(self, phase):
+        return phase in self.state["phases"]
+
+    def finish_phase(self, phase):
+        with self.lock:
+            self.state["phases"].append(phase)
+            self._save()
+
+    def chunk_done(self, chunk_no):
+        return chunk_no <= self.state["watermark"] or chunk_no in self.committed
+
+    def commit_chunk(self, chunk_no):
+        with self.lock:
+            self.committed.add(chunk_no)
+            while self.state["watermark"] + 1 in self.committed:
+                self.state["watermark"] += 1
+                self.committed.discard(self.state["watermark"])
+            self.state["committed"] = sorted(self.committed)
+            self._save()
+
+    def _save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.path)
+
+
+# === Process-pool side ===
+_supplier_ids = None
+
+
+def _init_worker(supplier_ids):
+    global _supplier_ids
+    _supplier_ids = supplier_ids
+
+
+def transform_chunk(chunk_no, chunk):
+    # Validation, type coercion, rounding, supplier resolution and (for extracts without
+    # a cluster column) cluster assignment; runs in a worker process
+    total = len(chunk)
+    chunk = chunk.dropna()
+    chunk = chunk[
+        (chunk['quantity'] >= 0) & (chunk['price'] >= 0) & (chunk['sales'] >= 0)
+        & (chunk['popularity_score'] >= 0) & (chunk['popularity_score'] < 10)
+    ]
+    return chunk_no, product_rows(chunk, _supplier_ids), total - len(chunk)
+
+
+# === Writer side ===
+def write_chunk(chunk_no, rows):
+    with pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.setinputsizes(int, 100, 50, int, float, int, float, int, int)
+        cursor.executemany(PRODUCT_INSERT_SQL, rows, batcherrors=True)
+        errors = cursor.getbatcherrors()
+        conn.commit()
+    already_loaded = sum(1 for e in errors if e.code == UNIQUE_VIOLATION)
+    rejected = [(rows[e.offset][0], e.message) for e in errors if e.code != UNIQUE_VIOLATION]
+    return len(rows) - len(errors), already_loaded, rejected
+
+
+def set_maintenance_triggers(enabled):
+    with pool.get_connection() as conn:
+        cursor = conn.cursor()
+        for trigger in MAINTENANCE_TRIGGERS:
+            cursor.execute(f"ALTER TRIGGER {trigger} {'ENABLE' if enabled else 'DISABLE'}")
+
+
+def rebuild_derived_state():
+    # Everything the maintenance triggers would have written, recomputed once from Products
+    with pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.callproc("RecomputeClusterStats")
+        cursor.callproc("RebuildClusterCategoryCounts")
+        cursor.execute("UPDATE Catalog_Version SET version = version + 1 WHERE id = 1")
+        conn.commit()
+
+
+class Progress:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.inserted = 0
+        self.already_loaded = 0
+        self.invalid = 0
+        self.rejected = []
+        self.start = time.perf_counter()
+
+    def add(self, chunk_no, inserted, already_loaded, invalid, rejected):
+        with self.lock:
+            self.inserted += inserted
+            self.already_loaded += already_loaded
+            self.invalid += invalid
+            self.rejected.extend(rejected)
+            rate = self.inserted / max(time.perf_counter() - self.start, 1e-9)
+        print(f"[Products] chunk {chunk_no}: {inserted} inserted, {already_loaded} already loaded, "
+              f"{invalid} invalid, {len(rejected)} rejected ({rate:,.0f} rows/s overall)")
+
+
+def load_products_parallel(csv_path, checkpoint, chunk_size, workers, writers):
+    with pool.get_connection() as conn:
+        supplier_ids = supplier_ids_by_name(conn)
+
+    progress = Progress()
+    # Bounds how many chunks are parsed but not yet written, which bounds memory
+    in_flight = threading.BoundedSemaphore(max(workers, writers) * 2)
+    failures = []
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(supplier_ids,)) as transformers, \
+            ThreadPoolExecutor(max_workers=writers) as writer_pool:
+
+        def on_transformed(future):
+            try:
+                chunk_no, rows, invalid = future.result()
+            except Exception as e:
+                failures.append(e)
+                in_flight.release()
+                return
+            writer_pool.submit(write_and_checkpoint, chunk_no, rows, invalid)
+
+        def write_and_checkpoint(chunk_no, rows, invalid):
+            try:
+                inserted, already_loaded, rejected = write_chunk(chunk_no, rows)
+                checkpoint.commit_chunk(chunk_no)
+                progress.add(chunk_no, inserted, already_loaded, invalid, rejected)
+            except Exception as e:
+                failures.append(e)
+            finally:
+                in_flight.release()
+
+        reader = pd.read_csv(csv_path, usecols=product_columns(csv_path), chunksize=chunk_size)
+        for chunk_no, chunk in enumerate(reader):
+            if failures:
+                break
+            if checkpoint.chunk_done(chunk_no):
+                continue
+            in_flight.acquire()
+            transformers.submit(transform_chunk, chunk_no, chunk).add_done_callback(on_transformed)
+
+        # Wait for every submitted chunk to be written before the executors shut down
+        for _ in range(max(workers, writers) * 2):
+            in_flight.acquire()
+
+    if failures:
+        raise failures[0]
+    return progress
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resumable parallel catalog ingestion")
+    parser.add_argument("--csv", default=CSV_FILE_PATH)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="CSV rows per chunk")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="transform processes")
+    parser.add_argument("--writers", type=int, default=min(4, config.POOL_MAX), help="concurrent pooled connections")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <csv>.checkpoint.json)")
+    parser.add_argument("--keep-triggers", action="store_true",
+                        help="leave the cluster and catalog triggers enabled (slower, safe alongside live traffic)")
+    args = parser.parse_args(argv)
+
+    if args.writers > config.POOL_MAX:
+        parser.error(f"--writers cannot exceed db_pool_max ({config.POOL_MAX})")
+
+    checkpoint = Checkpoint(args.checkpoint or args.csv + ".checkpoint.json", args.csv, args.chunk_size)
+    if not checkpoint.phase_done("products") and not check_cluster_model(args.csv):
+        return 1
+    start = time.perf_counter()
+    try:
+        for phase, loader in (("suppliers", load_suppliers), ("clusters", load_clusters)):
+            if checkpoint.phase_done(phase):
+                print(f"⏭️ {phase} already loaded")
+                continue
+            with pool.get_connection() as conn:
+                report = loader(conn, args.csv, args.chunk_size, 1)
+            print(f"✅ {report.table}: {report.inserted} inserted, {report.rejected} rejected")
+            checkpoint.finish_phase(phase)
+
+        if checkpoint.phase_done("products"):
+            print("⏭️ products already loaded")
+        else:
+            if not args.keep_triggers:
+                set_maintenance_triggers(False)
+            try:
+                progress = load_products_parallel(args.csv, checkpoint, args.chunk_size, args.workers, args.writers)
+            finally:
+                if not args.keep_triggers:
+                    set_maintenance_triggers(True)
+            checkpoint.finish_phase("products")
+            print(f"✅ Products: {progress.inserted} inserted, {progress.already_loaded} already loaded, "
+                  f"{progress.invalid} invalid, {len(progress.rejected)} rejected")
+            for product_id, message in progress.rejected[:20]:
+                print(f"   product {product_id}: {message}")
+
+        # Also repairs the state left by an interrupted run that had the triggers disabled
+        if checkpoint.phase_done("derived"):
+            print("⏭️ cluster statistics already rebuilt")
+        else:
+            rebuild_derived_state()
+            checkpoint.finish_phase("derived")
+            print("✅ Cluster statistics, category counts and catalog version rebuilt")
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        print(f"❌ Database error: {error.message} (rerun the same command to resume)")
+        return 1
+
+    print(f"🏁 Done in {time.perf_counter() - start:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
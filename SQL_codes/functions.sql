@@ -33,9 +33,139 @@ BEGIN
             Inventory_Alerts IA
             JOIN Products P ON IA.product_id = P.product_id
         ORDER BY 
+            IA.is_processed,
             IA.alert_date DESC;
 
     RETURN alert_cursor;
 END;
 /
 
+
+CREATE OR REPLACE FUNCTION GetRecommendedItems (
+    p_category_or_name IN VARCHAR2
+) RETURN SYS_REFCURSOR
+IS
+    v_category        VARCHAR2(100);
+    v_item_cluster_id NUMBER := NULL;
+    rec_cursor        SYS_REFCURSOR;
+BEGIN
+    v_category := GetCategoryFromName(p_category_or_name);
+    IF v_category IS NULL THEN
+        v_category := p_category_or_name;
+    ELSE
+        BEGIN
+            SELECT cluster_id
+            INTO v_item_cluster_id
+            FROM Products
+            WHERE UPPER(name) = UPPER(p_category_or_name)
+            FETCH FIRST 1 ROWS ONLY;
+        EXCEPTION
+            WHEN NO_DATA_FOUND THEN
+                v_item_cluster_id := NULL;
+        END;
+    END IF;
+
+    -- Same selection as RecommendItemsByCategory: the item's own cluster, the four
+    -- clusters holding most of the category (an idx_category_clusters range read),
+    -- or cluster -1 when no other cluster matches
+    OPEN rec_cursor FOR
+        WITH candidate_clusters AS (
+            SELECT cluster_id
+            FROM Cluster_Category_Counts
+            WHERE LOWER(category) = LOWER(v_category)
+              AND cluster_id != -1
+            ORDER BY cnt DESC, cluster_id
+            FETCH FIRST 4 ROWS ONLY
+        ),
+        other_clusters AS (
+            SELECT cluster_id
+            FROM candidate_clusters
+            WHERE v_item_cluster_id IS NULL OR cluster_id != v_item_cluster_id
+        ),
+        chosen_clusters AS (
+            SELECT 'ITEM' AS section, 0 AS section_order, v_item_cluster_id AS cluster_id
+            FROM dual
+            WHERE v_item_cluster_id IS NOT NULL
+            UNION ALL
+            SELECT 'SIMILAR', 1, cluster_id
+            FROM other_clusters
+            UNION ALL
+            SELECT 'FALLBACK', 2, -1
+            FROM dual
+            WHERE NOT EXISTS (SELECT 1 FROM other_clusters)
+        )
+        SELECT 
+            c.section,
+            c.cluster_id,
+            p.product_id,
+            p.name,
+            p.price,
+            p.rating
+        FROM 
+            chosen_clusters c
+            JOIN Products p ON p.cluster_id = c.cluster_id
+        WHERE 
+            LOWER(p.category) = LOWER(v_category)
+        ORDER BY 
+            c.section_order, c.cluster_id, p.product_id;
+
+    RETURN rec_cursor;
+END;
+/
+
+CREATE OR REPLACE FUNCTION GetClustersByStats (
+    p_min_quantity        IN NUMBER DEFAULT NULL,
+    p_min_price           IN NUMBER DEFAULT NULL,
+    p_min_sales           IN NUMBER DEFAULT NULL,
+    p_min_popularity      IN NUMBER DEFAULT NULL,
+    p_num_clusters        IN NUMBER DEFAULT NULL 
+) RETURN SYS_REFCURSOR
+IS
+    cluster_cursor SYS_REFCURSOR;
+BEGIN
+    OPEN cluster_cursor FOR
+        SELECT cluster_id, avg_quantity, avg_price, avg_sales, avg_popularity_score
+        FROM Clusters
+        WHERE (p_min_quantity IS NULL OR avg_quantity >= p_min_quantity)
+          AND (p_min_price IS NULL OR avg_price >= p_min_price)
+          AND (p_min_sales IS NULL OR avg_sales >= p_min_sales)
+          AND (p_min_popularity IS NULL OR avg_popularity_score >= p_min_popularity)
+        ORDER BY cluster_id
+        FETCH FIRST NVL(p_num_clusters, 2147483647) ROWS ONLY;
+
+    RETURN cluster_cursor;
+END;
+/
+
+CREATE OR REPLACE FUNCTION GetSupplierInfo (
+    p_supplier_name IN VARCHAR2
+) RETURN SYS_REFCURSOR
+IS
+    supplier_cursor SYS_REFCURSOR;
+BEGIN
+    OPEN supplier_cursor FOR
+        SELECT supplier_id, name, location, contact_info
+        FROM Suppliers
+        WHERE UPPER(name) = UPPER(p_supplier_name);
+
+    RETURN supplier_cursor;
+END;
+/
+
+CREATE OR REPLACE FUNCTION FindSuppliersByLocation (
+    p_city IN VARCHAR2 DEFAULT NULL,
+    p_country IN VARCHAR2 DEFAULT NULL
+) RETURN SYS_REFCURSOR
+IS
+    supplier_cursor SYS_REFCURSOR;
+BEGIN
+    OPEN supplier_cursor FOR
+        SELECT supplier_id, name, location, contact_info
+        FROM Suppliers
+        WHERE (p_city IS NULL OR UPPER(location) LIKE UPPER(p_city) || '%')
+          AND (p_country IS NULL OR UPPER(location) LIKE '%' || UPPER(p_country))
+        ORDER BY supplier_id;
+
+    RETURN supplier_cursor;
+END;
+/
@@ -0,0 +1,18 @@
+-- One-time upgrade of a database created before Clusters kept running sums and
+-- Cluster_Category_Counts existed. Run after table_creations.sql's new objects
+-- (Cluster_Category_Counts and its index), procedures.sql and triggers.sql.
+
+ALTER TABLE Clusters ADD (
+    product_count NUMBER DEFAULT 0 NOT NULL,
+    sum_quantity NUMBER DEFAULT 0 NOT NULL,
+    sum_price NUMBER DEFAULT 0 NOT NULL,
+    sum_sales NUMBER DEFAULT 0 NOT NULL,
+    sum_popularity_score NUMBER DEFAULT 0 NOT NULL
+);
+
+-- The new columns start at 0; until this runs, the first product inserted into a
+-- cluster would set its averages from that product alone.
+EXEC RecomputeClusterStats;
+
+-- Fills Cluster_Category_Counts from the existing Products rows.
+EXEC RebuildClusterCategoryCounts;
@@ -44,11 +44,13 @@ IS
     v_category VARCHAR2(100);
     v_item_cluster_id NUMBER;
     v_previous_cluster_id NUMBER := NULL; 
+    -- Range read of idx_category_clusters: the clusters holding most of the category first
     CURSOR cluster_cursor IS
-        SELECT cluster_id, category_distribution
-        FROM Clusters
-        WHERE REGEXP_LIKE(category_distribution, LOWER(v_category), 'i')
+        SELECT cluster_id, cnt
+        FROM Cluster_Category_Counts
+        WHERE LOWER(category) = LOWER(v_category)
           AND cluster_id != -1
+        ORDER BY cnt DESC, cluster_id
         FETCH FIRST 4 ROWS ONLY;
 
     CURSOR product_cursor (p_cluster_id NUMBER) IS
@@ -211,33 +213,126 @@ END;
 /
 
 
-CREATE OR REPLACE PROCEDURE ConductTransaction (
-    p_product_name      IN VARCHAR2,
+-- Applies a stock change without ever taking stock below zero; does not commit.
+-- Ordinary products: one conditional UPDATE of the Products row.
+-- Striped products (stock_stripes > 0): one stripe with enough stock is taken with SKIP LOCKED,
+-- starting from a random stripe, so concurrent buyers of a hot product lock different rows.
+-- When every such stripe is busy, or the change needs more than any single stripe holds,
+-- all stripes are locked in stripe order and the change is spread across them.
+-- A product switching mode mid-call (StripeProductStock) is retried once in its new mode.
+CREATE OR REPLACE PROCEDURE ApplyStockChange (
+    p_product_id        IN NUMBER,
     p_quantity_change   IN NUMBER,
-    p_user_id           IN NUMBER
+    p_new_quantity      OUT NUMBER
 )
 IS
-    v_product_id        NUMBER;
-    v_current_quantity  NUMBER;
-    v_new_quantity      NUMBER;
-    v_product_name      VARCHAR2(100);
+    v_stripes   NUMBER;
+    v_stripe    NUMBER;
+    v_count     NUMBER;
+    v_total     NUMBER;
+    v_need      NUMBER;
+    v_take      NUMBER;
+    c_stripe    SYS_REFCURSOR;
 BEGIN
-    -- Get product ID, name, and current quantity
-    SELECT product_id, quantity, name
-    INTO v_product_id, v_current_quantity, v_product_name
-    FROM Products
-    WHERE LOWER(name) = LOWER(p_product_name);
+    FOR attempt IN 1 .. 2 LOOP
+        UPDATE Products
+        SET quantity = quantity + p_quantity_change
+        WHERE product_id = p_product_id
+          AND stock_stripes = 0
+          AND quantity + p_quantity_change >= 0
+        RETURNING quantity INTO p_new_quantity;
+        IF SQL%ROWCOUNT = 1 THEN
+            RETURN;
+        END IF;
 
-    -- Check for insufficient stock
-    v_new_quantity := v_current_quantity + p_quantity_change;
-    IF v_new_quantity < 0 THEN
-        RAISE_APPLICATION_ERROR(-20001, 'Not enough stock for transaction.');
-    END IF;
+        BEGIN
+            SELECT stock_stripes INTO v_stripes FROM Products WHERE product_id = p_product_id;
+        EXCEPTION
+            WHEN NO_DATA_FOUND THEN
+                RAISE_APPLICATION_ERROR(-20002, 'Product not found.');
+        END;
 
-    -- Update product quantity
-    UPDATE Products
-    SET quantity = v_new_quantity
-    WHERE product_id = v_product_id;
+        IF v_stripes > 0 THEN
+            v_stripe := TRUNC(DBMS_RANDOM.VALUE(0, v_stripes));
+            OPEN c_stripe FOR
+                SELECT stripe
+                FROM Product_Stock_Stripes
+                WHERE product_id = p_product_id
+                  AND quantity + p_quantity_change >= 0
+                ORDER BY MOD(stripe - v_stripe + v_stripes, v_stripes)
+                FOR UPDATE SKIP LOCKED;
+            FETCH c_stripe INTO v_stripe;
+            v_count := c_stripe%ROWCOUNT;
+            CLOSE c_stripe;
+
+            IF v_count = 1 THEN
+                UPDATE Product_Stock_Stripes
+                SET quantity = quantity + p_quantity_change
+                WHERE product_id = p_product_id AND stripe = v_stripe;
+                SELECT SUM(quantity) INTO p_new_quantity FROM Product_Stock_Stripes WHERE product_id = p_product_id;
+                RETURN;
+            END IF;
+
+            v_count := 0;
+            v_total := 0;
+            FOR r IN (
+                SELECT quantity FROM Product_Stock_Stripes
+                WHERE product_id = p_product_id
+                ORDER BY stripe
+                FOR UPDATE
+            ) LOOP
+                v_count := v_count + 1;
+                v_total := v_total + r.quantity;
+            END LOOP;
+
+            IF v_count > 0 THEN
+                IF v_total + p_quantity_change < 0 THEN
+                    RAISE_APPLICATION_ERROR(-20001, 'Not enough stock for transaction.');
+                END IF;
+                IF p_quantity_change >= 0 THEN
+                    UPDATE Product_Stock_Stripes
+                    SET quantity = quantity + p_quantity_change
+                    WHERE product_id = p_product_id AND stripe = 0;
+                ELSE
+                    v_need := -p_quantity_change;
+                    FOR r IN (
+                        SELECT stripe, quantity FROM Product_Stock_Stripes
+                        WHERE product_id = p_product_id AND quantity > 0
+                        ORDER BY quantity DESC
+                    ) LOOP
+                        EXIT WHEN v_need = 0;
+                        v_take := LEAST(r.quantity, v_need);
+                        UPDATE Product_Stock_Stripes
+                        SET quantity = quantity - v_take
+                        WHERE product_id = p_product_id AND stripe = r.stripe;
+                        v_need := v_need - v_take;
+                    END LOOP;
+                END IF;
+                p_new_quantity := v_total + p_quantity_change;
+                RETURN;
+            END IF;
+        ELSIF attempt = 2 THEN
+            RAISE_APPLICATION_ERROR(-20001, 'Not enough stock for transaction.');
+        END IF;
+    END LOOP;
+
+    RAISE_APPLICATION_ERROR(-20001, 'Not enough stock for transaction.');
+END;
+/
+
+
+-- Stock check and decrement in one conditional UPDATE (see ApplyStockChange): the row lock
+-- is taken and released by the same statement's transaction, and concurrent buyers can never
+-- drive stock negative or overwrite each other's change.
+CREATE OR REPLACE PROCEDURE ConductTransactionById (
+    p_product_id        IN NUMBER,
+    p_quantity_change   IN NUMBER,
+    p_user_id           IN NUMBER,
+    p_new_quantity      OUT NUMBER
+)
+IS
+BEGIN
+    ApplyStockChange(p_product_id, p_quantity_change, p_new_quantity);
 
     -- Insert transaction record
     INSERT INTO Transactions (
@@ -252,17 +347,101 @@ BEGIN
         CASE WHEN p_quantity_change > 0 THEN 'Stock In' ELSE 'Stock Out' END,
         p_quantity_change,
         SYSDATE,
-        v_product_id,
+        p_product_id,
         p_user_id
     );
 
-
     COMMIT;
 EXCEPTION
-    WHEN NO_DATA_FOUND THEN
+    WHEN OTHERS THEN
+        ROLLBACK;
+        RAISE;
+END;
+/
+
+
+-- Buys every line of a cart in one transaction: rows are locked in product_id order (so two
+-- carts sharing products cannot deadlock), stock is checked for all lines, then decremented
+-- with one UPDATE and logged with one INSERT. Any shortfall rolls back the whole cart.
+-- Striped products are not locked here; they go through ApplyStockChange, one call per
+-- product, which takes a single stripe like any other buyer.
+CREATE OR REPLACE PROCEDURE CheckoutCart (
+    p_lines     IN Cart_Lines,
+    p_user_id   IN NUMBER
+)
+IS
+    v_ids       Id_List;
+    v_locked    Id_List := Id_List();
+    v_count     NUMBER;
+    v_short     VARCHAR2(4000);
+    v_left      NUMBER;
+BEGIN
+    SELECT COUNT(*) INTO v_count FROM TABLE(p_lines) WHERE quantity IS NULL OR quantity <= 0;
+    IF v_count > 0 THEN
+        RAISE_APPLICATION_ERROR(-20004, 'Cart quantities must be positive.');
+    END IF;
+
+    SELECT DISTINCT product_id
+    BULK COLLECT INTO v_ids
+    FROM TABLE(p_lines)
+    ORDER BY product_id;
+
+    SELECT COUNT(*) INTO v_count FROM Products WHERE product_id IN (SELECT COLUMN_VALUE FROM TABLE(v_ids));
+    IF v_count < v_ids.COUNT THEN
         RAISE_APPLICATION_ERROR(-20002, 'Product not found.');
-    WHEN DUP_VAL_ON_INDEX THEN
-        NULL; -- Avoid duplicate alert for same product/date combo
+    END IF;
+
+    FOR i IN 1 .. v_ids.COUNT LOOP
+        FOR r IN (
+            SELECT product_id FROM Products
+            WHERE product_id = v_ids(i) AND stock_stripes = 0
+            FOR UPDATE
+        ) LOOP
+            v_locked.EXTEND;
+            v_locked(v_locked.COUNT) := r.product_id;
+        END LOOP;
+    END LOOP;
+
+    SELECT LISTAGG(p.name || ' (' || ps.quantity || ' left)', ', ') WITHIN GROUP (ORDER BY p.product_id)
+    INTO v_short
+    FROM Products p
+    JOIN Product_Stock ps ON ps.product_id = p.product_id
+    JOIN (SELECT product_id, SUM(quantity) AS quantity FROM TABLE(p_lines) GROUP BY product_id) n
+      ON n.product_id = p.product_id
+    WHERE ps.quantity < n.quantity;
+    IF v_short IS NOT NULL THEN
+        RAISE_APPLICATION_ERROR(-20001, 'Not enough stock for: ' || v_short);
+    END IF;
+
+    -- Only the rows locked above: a product re-striped or un-striped meanwhile is left to
+    -- ApplyStockChange, which re-checks its stock
+    UPDATE Products p
+    SET quantity = quantity - (SELECT SUM(l.quantity) FROM TABLE(p_lines) l WHERE l.product_id = p.product_id)
+    WHERE product_id IN (SELECT COLUMN_VALUE FROM TABLE(v_locked));
+
+    FOR r IN (
+        SELECT l.product_id, SUM(l.quantity) AS quantity
+        FROM TABLE(p_lines) l
+        WHERE l.product_id NOT IN (SELECT COLUMN_VALUE FROM TABLE(v_locked))
+        GROUP BY l.product_id
+        ORDER BY l.product_id
+    ) LOOP
+        ApplyStockChange(r.product_id, -r.quantity, v_left);
+    END LOOP;
+
+    INSERT INTO Transactions (
+        transaction_id,
+        transaction_type,
+        quantity_change,
+        transaction_date,
+        product_id,
+        user_id
+    )
+    SELECT TRANSACTIONS_SEQ.NEXTVAL, 'Stock Out', -l.quantity, SYSDATE, l.product_id, p_user_id
+    FROM TABLE(p_lines) l;
+
+    COMMIT;
+EXCEPTION
     WHEN OTHERS THEN
         ROLLBACK;
         RAISE;
@@ -270,75 +449,426 @@ END;
 /
 
 
+-- CheckoutCart for callers that only know product names, in one call: p_cart is a JSON
+-- array of {"name", "quantity"} objects, resolved to product ids here rather than by a
+-- separate query, and no client-side object types are needed.
+CREATE OR REPLACE PROCEDURE CheckoutCartByName (
+    p_cart      IN VARCHAR2,
+    p_user_id   IN NUMBER
+)
+IS
+    v_lines     Cart_Lines;
+    v_missing   VARCHAR2(4000);
+BEGIN
+    SELECT LISTAGG(j.name, ', ') WITHIN GROUP (ORDER BY j.name)
+    INTO v_missing
+    FROM JSON_TABLE(p_cart, '$[*]' COLUMNS (name VARCHAR2(100) PATH '$.name')) j
+    WHERE NOT EXISTS (SELECT 1 FROM Products p WHERE p.name = j.name);
+    IF v_missing IS NOT NULL THEN
+        RAISE_APPLICATION_ERROR(-20002, 'Product not found: ' || v_missing);
+    END IF;
+
+    SELECT Cart_Line(
+               (SELECT MIN(p.product_id) FROM Products p WHERE p.name = j.name),
+               j.quantity
+           )
+    BULK COLLECT INTO v_lines
+    FROM JSON_TABLE(p_cart, '$[*]' COLUMNS (
+             name     VARCHAR2(100) PATH '$.name',
+             quantity NUMBER        PATH '$.quantity'
+         )) j;
+
+    CheckoutCart(v_lines, p_user_id);
+END;
+/
+
+
+CREATE OR REPLACE PROCEDURE ConductTransaction (
+    p_product_name      IN VARCHAR2,
+    p_quantity_change   IN NUMBER,
+    p_user_id           IN NUMBER
+)
+IS
+    v_product_id        NUMBER;
+    v_new_quantity      NUMBER;
+BEGIN
+    -- Resolve the name without locking; the stock change itself is keyed by product_id
+    SELECT product_id
+    INTO v_product_id
+    FROM Products
+    WHERE LOWER(name) = LOWER(p_product_name);
+
+    ConductTransactionById(v_product_id, p_quantity_change, p_user_id, v_new_quantity);
+EXCEPTION
+    WHEN NO_DATA_FOUND THEN
+        RAISE_APPLICATION_ERROR(-20002, 'Product not found.');
+END;
+/
+
+
 
 CREATE OR REPLACE PROCEDURE ReassignProductCluster (
     p_product_id     IN NUMBER,
     p_new_cluster_id IN NUMBER
 )
 AS
-    v_category         VARCHAR2(100);
-    v_old_cluster_id   NUMBER;
-    v_old_json_clob    CLOB;
-    v_new_json_clob    CLOB;
-    v_old_json         JSON_OBJECT_T;
-    v_new_json         JSON_OBJECT_T;
-    v_count            NUMBER;
-    v_updated_clob     CLOB;
 BEGIN
-    -- Get product category and old cluster
-    SELECT category, cluster_id INTO v_category, v_old_cluster_id
-    FROM Products
-    WHERE product_id = p_product_id;
-
-    -- Reassign the product to the new cluster
+    -- trg_cluster_category_counts and trg_cluster_stats move the product's
+    -- category count and totals from the old cluster to the new one
     UPDATE Products
     SET cluster_id = p_new_cluster_id
     WHERE product_id = p_product_id;
 
-    -- ==== Update OLD cluster ====
-    SELECT category_distribution INTO v_old_json_clob
-    FROM Clusters
-    WHERE cluster_id = v_old_cluster_id;
+    IF SQL%ROWCOUNT = 0 THEN
+        RAISE_APPLICATION_ERROR(-20003, 'Product not found.');
+    END IF;
 
-    v_old_json := JSON_OBJECT_T.parse(v_old_json_clob);
+    COMMIT;
+END;
+/
+
+
+
+
+-- Full recompute of the running totals from Products; used to backfill and to repair
+-- drift reported by Admin/Clusters/verify_cluster_stats.py
+CREATE OR REPLACE PROCEDURE RecomputeClusterStats
+AS
+BEGIN
+    MERGE INTO Clusters c
+    USING (
+        SELECT 
+            cl.cluster_id,
+            COUNT(p.product_id)          AS product_count,
+            NVL(SUM(p.quantity), 0)      AS sum_quantity,
+            NVL(SUM(p.price), 0)         AS sum_price,
+            NVL(SUM(p.sales), 0)         AS sum_sales,
+            NVL(SUM(p.rating), 0)        AS sum_popularity_score
+        FROM 
+            Clusters cl
+            LEFT JOIN Products p ON p.cluster_id = cl.cluster_id
+        GROUP BY 
+            cl.cluster_id
+    ) a
+    ON (c.cluster_id = a.cluster_id)
+    WHEN MATCHED THEN UPDATE SET
+        c.product_count        = a.product_count,
+        c.sum_quantity         = a.sum_quantity,
+        c.sum_price            = a.sum_price,
+        c.sum_sales            = a.sum_sales,
+        c.sum_popularity_score = a.sum_popularity_score,
+        c.avg_quantity         = NVL(ROUND(a.sum_quantity / NULLIF(a.product_count, 0), 2), c.avg_quantity),
+        c.avg_price            = NVL(ROUND(a.sum_price / NULLIF(a.product_count, 0), 2), c.avg_price),
+        c.avg_sales            = NVL(ROUND(a.sum_sales / NULLIF(a.product_count, 0), 2), c.avg_sales),
+        c.avg_popularity_score = NVL(ROUND(a.sum_popularity_score / NULLIF(a.product_count, 0), 2), c.avg_popularity_score);
+
+    COMMIT;
+END;
+/
+
+
+-- Rebuilds Cluster_Category_Counts from Products (backfill or repair)
+CREATE OR REPLACE PROCEDURE RebuildClusterCategoryCounts
+AS
+BEGIN
+    DELETE FROM Cluster_Category_Counts;
+
+    INSERT INTO Cluster_Category_Counts (cluster_id, category, cnt)
+    SELECT cluster_id, category, COUNT(*)
+    FROM Products
+    WHERE cluster_id IS NOT NULL
+      AND category IS NOT NULL
+    GROUP BY cluster_id, category;
+
+    COMMIT;
+END;
+/
 
-    IF v_old_json.get(v_category) IS NOT NULL THEN
-        v_count := v_old_json.get_Number(v_category);
-        IF v_count > 1 THEN
-            v_old_json.put(v_category, v_count - 1);
-        ELSE
-            v_old_json.remove(v_category);
-        END IF;
 
-        v_updated_clob := v_old_json.to_clob();
+-- Removes change-log rows every similarity index has long since applied; run nightly by
+-- the PURGE_PRODUCT_CHANGE_LOG job below
+CREATE OR REPLACE PROCEDURE PurgeProductChangeLog (
+    p_keep_hours IN NUMBER DEFAULT 24
+)
+AS
+BEGIN
+    DELETE FROM Product_Change_Log
+    WHERE changed_at < SYSTIMESTAMP - NUMTODSINTERVAL(p_keep_hours, 'HOUR');
+
+    COMMIT;
+END;
+/
+
+
+-- Switches a hot product to striped stock, changes its stripe count, or (p_stripes = 0)
+-- folds the stripes back into Products.quantity. p_stripes NULL keeps the current count;
+-- p_quantity, when given, replaces the stock total. Buyers holding a stripe finish first,
+-- because the DELETE waits for their row locks.
+CREATE OR REPLACE PROCEDURE StripeProductStock (
+    p_product_id    IN NUMBER,
+    p_stripes       IN NUMBER,
+    p_quantity      IN NUMBER DEFAULT NULL
+)
+IS
+    v_stripes   NUMBER;
+    v_total     NUMBER;
+BEGIN
+    IF p_stripes < 0 OR p_quantity < 0 THEN
+        RAISE_APPLICATION_ERROR(-20005, 'Stripe count and quantity cannot be negative.');
+    END IF;
 
-        UPDATE Clusters
-        SET category_distribution = v_updated_clob
-        WHERE cluster_id = v_old_cluster_id;
+    BEGIN
+        SELECT stock_stripes, quantity INTO v_stripes, v_total
+        FROM Products
+        WHERE product_id = p_product_id
+        FOR UPDATE;
+    EXCEPTION
+        WHEN NO_DATA_FOUND THEN
+            RAISE_APPLICATION_ERROR(-20002, 'Product not found.');
+    END;
+
+    -- Nothing to re-split for a product that stays unstriped with the same stock
+    IF v_stripes = 0 AND NVL(p_stripes, 0) <= 1 AND NVL(p_quantity, v_total) = v_total THEN
+        COMMIT;
+        RETURN;
     END IF;
 
-    -- ==== Update NEW cluster ====
-    SELECT category_distribution INTO v_new_json_clob
-    FROM Clusters
-    WHERE cluster_id = p_new_cluster_id;
+    IF v_stripes > 0 THEN
+        DELETE FROM Product_Stock_Stripes
+        WHERE product_id = p_product_id
+        RETURNING SUM(quantity) INTO v_total;
+    END IF;
 
-    v_new_json := JSON_OBJECT_T.parse(v_new_json_clob);
+    v_total := NVL(p_quantity, NVL(v_total, 0));
+    v_stripes := NVL(p_stripes, v_stripes);
+    IF v_stripes = 1 THEN
+        v_stripes := 0;
+    END IF;
 
-    IF v_new_json.get(v_category) IS NOT NULL THEN
-        v_count := v_new_json.get_Number(v_category);
-        v_new_json.put(v_category, v_count + 1);
-    ELSE
-        v_new_json.put(v_category, 1);
+    IF v_stripes > 0 THEN
+        INSERT INTO Product_Stock_Stripes (product_id, stripe, quantity)
+        SELECT p_product_id,
+               LEVEL - 1,
+               TRUNC(v_total / v_stripes) + CASE WHEN LEVEL <= MOD(v_total, v_stripes) THEN 1 ELSE 0 END
+        FROM dual
+        CONNECT BY LEVEL <= v_stripes;
     END IF;
 
-    v_updated_clob := v_new_json.to_clob();
+    UPDATE Products
+    SET quantity = v_total,
+        stock_stripes = v_stripes
+    WHERE product_id = p_product_id;
+
+    COMMIT;
+EXCEPTION
+    WHEN OTHERS THEN
+        ROLLBACK;
+        RAISE;
+END;
+/
+
 
-    UPDATE Clusters
-    SET category_distribution = v_updated_clob
-    WHERE cluster_id = p_new_cluster_id;
+-- Copies the live total of each striped product into its Products.quantity snapshot,
+-- which cluster statistics and the Products alert trigger read. The SYNC_STRIPED_STOCK
+-- job below runs it every five minutes; it locks each hot Products row only briefly.
+CREATE OR REPLACE PROCEDURE SyncStripedStock
+IS
+BEGIN
+    MERGE INTO Products p
+    USING (
+        SELECT product_id, SUM(quantity) AS quantity
+        FROM Product_Stock_Stripes
+        GROUP BY product_id
+    ) s
+    ON (p.product_id = s.product_id)
+    WHEN MATCHED THEN
+        UPDATE SET p.quantity = s.quantity
+        WHERE p.stock_stripes > 0 AND p.quantity <> s.quantity;
 
     COMMIT;
 END;
 /
 
 
+-- Raises today's low-stock alert for every listed product at or below its threshold:
+-- the product's own low_stock_threshold, else its category's, else 50. Reads live totals
+-- from Product_Stock, so striped products are covered. Called by the alert triggers once
+-- per statement; does not commit.
+CREATE OR REPLACE PROCEDURE RaiseStockAlerts (
+    p_product_ids   IN Id_List
+)
+IS
+    c_default_threshold CONSTANT NUMBER := 50;
+BEGIN
+    FOR attempt IN 1 .. 2 LOOP
+        BEGIN
+            MERGE INTO Inventory_Alerts a
+            USING (
+                SELECT
+                    p.product_id,
+                    CASE WHEN s.quantity = 0 THEN 'Stock Finished' ELSE 'Low Stock' END AS alert_type,
+                    CASE
+                        WHEN s.quantity = 0 THEN 'Product "' || p.name || '" is out of stock!'
+                        ELSE 'Product "' || p.name || '" has low stock (Qty: ' || s.quantity || ')'
+                    END AS message
+                FROM Products p
+                JOIN Product_Stock s ON s.product_id = p.product_id
+                LEFT JOIN Category_Stock_Thresholds t ON t.category = p.category
+                WHERE p.product_id IN (SELECT DISTINCT COLUMN_VALUE FROM TABLE(p_product_ids))
+                  AND s.quantity <= COALESCE(p.low_stock_threshold, t.threshold, c_default_threshold)
+            ) n
+            ON (a.product_id = n.product_id AND a.alert_date = TRUNC(SYSDATE))
+            WHEN NOT MATCHED THEN
+                INSERT (product_id, alert_date, alert_type, message, is_processed)
+                VALUES (n.product_id, TRUNC(SYSDATE), n.alert_type, n.message, 0);
+            RETURN;
+        EXCEPTION
+            WHEN DUP_VAL_ON_INDEX THEN
+                NULL;   -- a concurrent statement committed one of today's alerts first; merge again past it
+        END;
+    END LOOP;
+END;
+/
+
+
+-- Moves processed alerts older than p_keep_days days into Inventory_Alerts_Archive, in
+-- committed batches. Today's processed alerts always stay: RaiseStockAlerts uses them to
+-- avoid re-raising an alert that has already been acknowledged.
+CREATE OR REPLACE PROCEDURE ArchiveProcessedAlerts (
+    p_keep_days     IN NUMBER DEFAULT 1,
+    p_archived      OUT NUMBER
+)
+IS
+    TYPE t_ids IS TABLE OF Inventory_Alerts.product_id%TYPE;
+    TYPE t_dates IS TABLE OF Inventory_Alerts.alert_date%TYPE;
+    TYPE t_types IS TABLE OF Inventory_Alerts.alert_type%TYPE;
+    TYPE t_messages IS TABLE OF Inventory_Alerts.message%TYPE;
+    v_ids       t_ids;
+    v_dates     t_dates;
+    v_types     t_types;
+    v_messages  t_messages;
+    v_cutoff    DATE := TRUNC(SYSDATE) - GREATEST(NVL(p_keep_days, 1), 1) + 1;
+BEGIN
+    p_archived := 0;
+    LOOP
+        DELETE FROM Inventory_Alerts
+        WHERE is_processed = 1
+          AND alert_date < v_cutoff
+          AND ROWNUM <= 10000
+        RETURNING product_id, alert_date, alert_type, message
+        BULK COLLECT INTO v_ids, v_dates, v_types, v_messages;
+        EXIT WHEN v_ids.COUNT = 0;
+
+        FORALL i IN 1 .. v_ids.COUNT
+            INSERT INTO Inventory_Alerts_Archive (product_id, alert_date, alert_type, message)
+            VALUES (v_ids(i), v_dates(i), v_types(i), v_messages(i));
+
+        p_archived := p_archived + v_ids.COUNT;
+        COMMIT;
+    END LOOP;
+END;
+/
+
+
+-- Nightly archiving; needs the CREATE JOB privilege. Drop with
+-- EXEC DBMS_SCHEDULER.DROP_JOB('ARCHIVE_PROCESSED_ALERTS');
+-- The job is dropped first (if it exists) so this script can be re-run.
+DECLARE
+    no_such_job EXCEPTION;
+    PRAGMA EXCEPTION_INIT(no_such_job, -27475);
+BEGIN
+    BEGIN
+        DBMS_SCHEDULER.DROP_JOB('ARCHIVE_PROCESSED_ALERTS');
+    EXCEPTION
+        WHEN no_such_job THEN
+            NULL;
+    END;
+
+    DBMS_SCHEDULER.CREATE_JOB(
+        job_name        => 'ARCHIVE_PROCESSED_ALERTS',
+        job_type        => 'PLSQL_BLOCK',
+        job_action      => 'DECLARE n NUMBER; BEGIN ArchiveProcessedAlerts(7, n); END;',
+        start_date      => TRUNC(SYSTIMESTAMP) + 1 + 3 / 24,
+        repeat_interval => 'FREQ=DAILY;BYHOUR=3',
+        enabled         => TRUE,
+        comments        => 'Moves processed inventory alerts older than a week to Inventory_Alerts_Archive'
+    );
+END;
+/
+
+
+
+-- Striped products' Products.quantity snapshot, refreshed every five minutes. Re-runnable
+-- like the jobs around it.
+DECLARE
+    no_such_job EXCEPTION;
+    PRAGMA EXCEPTION_INIT(no_such_job, -27475);
+BEGIN
+    BEGIN
+        DBMS_SCHEDULER.DROP_JOB('SYNC_STRIPED_STOCK');
+    EXCEPTION
+        WHEN no_such_job THEN
+            NULL;
+    END;
+
+    DBMS_SCHEDULER.CREATE_JOB(
+        job_name        => 'SYNC_STRIPED_STOCK',
+        job_type        => 'PLSQL_BLOCK',
+        job_action      => 'BEGIN SyncStripedStock; END;',
+        start_date      => SYSTIMESTAMP,
+        repeat_interval => 'FREQ=MINUTELY;INTERVAL=5',
+        enabled         => TRUE,
+        comments        => 'Copies striped products'' live stock into Products.quantity'
+    );
+END;
+/
+
+
+-- Nightly trim of Product_Change_Log to the last day
+DECLARE
+    no_such_job EXCEPTION;
+    PRAGMA EXCEPTION_INIT(no_such_job, -27475);
+BEGIN
+    BEGIN
+        DBMS_SCHEDULER.DROP_JOB('PURGE_PRODUCT_CHANGE_LOG');
+    EXCEPTION
+        WHEN no_such_job THEN
+            NULL;
+    END;
+
+    DBMS_SCHEDULER.CREATE_JOB(
+        job_name        => 'PURGE_PRODUCT_CHANGE_LOG',
+        job_type        => 'PLSQL_BLOCK',
+        job_action      => 'BEGIN PurgeProductChangeLog(24); END;',
+        start_date      => TRUNC(SYSTIMESTAMP) + 1 + 4 / 24,
+        repeat_interval => 'FREQ=DAILY;BYHOUR=4',
+        enabled         => TRUE,
+        comments        => 'Removes Product_Change_Log rows older than 24 hours'
+    );
+END;
+/
+
+-- Hourly refresh of the cluster quantity totals, which trg_cluster_stats leaves to
+-- RecomputeClusterStats. Re-runnable like the job above.
+DECLARE
+    no_such_job EXCEPTION;
+    PRAGMA EXCEPTION_INIT(no_such_job, -27475);
+BEGIN
+    BEGIN
+        DBMS_SCHEDULER.DROP_JOB('RECOMPUTE_CLUSTER_STATS');
+    EXCEPTION
+        WHEN no_such_job THEN
+            NULL;
+    END;
+
+    DBMS_SCHEDULER.CREATE_JOB(
+        job_name        => 'RECOMPUTE_CLUSTER_STATS',
+        job_type        => 'PLSQL_BLOCK',
+        job_action      => 'BEGIN RecomputeClusterStats; END;',
+        start_date      => SYSTIMESTAMP,
+        repeat_interval => 'FREQ=HOURLY',
+        enabled         => TRUE,
+        comments        => 'Recomputes cluster sums and averages, including quantity, from Products'
+    );
+END;
+/
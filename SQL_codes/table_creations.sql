@@ -11,9 +11,36 @@ CREATE TABLE Clusters (
     avg_price NUMBER(10,2),
     avg_sales NUMBER,
     avg_popularity_score NUMBER(3,2),
-    category_distribution CLOB
+    -- Running totals behind the averages, maintained by trg_cluster_stats
+    product_count NUMBER DEFAULT 0 NOT NULL,
+    sum_quantity NUMBER DEFAULT 0 NOT NULL,
+    sum_price NUMBER DEFAULT 0 NOT NULL,
+    sum_sales NUMBER DEFAULT 0 NOT NULL,
+    sum_popularity_score NUMBER DEFAULT 0 NOT NULL
 );
 
+-- Products per (cluster, category), maintained by trg_cluster_category_counts
+CREATE TABLE Cluster_Category_Counts (
+    cluster_id NUMBER,
+    category VARCHAR2(50),
+    cnt NUMBER NOT NULL,
+    PRIMARY KEY (cluster_id, category),
+    CONSTRAINT fk_ccc_cluster FOREIGN KEY (cluster_id) REFERENCES Clusters(cluster_id)
+) ORGANIZATION INDEX;
+
+-- Inverted index: category -> clusters, largest count first, for recommendation lookups
+CREATE INDEX idx_category_clusters ON Cluster_Category_Counts (LOWER(category), cnt DESC, cluster_id);
+
+-- JSON form of the counts for readers that still expect Clusters.category_distribution
+CREATE OR REPLACE VIEW Cluster_Category_Distribution AS
+SELECT 
+    cluster_id,
+    JSON_OBJECTAGG(KEY category VALUE cnt RETURNING CLOB) AS category_distribution
+FROM 
+    Cluster_Category_Counts
+GROUP BY 
+    cluster_id;
+
 CREATE TABLE Products (
     product_id NUMBER PRIMARY KEY,
     name VARCHAR2(100),
@@ -24,6 +51,10 @@ CREATE TABLE Products (
     rating NUMBER(3,2),
     cluster_id NUMBER, 
     supplier_id NUMBER, 
+    -- > 0 when the stock lives in Product_Stock_Stripes (see StripeProductStock)
+    stock_stripes NUMBER DEFAULT 0 NOT NULL,
+    -- Low-stock alert level; NULL falls back to Category_Stock_Thresholds, then 50
+    low_stock_threshold NUMBER CHECK (low_stock_threshold >= 0),
     CONSTRAINT fk_product_cluster FOREIGN KEY (cluster_id) REFERENCES Clusters(cluster_id),
     CONSTRAINT fk_product_supplier FOREIGN KEY (supplier_id) REFERENCES Suppliers(supplier_id)
 );
@@ -55,3 +86,95 @@ CREATE TABLE Inventory_Alerts (
     PRIMARY KEY (product_id, alert_date), 
     CONSTRAINT fk_alert_product FOREIGN KEY (product_id) REFERENCES Products(product_id)
 );
+
+-- Alert queue: pending (or processed) alerts newest first, one index range scan per page
+CREATE INDEX idx_alerts_pending ON Inventory_Alerts (is_processed, alert_date, product_id);
+
+-- Processed alerts moved out of Inventory_Alerts by ArchiveProcessedAlerts
+CREATE TABLE Inventory_Alerts_Archive (
+    product_id NUMBER,
+    alert_date DATE,
+    alert_type VARCHAR2(50),
+    message VARCHAR2(255),
+    archived_at DATE DEFAULT SYSDATE NOT NULL,
+    PRIMARY KEY (product_id, alert_date)
+);
+
+-- Highest product threshold as a min/max index probe, for trg_stripe_inventory_alert's pre-filter
+CREATE INDEX idx_products_low_stock_threshold ON Products (low_stock_threshold);
+
+-- Low-stock alert level per category, for products without their own threshold
+CREATE TABLE Category_Stock_Thresholds (
+    category VARCHAR2(50) PRIMARY KEY,
+    threshold NUMBER NOT NULL CHECK (threshold >= 0)
+);
+
+-- Single-row change counter bumped by triggers whenever the catalog lists change
+CREATE TABLE Catalog_Version (
+    id NUMBER PRIMARY KEY CHECK (id = 1),
+    version NUMBER DEFAULT 0 NOT NULL
+);
+
+INSERT INTO Catalog_Version (id, version) VALUES (1, 0);
+COMMIT;
+
+-- Per-session staging for bulk product-to-cluster reassignment
+CREATE GLOBAL TEMPORARY TABLE Cluster_Reassignments (
+    product_id NUMBER PRIMARY KEY,
+    new_cluster_id NUMBER NOT NULL
+) ON COMMIT DELETE ROWS;
+
+-- Products whose recommendation features changed, read by the in-memory similarity index
+CREATE TABLE Product_Change_Log (
+    product_id NUMBER NOT NULL,
+    changed_at TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL
+);
+
+CREATE INDEX idx_product_change_log_time ON Product_Change_Log (changed_at);
+
+-- Ranked recommendations: top-k of one cluster and category by each sort key, read from the index
+CREATE INDEX idx_products_rank_rating ON Products (cluster_id, LOWER(category), rating, product_id);
+CREATE INDEX idx_products_rank_price ON Products (cluster_id, LOWER(category), price, product_id);
+CREATE INDEX idx_products_rank_sales ON Products (cluster_id, LOWER(category), sales, product_id);
+
+-- Product ids collected by statement-level triggers and passed to RaiseStockAlerts
+CREATE OR REPLACE TYPE Id_List AS TABLE OF NUMBER;
+/
+
+-- Cart lines passed to CheckoutCart as one array bind
+CREATE OR REPLACE TYPE Cart_Line AS OBJECT (
+    product_id NUMBER,
+    quantity   NUMBER
+);
+/
+
+CREATE OR REPLACE TYPE Cart_Lines AS TABLE OF Cart_Line;
+/
+
+-- Keyset pagination of transaction history filtered by user or product
+CREATE INDEX idx_transactions_user ON Transactions (user_id, transaction_id);
+CREATE INDEX idx_transactions_product ON Transactions (product_id, transaction_id);
+CREATE INDEX idx_transactions_date ON Transactions (transaction_date);
+
+-- Stock of hot products split across sub-rows, so concurrent buyers lock different rows.
+-- Products.quantity of a striped product is a snapshot refreshed by SyncStripedStock.
+CREATE TABLE Product_Stock_Stripes (
+    product_id NUMBER,
+    stripe NUMBER,
+    quantity NUMBER NOT NULL CHECK (quantity >= 0),
+    PRIMARY KEY (product_id, stripe),
+    CONSTRAINT fk_stripe_product FOREIGN KEY (product_id) REFERENCES Products(product_id) ON DELETE CASCADE
+) INITRANS 16;
+
+-- Live stock of every product, striped or not
+CREATE OR REPLACE VIEW Product_Stock AS
+SELECT
+    p.product_id,
+    CASE
+        WHEN p.stock_stripes > 0 THEN
+            (SELECT SUM(s.quantity) FROM Product_Stock_Stripes s WHERE s.product_id = p.product_id)
+        ELSE p.quantity
+    END AS quantity,
+    p.stock_stripes
+FROM
+    Products p;
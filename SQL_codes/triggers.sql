@@ -9,32 +9,266 @@ END;
 /
 
 
+-- Stock changes are collected per statement and checked with one RaiseStockAlerts MERGE,
+-- so a bulk stock update costs one alert statement instead of an insert per row.
+-- Rows are only collected when the new quantity could be at or below a threshold: the
+-- product's own, else the highest category threshold (or the default 50), read once per
+-- statement. Ordinary purchases of well-stocked products never reach the MERGE.
 CREATE OR REPLACE TRIGGER trg_inventory_alert
-AFTER UPDATE OF quantity ON Products
-FOR EACH ROW
-WHEN (NEW.quantity <= 50 AND NEW.quantity <> OLD.quantity)
-DECLARE
-    v_alert_type VARCHAR2(50);
-    v_message VARCHAR2(255);
+FOR UPDATE OF quantity ON Products
+COMPOUND TRIGGER
+
+    g_ids       Id_List := Id_List();
+    g_ceiling   NUMBER;
+
+    BEFORE STATEMENT IS
+    BEGIN
+        SELECT GREATEST(NVL(MAX(threshold), 0), 50) INTO g_ceiling FROM Category_Stock_Thresholds;
+    END BEFORE STATEMENT;
+
+    AFTER EACH ROW IS
+    BEGIN
+        IF :NEW.quantity <> :OLD.quantity
+           AND :NEW.quantity <= NVL(:NEW.low_stock_threshold, g_ceiling) THEN
+            g_ids.EXTEND;
+            g_ids(g_ids.COUNT) := :NEW.product_id;
+        END IF;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+    BEGIN
+        IF g_ids.COUNT > 0 THEN
+            RaiseStockAlerts(g_ids);
+            g_ids.DELETE;
+        END IF;
+    END AFTER STATEMENT;
+
+END trg_inventory_alert;
+/
+
+-- Statement-level, so a bulk write bumps the catalog version once.
+-- Quantity/price/sales changes do not affect the selectbox lists and are ignored.
+CREATE OR REPLACE TRIGGER trg_catalog_version_products
+AFTER INSERT OR DELETE OR UPDATE OF name, category, cluster_id ON Products
 BEGIN
-    -- Determine the type of alert
-    IF :NEW.quantity = 0 THEN
-        v_alert_type := 'Stock Finished';
-        v_message := 'Product "' || :NEW.name || '" is out of stock!';
-    ELSE
-        v_alert_type := 'Low Stock';
-        v_message := 'Product "' || :NEW.name || '" has low stock (Qty: ' || :NEW.quantity || ')';
-    END IF;
+    UPDATE Catalog_Version SET version = version + 1 WHERE id = 1;
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_catalog_version_suppliers
+AFTER INSERT OR DELETE OR UPDATE OF name ON Suppliers
+BEGIN
+    UPDATE Catalog_Version SET version = version + 1 WHERE id = 1;
+END;
+/
+
+CREATE OR REPLACE TRIGGER trg_catalog_version_clusters
+AFTER INSERT OR DELETE OR UPDATE OF cluster_id ON Clusters
+BEGIN
+    UPDATE Catalog_Version SET version = version + 1 WHERE id = 1;
+END;
+/
+
+
+-- Keeps Clusters' running sums, counts and averages in step with Products.
+-- Row changes are folded into one delta per cluster and applied once per statement,
+-- in ascending cluster_id order so concurrent writers always lock clusters in the same order.
+-- Quantity is deliberately left out: it changes on every purchase, and taking the cluster
+-- row lock there would make all buyers in a cluster queue behind one row. sum_quantity and
+-- avg_quantity are refreshed by RecomputeClusterStats instead.
+CREATE OR REPLACE TRIGGER trg_cluster_stats
+FOR INSERT OR DELETE OR UPDATE OF price, sales, rating, cluster_id ON Products
+COMPOUND TRIGGER
+
+    TYPE t_delta IS RECORD (
+        cnt   NUMBER := 0,
+        price NUMBER := 0,
+        sales NUMBER := 0,
+        pop   NUMBER := 0
+    );
+    TYPE t_deltas IS TABLE OF t_delta INDEX BY PLS_INTEGER;
+    g_deltas t_deltas;
+
+    PROCEDURE add_delta (
+        p_cluster_id NUMBER,
+        p_sign       NUMBER,
+        p_price      NUMBER,
+        p_sales      NUMBER,
+        p_rating     NUMBER
+    ) IS
+        v_delta t_delta;
+    BEGIN
+        IF p_cluster_id IS NULL THEN
+            RETURN;
+        END IF;
+        IF g_deltas.EXISTS(p_cluster_id) THEN
+            v_delta := g_deltas(p_cluster_id);
+        END IF;
+        v_delta.cnt   := v_delta.cnt   + p_sign;
+        v_delta.price := v_delta.price + p_sign * NVL(p_price, 0);
+        v_delta.sales := v_delta.sales + p_sign * NVL(p_sales, 0);
+        v_delta.pop   := v_delta.pop   + p_sign * NVL(p_rating, 0);
+        g_deltas(p_cluster_id) := v_delta;
+    END add_delta;
+
+    AFTER EACH ROW IS
+    BEGIN
+        IF UPDATING OR DELETING THEN
+            add_delta(:OLD.cluster_id, -1, :OLD.price, :OLD.sales, :OLD.rating);
+        END IF;
+        IF INSERTING OR UPDATING THEN
+            add_delta(:NEW.cluster_id, 1, :NEW.price, :NEW.sales, :NEW.rating);
+        END IF;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+        v_cluster_id PLS_INTEGER := g_deltas.FIRST;
+        v_delta      t_delta;
+    BEGIN
+        WHILE v_cluster_id IS NOT NULL LOOP
+            v_delta := g_deltas(v_cluster_id);
+            -- Right-hand sides see the pre-update values, so the averages use the new totals
+            UPDATE Clusters
+            SET product_count        = product_count + v_delta.cnt,
+                sum_price            = sum_price + v_delta.price,
+                sum_sales            = sum_sales + v_delta.sales,
+                sum_popularity_score = sum_popularity_score + v_delta.pop,
+                avg_price            = NVL(ROUND((sum_price + v_delta.price) / NULLIF(product_count + v_delta.cnt, 0), 2), avg_price),
+                avg_sales            = NVL(ROUND((sum_sales + v_delta.sales) / NULLIF(product_count + v_delta.cnt, 0), 2), avg_sales),
+                avg_popularity_score = NVL(ROUND((sum_popularity_score + v_delta.pop) / NULLIF(product_count + v_delta.cnt, 0), 2), avg_popularity_score)
+            WHERE cluster_id = v_cluster_id;
+            v_cluster_id := g_deltas.NEXT(v_cluster_id);
+        END LOOP;
+        g_deltas.DELETE;
+    END AFTER STATEMENT;
+
+END trg_cluster_stats;
+/
+
+
+-- Keeps Cluster_Category_Counts in step with Products. Changes are netted per
+-- (cluster, category) and applied once per statement as single-row increments;
+-- entries that reach zero are removed, like keys dropped from the old JSON.
+CREATE OR REPLACE TRIGGER trg_cluster_category_counts
+FOR INSERT OR DELETE OR UPDATE OF category, cluster_id ON Products
+COMPOUND TRIGGER
+
+    TYPE t_count_delta IS RECORD (
+        cluster_id NUMBER,
+        category   VARCHAR2(50),
+        delta      NUMBER := 0
+    );
+    TYPE t_deltas IS TABLE OF t_count_delta INDEX BY VARCHAR2(100);
+    g_deltas t_deltas;
+
+    PROCEDURE add_delta (
+        p_cluster_id NUMBER,
+        p_category   VARCHAR2,
+        p_delta      NUMBER
+    ) IS
+        v_key VARCHAR2(100);
+    BEGIN
+        IF p_cluster_id IS NULL OR p_category IS NULL THEN
+            RETURN;
+        END IF;
+        v_key := TO_CHAR(p_cluster_id) || '|' || p_category;
+        IF NOT g_deltas.EXISTS(v_key) THEN
+            g_deltas(v_key).cluster_id := p_cluster_id;
+            g_deltas(v_key).category := p_category;
+        END IF;
+        g_deltas(v_key).delta := g_deltas(v_key).delta + p_delta;
+    END add_delta;
 
+    AFTER EACH ROW IS
     BEGIN
-        INSERT INTO Inventory_Alerts (
-            product_id, alert_date, alert_type, message, is_processed
-        ) VALUES (
-            :NEW.product_id, TRUNC(SYSDATE), v_alert_type, v_message, 0
-        );
-    EXCEPTION
-        WHEN DUP_VAL_ON_INDEX THEN
-            NULL; 
-    END;
+        IF UPDATING OR DELETING THEN
+            add_delta(:OLD.cluster_id, :OLD.category, -1);
+        END IF;
+        IF INSERTING OR UPDATING THEN
+            add_delta(:NEW.cluster_id, :NEW.category, 1);
+        END IF;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+        v_key        VARCHAR2(100) := g_deltas.FIRST;
+        v_cluster_id NUMBER;
+        v_category   VARCHAR2(50);
+        v_delta      NUMBER;
+    BEGIN
+        WHILE v_key IS NOT NULL LOOP
+            v_cluster_id := g_deltas(v_key).cluster_id;
+            v_category := g_deltas(v_key).category;
+            v_delta := g_deltas(v_key).delta;
+
+            IF v_delta != 0 THEN
+                MERGE INTO Cluster_Category_Counts c
+                USING dual
+                ON (c.cluster_id = v_cluster_id AND c.category = v_category)
+                WHEN MATCHED THEN
+                    UPDATE SET c.cnt = c.cnt + v_delta
+                    DELETE WHERE c.cnt <= 0
+                WHEN NOT MATCHED THEN
+                    INSERT (cluster_id, category, cnt)
+                    VALUES (v_cluster_id, v_category, v_delta)
+                    WHERE v_delta > 0;
+            END IF;
+
+            v_key := g_deltas.NEXT(v_key);
+        END LOOP;
+        g_deltas.DELETE;
+    END AFTER STATEMENT;
+
+END trg_cluster_category_counts;
+/
+
+
+-- Records products whose similarity features changed (see User/Products/similarity.py)
+CREATE OR REPLACE TRIGGER trg_product_change_log
+AFTER INSERT OR DELETE OR UPDATE OF category, price, sales, rating ON Products
+FOR EACH ROW
+BEGIN
+    INSERT INTO Product_Change_Log (product_id)
+    VALUES (NVL(:NEW.product_id, :OLD.product_id));
 END;
-/
\ No newline at end of file
+/
+
+
+-- Low-stock alerts for striped products, which trg_inventory_alert cannot see between
+-- SyncStripedStock runs. Same per-statement collection as trg_inventory_alert. A product's
+-- total can only be at or below a threshold if each stripe is, so a stripe above the highest
+-- threshold in use (product, category or the default 50) is skipped.
+CREATE OR REPLACE TRIGGER trg_stripe_inventory_alert
+FOR UPDATE OF quantity ON Product_Stock_Stripes
+COMPOUND TRIGGER
+
+    g_ids       Id_List := Id_List();
+    g_ceiling   NUMBER;
+
+    BEFORE STATEMENT IS
+    BEGIN
+        SELECT GREATEST(
+                   NVL((SELECT MAX(threshold) FROM Category_Stock_Thresholds), 0),
+                   NVL((SELECT MAX(low_stock_threshold) FROM Products), 0),
+                   50)
+        INTO g_ceiling
+        FROM dual;
+    END BEFORE STATEMENT;
+
+    AFTER EACH ROW IS
+    BEGIN
+        IF :NEW.quantity <> :OLD.quantity AND :NEW.quantity <= g_ceiling THEN
+            g_ids.EXTEND;
+            g_ids(g_ids.COUNT) := :NEW.product_id;
+        END IF;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+    BEGIN
+        IF g_ids.COUNT > 0 THEN
+            RaiseStockAlerts(g_ids);
+            g_ids.DELETE;
+        END IF;
+    END AFTER STATEMENT;
+
+END trg_stripe_inventory_alert;
+/
@@ -1,37 +1,85 @@
 import cx_Oracle
-from dotenv import load_dotenv
-import os
-load_dotenv()
+import json
+from collections import namedtuple
+from Database import pool
+from Database.fetch import fetch_refcursor
+from Database.output import MAX_BUFFER_SIZE, call_with_output
+from User.Products import similarity
 
-# === DB connection setup ===
-dsn = cx_Oracle.makedsn("localhost", 1521, service_name="orcl")
-username = os.getenv("db_username")
-password = os.getenv("db_password")
+# section is ITEM (the product's own cluster), SIMILAR or FALLBACK (cluster -1)
+RecommendedItem = namedtuple("RecommendedItem", ["section", "cluster_id", "product_id", "name", "price", "rating"])
+SimilarItem = namedtuple("SimilarItem", ["product_id", "name", "category", "cluster_id", "price", "rating", "similarity"])
+# score is the sort key's value (or the cosine similarity when sorting by similarity)
+RankedItem = namedtuple("RankedItem", ["section", "cluster_id", "product_id", "name", "price", "rating", "sales", "score"])
+
+# Sort key -> (column, direction); each column has a (cluster_id, LOWER(category), column, product_id) index
+SORT_KEYS = {
+    "rating": ("rating", "DESC"),
+    "sales": ("sales", "DESC"),
+    "price": ("price", "ASC"),
+    "similarity": None,
+}
+MAX_K = 100
+
+# Chooses clusters like GetRecommendedItems, then takes the top rows of each chosen cluster
+# straight from the sort key's index (FETCH FIRST inside CROSS APPLY) and merges those.
+# Work grows with k, not with the size of the clusters.
+RANKED_SQL = """
+    WITH item AS (
+        SELECT category, cluster_id
+        FROM Products
+        WHERE UPPER(name) = UPPER(:query)
+        FETCH FIRST 1 ROWS ONLY
+    ),
+    target AS (
+        SELECT NVL((SELECT category FROM item), :query) AS category,
+               (SELECT cluster_id FROM item) AS item_cluster_id
+        FROM dual
+    ),
+    candidate_clusters AS (
+        SELECT cc.cluster_id
+        FROM Cluster_Category_Counts cc, target t
+        WHERE LOWER(cc.category) = LOWER(t.category)
+          AND cc.cluster_id != -1
+        ORDER BY cc.cnt DESC, cc.cluster_id
+        FETCH FIRST 4 ROWS ONLY
+    ),
+    other_clusters AS (
+        SELECT c.cluster_id
+        FROM candidate_clusters c, target t
+        WHERE t.item_cluster_id IS NULL OR c.cluster_id != t.item_cluster_id
+    ),
+    chosen_clusters AS (
+        SELECT 'ITEM' AS section, item_cluster_id AS cluster_id FROM target WHERE item_cluster_id IS NOT NULL
+        UNION ALL
+        SELECT 'SIMILAR', cluster_id FROM other_clusters
+        UNION ALL
+        SELECT 'FALLBACK', -1 FROM dual WHERE NOT EXISTS (SELECT 1 FROM other_clusters)
+    )
+    SELECT c.section, r.cluster_id, r.product_id, r.name, r.price, r.rating, r.sales, r.sort_value
+    FROM chosen_clusters c
+    CROSS JOIN target t
+    CROSS APPLY (
+        SELECT p.cluster_id, p.product_id, p.name, p.price, p.rating, p.sales, p.{column} AS sort_value
+        FROM Products p
+        WHERE p.cluster_id = c.cluster_id
+          AND LOWER(p.category) = LOWER(t.category)
+          AND p.{column} IS NOT NULL
+          {after}
+        ORDER BY p.{column} {direction}, p.product_id {direction}
+        FETCH FIRST :fetch_rows ROWS ONLY
+    ) r
+    ORDER BY r.sort_value {direction}, r.product_id {direction}
+    FETCH FIRST :fetch_rows ROWS ONLY
+"""
 
 
 def recommend_items_by_category(category):
     try:
-        connection = cx_Oracle.connect(
-            user=username,
-            password=password,
-            dsn=dsn,
-        )
+        connection = pool.get_connection()
         cursor = connection.cursor()
-        cursor.callproc("DBMS_OUTPUT.ENABLE")
-
-        cursor.callproc("RecommendItemsByCategory", [category])
-        
-        status_var = cursor.var(cx_Oracle.NUMBER)
-        line_var = cursor.var(cx_Oracle.STRING)
-
-        output_lines = []
-        while True:
-            cursor.callproc("DBMS_OUTPUT.GET_LINE", (line_var, status_var))
-            if status_var.getvalue() != 0:
-                break
-            output_lines.append(line_var.getvalue())
-
-        return output_lines
+        # Up to four whole clusters are listed, so this takes the largest bounded buffer
+        return call_with_output(cursor, "RecommendItemsByCategory", [category], buffer_size=MAX_BUFFER_SIZE)
 
     except cx_Oracle.DatabaseError as e:
         error, = e.args
@@ -41,3 +89,92 @@ def recommend_items_by_category(category):
         if 'connection' in locals() and connection:
             connection.close()
 
+
+def get_recommendations(category):
+    try:
+        with pool.get_connection() as connection:
+            cursor = connection.cursor()
+            return fetch_refcursor(cursor, "GetRecommendedItems", [category], RecommendedItem)
+
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        return {"error": f"❌ Database Error: {error.message}"}
+
+
+def get_similar_products(product_name, k=10):
+    # Nearest-neighbour engine: the k products closest to `product_name` in price, sales,
+    # rating and category, best first. Ranking happens in memory; the database is only
+    # asked for the product id and for the details of the k results.
+    try:
+        with pool.get_connection() as connection:
+            cursor = connection.cursor()
+            cursor.execute("SELECT product_id FROM Products WHERE name = :1 FETCH FIRST 1 ROWS ONLY", [product_name])
+            row = cursor.fetchone()
+            if not row:
+                return {"error": f"❌ Product '{product_name}' not found."}
+
+            neighbours = similarity.similar_products(row[0], k)
+            if not neighbours:
+                return []
+            scores = dict(neighbours)
+            binds = ", ".join(f":{i + 1}" for i in range(len(scores)))
+            cursor.execute(f"""
+                SELECT product_id, name, category, cluster_id, price, rating
+                FROM Products
+                WHERE product_id IN ({binds})
+            """, list(scores))
+            details = {r[0]: r for r in cursor}
+            return [SimilarItem(*details[pid], similarity=score) for pid, score in neighbours if pid in details]
+
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        return {"error": f"❌ Database Error: {error.message}"}
+
+
+def get_ranked_recommendations(category_or_name, k=20, sort="rating", cursor=None):
+    # One page of at most k recommendations, best first by `sort`.
+    # Returns {"items": [RankedItem], "next_cursor": str or None}; pass next_cursor back for the next page.
+    if sort not in SORT_KEYS:
+        return {"error": f"❌ Unknown sort key '{sort}'. Use one of: {', '.join(SORT_KEYS)}."}
+    k = max(1, min(int(k), MAX_K))
+    after = json.loads(cursor) if cursor else None
+    if sort == "similarity":
+        return _ranked_by_similarity(category_or_name, k, after[0] if after else 0)
+
+    column, direction = SORT_KEYS[sort]
+    bind_vars = {"query": category_or_name, "fetch_rows": k + 1}
+    after_sql = ""
+    if after:
+        op = "<" if direction == "DESC" else ">"
+        after_sql = (f"AND (p.{column} {op} :after_value "
+                     f"OR (p.{column} = :after_value AND p.product_id {op} :after_id))")
+        bind_vars["after_value"], bind_vars["after_id"] = after
+
+    try:
+        with pool.get_connection() as connection:
+            db_cursor = connection.cursor()
+            db_cursor.arraysize = k + 1
+            db_cursor.execute(RANKED_SQL.format(column=column, direction=direction, after=after_sql), bind_vars)
+            rows = [RankedItem(*r) for r in db_cursor]
+
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        return {"error": f"❌ Database Error: {error.message}"}
+
+    items = rows[:k]
+    next_cursor = json.dumps([items[-1].score, items[-1].product_id]) if len(rows) > k else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def _ranked_by_similarity(product_name, k, offset):
+    # The in-memory index ranks the whole catalog with one argpartition, so a page
+    # costs the same however large the clusters are; the cursor is an offset
+    similar = get_similar_products(product_name, offset + k + 1)
+    if isinstance(similar, dict):
+        return similar
+    items = [
+        RankedItem("SIMILAR", s.cluster_id, s.product_id, s.name, s.price, s.rating, None, s.similarity)
+        for s in similar[offset:offset + k]
+    ]
+    next_cursor = json.dumps([offset + k]) if len(similar) > offset + k else None
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,184 @@
+# In-memory nearest-neighbour recommender: "products like this one" by cosine
+# similarity over (price, sales, rating) z-scores plus a one-hot category.
+#
+# The one-hot part is never materialised. Every product has exactly one category,
+# so its contribution to a dot product is WEIGHT^2 when the categories match and 0
+# otherwise, and it adds WEIGHT^2 to every squared norm. The index therefore stores
+# an (n, 3) float32 matrix, int16 category codes and precomputed inverse norms, and
+# a query is one matrix-vector product, one comparison and an argpartition.
+#
+# The index is loaded once per process and kept current from Product_Change_Log,
+# which trg_product_change_log fills on every insert, delete or feature update.
+import threading
+import time
+from datetime import timedelta
+import numpy as np
+from Database import config, pool
+from Database.fetch import tune_cursor, fetch_dataframe
+
+CATEGORY_WEIGHT = 1.0
+OVERLAP = timedelta(seconds=60)     # re-read recent changes in case a slower transaction committed late
+FULL_RELOAD_AFTER = 3600            # seconds without a refresh before the change log may have been purged
+
+LOAD_SQL = """
+    SELECT product_id, category, price, sales, rating
+    FROM Products
+    WHERE category IS NOT NULL AND price IS NOT NULL AND sales IS NOT NULL AND rating IS NOT NULL
+"""
+CHANGES_SQL = """
+    SELECT c.product_id, p.category, p.price, p.sales, p.rating
+    FROM (SELECT DISTINCT product_id FROM Product_Change_Log WHERE changed_at > :since) c
+    LEFT JOIN Products p ON p.product_id = c.product_id
+"""
+LOAD_DTYPES = {"PRODUCT_ID": "int64", "CATEGORY": "category", "PRICE": "float32", "SALES": "float32", "RATING": "float32"}
+
+
+class SimilarityIndex:
+    def __init__(self, product_ids, categories, features):
+        # features: (n, 3) price, sales, rating; categories: sequence of category names
+        product_ids = np.asarray(product_ids, dtype=np.int64)
+        features = np.asarray(features, dtype=np.float32)
+        self.mean = features.mean(axis=0) if len(features) else np.zeros(3, dtype=np.float32)
+        self.std = features.std(axis=0) if len(features) else np.ones(3, dtype=np.float32)
+        self.std[self.std == 0] = 1.0
+        self.category_codes = {}
+        self.size = 0
+        self.ids = np.empty(0, dtype=np.int64)
+        self.features = np.empty((0, 3), dtype=np.float32)
+        self.categories = np.empty(0, dtype=np.int16)
+        self.inv_norms = np.empty(0, dtype=np.float32)
+        self.row_of = np.full(0, -1, dtype=np.int32)     # product_id -> row, -1 when absent
+        self.upsert(product_ids, categories, features)
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(df["PRODUCT_ID"].to_numpy(), df["CATEGORY"].astype(str).to_numpy(),
+                   df[["PRICE", "SALES", "RATING"]].to_numpy(dtype=np.float32))
+
+    def _reserve(self, rows, max_id):
+        if rows > len(self.ids):
+            capacity = max(rows, 2 * len(self.ids), 1024)
+            for name, fill in (("ids", 0), ("categories", 0), ("inv_norms", 0)):
+                grown = np.full(capacity, fill, dtype=getattr(self, name).dtype)
+                grown[:self.size] = getattr(self, name)[:self.size]
+                setattr(self, name, grown)
+            grown = np.zeros((capacity, 3), dtype=np.float32)
+            grown[:self.size] = self.features[:self.size]
+            self.features = grown
+        if max_id >= len(self.row_of):
+            grown = np.full(max(max_id + 1, 2 * len(self.row_of)), -1, dtype=np.int32)
+            grown[:len(self.row_of)] = self.row_of
+            self.row_of = grown
+
+    def _code(self, category):
+        return self.category_codes.setdefault(category, len(self.category_codes))
+
+    def upsert(self, product_ids, categories, features):
+        if not len(product_ids):
+            return
+        product_ids = np.asarray(product_ids, dtype=np.int64)
+        self._reserve(self.size + len(product_ids), int(product_ids.max()))
+        rows = self.row_of[product_ids]
+        new = rows < 0
+        rows[new] = self.size + np.arange(int(new.sum()), dtype=np.int32)
+        self.size += int(new.sum())
+        self.row_of[product_ids] = rows
+
+        scaled = (np.asarray(features, dtype=np.float32) - self.mean) / self.std
+        self.ids[rows] = product_ids
+        self.features[rows] = scaled
+        self.categories[rows] = [self._code(c) for c in categories]
+        self.inv_norms[rows] = 1.0 / np.sqrt(np.einsum("ij,ij->i", scaled, scaled) + CATEGORY_WEIGHT ** 2)
+
+    def remove(self, product_ids):
+        # Moves the last row into each hole so the live rows stay contiguous
+        for product_id in product_ids:
+            if product_id >= len(self.row_of) or self.row_of[product_id] < 0:
+                continue
+            row, last = self.row_of[product_id], self.size - 1
+            if row != last:
+                for array in (self.ids, self.features, self.categories, self.inv_norms):
+                    array[row] = array[last]
+                self.row_of[self.ids[row]] = row
+            self.row_of[product_id] = -1
+            self.size -= 1
+
+    def __contains__(self, product_id):
+        return 0 <= product_id < len(self.row_of) and self.row_of[product_id] >= 0
+
+    def top_k(self, product_id, k=10):
+        # [(product_id, cosine similarity)] for the k most similar other products
+        if product_id not in self:
+            return []
+        n = self.size
+        row = self.row_of[product_id]
+        scores = self.features[:n] @ self.features[row]
+        scores += (self.categories[:n] == self.categories[row]) * np.float32(CATEGORY_WEIGHT ** 2)
+        scores *= self.inv_norms[:n]
+        scores *= self.inv_norms[row]
+        scores[row] = -np.inf
+
+        k = min(k, n - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(scores, n - k)[n - k:]
+        top = top[np.argsort(scores[top])[::-1]]
+        return list(zip(self.ids[top].tolist(), scores[top].tolist()))
+
+
+_index = None
+_since = None
+_refreshed_at = 0.0
+_lock = threading.Lock()
+
+
+def _load(cursor):
+    global _index, _since
+    cursor.execute("SELECT SYSTIMESTAMP FROM dual")
+    started = cursor.fetchone()[0]
+    tune_cursor(cursor, 10000)
+    cursor.execute(LOAD_SQL)
+    _index = SimilarityIndex.from_frame(fetch_dataframe(cursor, dtypes=LOAD_DTYPES))
+    _since = started - OVERLAP
+
+
+def _apply_changes(cursor):
+    global _since
+    cursor.execute("SELECT SYSTIMESTAMP FROM dual")
+    started = cursor.fetchone()[0]
+    tune_cursor(cursor)
+    cursor.execute(CHANGES_SQL, since=_since)
+    changed, gone = [], []
+    for product_id, category, price, sales, rating in cursor:
+        if None in (category, price, sales, rating):
+            gone.append(product_id)
+        else:
+            changed.append((product_id, category, price, sales, rating))
+    _index.remove(gone)
+    if changed:
+        ids, categories, *features = zip(*changed)
+        _index.upsert(ids, categories, np.column_stack(features))
+    _since = started - OVERLAP
+
+
+def get_index():
+    # Process-wide index; applies logged product changes at most every SIMILARITY_REFRESH_INTERVAL seconds
+    global _refreshed_at
+    with _lock:
+        now = time.monotonic()
+        if _index is not None and now - _refreshed_at < config.SIMILARITY_REFRESH_INTERVAL:
+            return _index
+        with pool.get_connection() as conn:
+            cursor = conn.cursor()
+            if _index is None or now - _refreshed_at > FULL_RELOAD_AFTER:
+                _load(cursor)
+            else:
+                _apply_changes(cursor)
+        _refreshed_at = now
+        return _index
+
+
+def similar_products(product_id, k=10):
+    index = get_index()
+    with _lock:
+        return index.top_k(product_id, k)
@@ -1,18 +1,40 @@
-import cx_Oracle
+import atexit
+import json
 import os
-from dotenv import load_dotenv
+import sys
+import threading
+import time
+from datetime import datetime
+import cx_Oracle
+from Database import config, pool
 
-load_dotenv()
+LOG_COMPACT_BYTES = 16 * 2**20      # rewrite the write-behind log once it grows past this
 
-# === DB connection setup ===
-dsn = cx_Oracle.makedsn("localhost", 1521, service_name="orcl")
-username = os.getenv("db_username")
-password = os.getenv("db_password")
+FLUSH_UPDATE_SQL = """
+    UPDATE Products SET quantity = quantity + :delta
+    WHERE product_id = :product_id AND stock_stripes = 0 AND quantity + :delta >= 0
+"""
+FLUSH_INSERT_SQL = """
+    INSERT INTO Transactions (transaction_id, transaction_type, quantity_change, transaction_date, product_id, user_id)
+    VALUES (:1, :2, :3, :4, :5, :6)
+"""
+NEXT_IDS_SQL = "SELECT TRANSACTIONS_SEQ.NEXTVAL FROM dual CONNECT BY LEVEL <= :1"
+STOCK_SQL = "SELECT product_id, quantity FROM Product_Stock WHERE product_id IN ({})"
+STOCK_ERRORS = (20001, 20002)     # ApplyStockChange: not enough stock, product not found
 
 def create_connection():
-    return cx_Oracle.connect(user=username, password=password, dsn=dsn)
+    return pool.get_connection()
 
 def call_conduct_transaction(product_name, quantity, user_id):
+    if config.TX_WRITE_BEHIND and quantity < 0:
+        try:
+            product_id = get_buffer().product_id(product_name)
+        except cx_Oracle.DatabaseError as e:
+            error, = e.args
+            return {"error": error.message}
+        if product_id is None:
+            return {"error": "Product not found."}
+        return buffered_transaction(product_id, quantity, user_id)
     try:
         with create_connection() as conn:
             cursor = conn.cursor()
@@ -28,3 +50,318 @@ def call_conduct_transaction(product_name, quantity, user_id):
     except cx_Oracle.DatabaseError as e:
         error, = e.args
         return {"error": error.message}
+
+
+def conduct_transaction_by_id(product_id, quantity, user_id):
+    # Single conditional UPDATE keyed by product_id; returns the stock left after the change
+    try:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            new_quantity = cursor.var(int)
+            cursor.callproc("ConductTransactionById", [product_id, quantity, user_id, new_quantity])
+            return {"success": "Transaction completed successfully.", "quantity": new_quantity.getvalue()}
+
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        return {"error": error.message}
+
+
+def checkout_cart(lines, user_id):
+    # lines: [(product_name, quantity)]. The whole cart goes to CheckoutCartByName as one JSON
+    # argument, so checkout is a single round trip and one commit; if any product is short,
+    # nothing is bought.
+    if not lines:
+        return {"error": "Cart is empty."}
+    try:
+        with create_connection() as conn:
+            cart = json.dumps([{"name": name, "quantity": quantity} for name, quantity in lines])
+            conn.cursor().callproc("CheckoutCartByName", [cart, user_id])
+            units = sum(quantity for _, quantity in lines)
+            return {"success": f"Checkout complete: {len(lines)} items, {units} units."}
+
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        return {"error": error.message}
+
+
+# === Write-behind mode ===
+# With tx_write_behind set, purchases are checked against an in-process stock ledger,
+# appended (and fsync'd) to a local log, and written to Oracle in micro-batches by a
+# background thread: one array UPDATE with a row per product, one array INSERT into
+# Transactions and one commit per batch.
+#
+# Log lines are JSON. Purchases are {"seq", "product_id", "quantity", "user_id", "at"};
+# a batch writes {"flushing": seq, "probe": transaction_id} before it commits and
+# {"flushed": seq} after. A batch whose "flushed" line is missing committed if and only
+# if its probe transaction exists, so a restart replays exactly the unwritten entries.
+#
+# One process owns a log file. Stock changed outside the buffer (restocks, the synchronous
+# path) is re-read at every flush; if it leaves a product short, that product's entries in
+# the batch are not applied and are appended to <log>.rejected instead. Striped products
+# (see ApplyStockChange) are read through Product_Stock and updated with one call each.
+class WriteBehindBuffer:
+    def __init__(self, log_path, flush_interval=config.TX_FLUSH_INTERVAL, flush_rows=config.TX_FLUSH_ROWS):
+        self.log_path = log_path
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.stock = {}          # product_id -> quantity in Oracle as of the last read or flush
+        self.read_at = {}        # product_id -> time.monotonic() of that read
+        self.delta = {}          # product_id -> net change of the entries not yet flushed
+        self.pending = []        # entries not yet flushed, in seq order
+        self.product_ids = {}    # product name -> product_id
+        self.flushes = 0
+        self.last_error = None
+        self._rejected_seqs = set()     # already in <log>.rejected, in case a failed commit retries them
+        self._log = None
+        self._lock = threading.Lock()           # ledger and log appends
+        self._flush_lock = threading.Lock()     # one flush (or stock read) at a time
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+        os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+        self.seq = self._recover()
+        self._rewrite()
+        if self.pending:
+            self.flush()
+        self._thread = threading.Thread(target=self._run, name="tx-write-behind", daemon=True)
+        self._thread.start()
+
+    def _recover(self):
+        # Loads the entries no committed batch covers; returns the last seq used
+        if not os.path.exists(self.log_path):
+            return 0
+        entries, flushed, probes = [], 0, {}
+        with open(self.log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue        # torn write from a crash; never acknowledged
+                if "flushed" in record:
+                    flushed = max(flushed, record["flushed"])
+                elif "flushing" in record:
+                    probes[record["flushing"]] = record["probe"]
+                else:
+                    entries.append(record)
+
+        unresolved = [seq for seq in probes if seq > flushed]
+        if unresolved:
+            with create_connection() as conn:
+                cursor = conn.cursor()
+                for seq in unresolved:
+                    cursor.execute("SELECT COUNT(*) FROM Transactions WHERE transaction_id = :1", [probes[seq]])
+                    if cursor.fetchone()[0]:
+                        flushed = max(flushed, seq)
+
+        self.pending = [e for e in entries if e["seq"] > flushed]
+        for e in self.pending:
+            self.delta[e["product_id"]] = self.delta.get(e["product_id"], 0) + e["quantity"]
+        if self.pending:
+            self._read_stock(list(self.delta))
+        return max([flushed] + [e["seq"] for e in entries])
+
+    def _rewrite(self):
+        # Replaces the log with just the unflushed entries; callers hold both locks or own the buffer
+        tmp = self.log_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for entry in self.pending:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if self._log is not None:
+            self._log.close()
+        os.replace(tmp, self.log_path)
+        self._log = open(self.log_path, "a", encoding="utf-8")
+
+    def _append(self, record):
+        self._log.write(json.dumps(record) + "\n")
+        self._log.flush()
+        os.fsync(self._log.fileno())
+
+    def _read_stock(self, product_ids):
+        binds = ", ".join(f":{i + 1}" for i in range(len(product_ids)))
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(STOCK_SQL.format(binds), product_ids)
+            stock = dict(cursor.fetchall())
+        now = time.monotonic()
+        with self._lock:
+            for product_id in product_ids:
+                if product_id in stock:
+                    self.stock[product_id] = stock[product_id]
+                    self.read_at[product_id] = now
+                else:
+                    self.stock.pop(product_id, None)
+
+    def refresh(self, product_id):
+        # Re-reads stock changed outside the buffer; waits for a running flush so the two cannot interleave
+        with self._flush_lock:
+            self._read_stock([product_id])
+
+    def product_id(self, name):
+        if name not in self.product_ids:
+            with create_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT MIN(product_id) FROM Products WHERE name = :1", [name])
+                product_id = cursor.fetchone()[0]
+            if product_id is None:
+                return None
+            self.product_ids[name] = product_id
+        return self.product_ids[name]
+
+    def _reserve(self, product_id, quantity, user_id):
+        # Caller holds _lock. None: unknown product; False: not enough stock
+        if product_id not in self.stock:
+            return None
+        if self.stock[product_id] + self.delta.get(product_id, 0) + quantity < 0:
+            return False
+        self.seq += 1
+        entry = {"seq": self.seq, "product_id": product_id, "quantity": quantity, "user_id": user_id,
+                 "at": datetime.now().isoformat(timespec="seconds")}
+        self._append(entry)
+        self.pending.append(entry)
+        self.delta[product_id] = self.delta.get(product_id, 0) + quantity
+        return True
+
+    def submit(self, product_id, quantity, user_id):
+        # The purchase is accepted once its log line is on disk
+        if product_id not in self.stock:
+            self.refresh(product_id)
+        with self._lock:
+            accepted = self._reserve(product_id, quantity, user_id)
+            stale = time.monotonic() - self.read_at.get(product_id, 0) > self.flush_interval
+        if accepted is False and stale:
+            self.refresh(product_id)    # a restock may have landed since the last read
+            with self._lock:
+                accepted = self._reserve(product_id, quantity, user_id)
+        if accepted and len(self.pending) >= self.flush_rows:
+            self._wake.set()
+        return accepted
+
+    def flush(self):
+        # Writes the pending entries in one transaction; returns (entries applied, entries rejected)
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self.pending)
+            if not batch:
+                return 0, []
+            batch_delta = {}
+            for e in batch:
+                batch_delta[e["product_id"]] = batch_delta.get(e["product_id"], 0) + e["quantity"]
+            # Rows are locked in product_id order, as CheckoutCart and other buffers do, so they cannot deadlock
+            batch_delta = dict(sorted(batch_delta.items()))
+
+            with create_connection() as conn:
+                cursor = conn.cursor()
+                cursor.executemany(FLUSH_UPDATE_SQL, [{"delta": d, "product_id": p} for p, d in batch_delta.items()],
+                                   arraydmlrowcounts=True)
+                short = set()
+                for product_id, count in zip(list(batch_delta), cursor.getarraydmlrowcounts()):
+                    if count == 0:
+                        # Striped, gone or short: ApplyStockChange handles the first and reports the others
+                        try:
+                            cursor.callproc("ApplyStockChange", [product_id, batch_delta[product_id], cursor.var(int)])
+                        except cx_Oracle.DatabaseError as e:
+                            error, = e.args
+                            if error.code not in STOCK_ERRORS:
+                                raise
+                            short.add(product_id)
+                applied = [e for e in batch if e["product_id"] not in short]
+                rejected = [e for e in batch if e["product_id"] in short]
+                if applied:
+                    cursor.execute(NEXT_IDS_SQL, [len(applied)])
+                    ids = [r[0] for r in cursor]
+                    with self._lock:
+                        self._append({"flushing": batch[-1]["seq"], "probe": ids[0]})
+                    cursor.executemany(FLUSH_INSERT_SQL, [
+                        (i, "Stock In" if e["quantity"] > 0 else "Stock Out", e["quantity"],
+                         datetime.fromisoformat(e["at"]), e["product_id"], e["user_id"])
+                        for i, e in zip(ids, applied)
+                    ])
+                binds = ", ".join(f":{i + 1}" for i in range(len(batch_delta)))
+                cursor.execute(STOCK_SQL.format(binds), list(batch_delta))
+                stock = dict(cursor.fetchall())
+                # On disk before the commit: once the probe row is committed, recovery treats the
+                # whole batch as flushed, rejected entries included
+                self._write_rejected(rejected)
+                conn.commit()
+
+            now = time.monotonic()
+            with self._lock:
+                self._append({"flushed": batch[-1]["seq"]})
+                del self.pending[:len(batch)]
+                for product_id, change in batch_delta.items():
+                    self.delta[product_id] -= change
+                    if not self.delta[product_id]:
+                        del self.delta[product_id]
+                    if product_id in stock:
+                        self.stock[product_id] = stock[product_id]
+                        self.read_at[product_id] = now
+                    else:
+                        self.stock.pop(product_id, None)
+                self.flushes += 1
+                if self._log.tell() > LOG_COMPACT_BYTES:
+                    self._rewrite()
+            return len(applied), rejected
+
+    def _write_rejected(self, rejected):
+        new = [e for e in rejected if e["seq"] not in self._rejected_seqs]
+        if not new:
+            return
+        with open(self.log_path + ".rejected", "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(e) + "\n" for e in new)
+            f.flush()
+            os.fsync(f.fileno())
+        self._rejected_seqs.update(e["seq"] for e in new)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                self.last_error = None
+            except cx_Oracle.DatabaseError as e:
+                error, = e.args
+                self.last_error = error.message     # entries stay pending and are retried
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        try:
+            self.flush()
+        except cx_Oracle.DatabaseError as e:
+            error, = e.args
+            # The entries stay in the log and are replayed by the next buffer opened on it
+            self.last_error = error.message
+            print(f"❌ Write-behind flush failed, {len(self.pending)} purchases left in {self.log_path}: {error.message}",
+                  file=sys.stderr)
+        self._log.close()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    # Process-wide buffer on tx_log_path; replays unflushed entries the first time it is used
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = WriteBehindBuffer(config.TX_LOG_PATH)
+            atexit.register(_buffer.close)
+        return _buffer
+
+
+def buffered_transaction(product_id, quantity, user_id, buffer=None):
+    try:
+        accepted = (buffer or get_buffer()).submit(product_id, quantity, user_id)
+    except cx_Oracle.DatabaseError as e:
+        error, = e.args
+        return {"error": error.message}
+    if accepted is None:
+        return {"error": "Product not found."}
+    if not accepted:
+        return {"error": "Not enough stock for transaction."}
+    return {"success": "Transaction accepted; it will be recorded shortly."}
@@ -1,17 +1,20 @@
 import cx_Oracle
-import os
-from dotenv import load_dotenv
+from Database import pool
+from Database.fetch import tune_cursor, fetch_dataframe
 
-load_dotenv()
-
-dsn = cx_Oracle.makedsn("localhost", 1521, service_name="orcl")
-username = os.getenv("db_username")
-password = os.getenv("db_password")
+TRANSACTION_DTYPES = {
+    "TRANSACTION_ID": "int32",
+    "PRODUCT_NAME": "category",
+    "TRANSACTION_TYPE": "category",
+    "QUANTITY_CHANGE": "int32",
+    "TRANSACTION_DATE": "datetime64[ns]",
+    "USER_NAME": "category",
+}
 
 def fetch_transactions(user_id=None, is_admin=False):
     try:
-        with cx_Oracle.connect(user=username, password=password, dsn=dsn) as conn:
-            cursor = conn.cursor()
+        with pool.get_connection() as conn:
+            cursor = tune_cursor(conn.cursor())
 
             if is_admin:
                 cursor.execute("""
@@ -33,9 +36,72 @@ def fetch_transactions(user_id=None, is_admin=False):
                     ORDER BY t.TRANSACTION_ID asc
                 """, {'user_id': user_id})
 
-            columns = [desc[0] for desc in cursor.description]
-            results = [dict(zip(columns, row)) for row in cursor.fetchall()]
-            return results
+            return fetch_dataframe(cursor, dtypes=TRANSACTION_DTYPES)
+
+    except cx_Oracle.DatabaseError as e:
+        return {"error": str(e)}
+
+
+PAGE_SIZE = 50
+
+
+def fetch_transactions_page(user_id=None, is_admin=False, after_id=None, page_size=PAGE_SIZE,
+                            start_date=None, end_date=None, product_name=None, user_name=None, transaction_type=None):
+    # Keyset pagination: each page starts after the last transaction_id of the previous one,
+    # so it is an index range scan that stops after page_size rows however deep the page is.
+    # Returns {"rows": DataFrame, "next_after_id": id or None}.
+    conditions = []
+    bind_vars = {'page_size': page_size + 1}
+
+    if not is_admin:
+        conditions.append("t.user_id = :user_id")
+        bind_vars['user_id'] = user_id
+    elif user_name:
+        conditions.append("t.user_id IN (SELECT user_id FROM User_Data WHERE name = :user_name)")
+        bind_vars['user_name'] = user_name
+    if after_id is not None:
+        conditions.append("t.transaction_id > :after_id")
+        bind_vars['after_id'] = after_id
+    if start_date:
+        conditions.append("t.transaction_date >= :start_date")
+        bind_vars['start_date'] = start_date
+    if end_date:
+        conditions.append("t.transaction_date < :end_date + 1")
+        bind_vars['end_date'] = end_date
+    if product_name:
+        conditions.append("t.product_id IN (SELECT product_id FROM Products WHERE name = :product_name)")
+        bind_vars['product_name'] = product_name
+    if transaction_type:
+        conditions.append("t.transaction_type = :transaction_type")
+        bind_vars['transaction_type'] = transaction_type
+
+    user_column = ", u.name AS user_name" if is_admin else ""
+    user_join = "JOIN User_Data u ON t.user_id = u.user_id" if is_admin else ""
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    query = f"""
+        SELECT t.transaction_id, p.name AS product_name, t.transaction_type, 
+               t.quantity_change, t.transaction_date{user_column}
+        FROM Transactions t
+        JOIN Products p ON t.product_id = p.product_id
+        {user_join}
+        {where}
+        ORDER BY t.transaction_id asc
+        FETCH FIRST :page_size ROWS ONLY
+    """
+
+    try:
+        with pool.get_connection() as conn:
+            cursor = tune_cursor(conn.cursor(), arraysize=page_size + 1)
+            cursor.execute(query, bind_vars)
+
+            df = fetch_dataframe(cursor, dtypes=TRANSACTION_DTYPES)
+            has_more = len(df) > page_size
+            df = df.iloc[:page_size]
+            return {
+                "rows": df,
+                "next_after_id": int(df["TRANSACTION_ID"].iloc[-1]) if has_more else None,
+            }
 
     except cx_Oracle.DatabaseError as e:
         return {"error": str(e)}
@@ -1,9 +1,8 @@
 import streamlit as st
 import cx_Oracle
 import bcrypt
-import os
-from dotenv import load_dotenv
-from Admin.Alerts import mark_alerts
+from Database import pool, catalog
+from Admin.Alerts import mark_alerts, alert_thresholds
 from Admin.Suppliers import supplier_data, supplier_groupby, supplier_loc
 from User.Products import prod_cluster
 from Admin.Clusters import view_cluster_data, update_product_cluster, cluster_analysis
@@ -14,14 +13,6 @@ from Admin.Products import add_products, update_products, delete_products
 from Admin.Users import view_and_del_acc
 from Admin.Alerts import view_alerts
 
-# Load environment variables
-load_dotenv()
-
-# === DB connection setup ===
-dsn = cx_Oracle.makedsn("localhost", 1521, service_name="orcl")
-username = os.getenv("db_username")
-password = os.getenv("db_password")
-
 
 # Streamlit session state for authentication
 if 'is_user' not in st.session_state:
@@ -35,7 +26,7 @@ if 'username' not in st.session_state:
 
 # Functions for authentication and database interaction
 def create_connection():
-    return cx_Oracle.connect(user=username, password=password, dsn=dsn)
+    return pool.get_connection()
 
 def hash_password(password):
     return bcrypt.hashpw(password.encode(), bcrypt.gensalt())
@@ -62,6 +53,57 @@ def add_user(cursor, name, role, hashed_pw):
         VALUES (:name, :role, :password)
     """, {'name': name, 'role': role, 'password': hashed_pw})
 
+# Formatting for the structured results returned by the data-access modules
+def supplier_lines(supplier):
+    return [
+        f"Supplier ID: {supplier.supplier_id}",
+        f"Name: {supplier.name}",
+        f"Location: {supplier.location or 'No location specified'}",
+        f"Contact Info: {supplier.contact_info or 'No phone number available'}",
+    ]
+
+def supplier_rows(suppliers):
+    return [{
+        "Supplier ID": s.supplier_id,
+        "Name": s.name,
+        "Location": s.location or "No location specified",
+        "Contact Info": s.contact_info or "No phone number available",
+    } for s in suppliers]
+
+def cluster_rows(clusters):
+    return [{
+        "Cluster ID": c.cluster_id,
+        "Avg Quantity": c.avg_quantity,
+        "Avg Price (₹)": c.avg_price,
+        "Avg Sales": c.avg_sales,
+        "Popularity Score (%)": c.avg_popularity_score * 100 if c.avg_popularity_score is not None else None,
+    } for c in clusters]
+
+SECTION_LABELS = {
+    "ITEM": "Item's cluster",
+    "SIMILAR": "Similar cluster",
+    "FALLBACK": "Fallback cluster -1",
+}
+
+RECOMMENDATION_SORTS = {
+    "Rating": "rating",
+    "Price (lowest first)": "price",
+    "Sales": "sales",
+    "Similarity to the item": "similarity",
+}
+
+def ranked_rows(items, sort):
+    return [{
+        "From": SECTION_LABELS.get(item.section, item.section),
+        "Cluster": item.cluster_id,
+        "Name": item.name,
+        "Price (₹)": item.price,
+        "Rating (%)": item.rating * 100 if item.rating is not None else None,
+        **({"Similarity": round(item.score, 3)} if sort == "similarity" else {"Sales": item.sales}),
+    } for item in items]
+
+AUTO_CLUSTER = "Auto"
+
 def change_password_section(current_user_id):
     with st.expander("🔐 Change Password"):
         current_password = st.text_input("Current Password", type="password", key="current_pass")
@@ -106,6 +148,146 @@ def change_password_section(current_user_id):
                 if 'conn' in locals():
                     conn.close()
 
+def transaction_history_section(product_names):
+    with st.expander("📜 View Transactions"):
+        is_admin = st.session_state['is_admin']
+        col1, col2 = st.columns(2)
+        start_date = col1.date_input("From", value=None, key="tx_start_date")
+        end_date = col2.date_input("To", value=None, key="tx_end_date")
+        col3, col4 = st.columns(2)
+        product_filter = col3.selectbox("Product", ["All"] + list(product_names), key="tx_product")
+        type_filter = col4.selectbox("Type", ["All", "Stock In", "Stock Out"], key="tx_type")
+        user_filter = st.text_input("User name (optional)", key="tx_user") if is_admin else None
+
+        filters = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "product_name": None if product_filter == "All" else product_filter,
+            "transaction_type": None if type_filter == "All" else type_filter,
+            "user_name": user_filter or None,
+        }
+
+        # Stack of page start keys; the last entry is the page being shown. Reset when filters change.
+        if st.session_state.get("tx_filters") != filters:
+            st.session_state["tx_filters"] = filters
+            st.session_state["tx_page_starts"] = [None]
+        page_starts = st.session_state["tx_page_starts"]
+
+        page = view.fetch_transactions_page(
+            user_id=st.session_state['user_id'],
+            is_admin=is_admin,
+            after_id=page_starts[-1],
+            **filters
+        )
+
+        if "error" in page:
+            st.error(page["error"])
+            return
+        if not page["rows"].empty:
+            st.dataframe(page["rows"])
+        else:
+            st.info("No transactions found.")
+
+        col_prev, col_page, col_next = st.columns([2, 6, 2])
+        col_page.caption(f"Page {len(page_starts)}")
+        if col_prev.button("⬅️ Previous", key="tx_prev", disabled=len(page_starts) == 1):
+            page_starts.pop()
+            st.rerun()
+        if col_next.button("Next ➡️", key="tx_next", disabled=page["next_after_id"] is None):
+            page_starts.append(page["next_after_id"])
+            st.rerun()
+
+def alert_queue_section():
+    shown = st.radio("Show", ["❗ Pending", "✅ Processed"], horizontal=True, key="alert_view")
+    processed = shown != "❗ Pending"
+
+    # Stack of page start keys, as in the transaction history; switching views starts over
+    if st.session_state.get("alert_shown") != processed:
+        st.session_state["alert_shown"] = processed
+        st.session_state["alert_page_starts"] = [None]
+    page_starts = st.session_state["alert_page_starts"]
+
+    page = view_alerts.fetch_alerts_page(processed=processed, after=page_starts[-1])
+    if "error" in page:
+        st.error(page["error"])
+        return
+    st.caption(f"{page['pending']} pending alerts")
+
+    rows = page["rows"]
+    table = rows[["PRODUCT_NAME", "ALERT_TYPE", "ALERT_DATE", "MESSAGE"]].copy()
+    table["ALERT_DATE"] = table["ALERT_DATE"].dt.date
+    if rows.empty:
+        st.success("No processed alerts." if processed else "All alerts are processed.")
+    elif processed:
+        st.dataframe(table, use_container_width=True, hide_index=True)
+    else:
+        table.insert(0, "DONE", False)
+        edited = st.data_editor(table, use_container_width=True, hide_index=True,
+                                disabled=["PRODUCT_NAME", "ALERT_TYPE", "ALERT_DATE", "MESSAGE"],
+                                key=f"alert_editor_{len(page_starts)}")
+        selected = rows[edited["DONE"].to_numpy()]
+        col_selected, col_page = st.columns(2)
+        acknowledge = None
+        if col_selected.button("Mark Selected Done", key="btn_alerts_selected", disabled=selected.empty):
+            acknowledge = selected
+        if col_page.button("Mark Page Done", key="btn_alerts_page"):
+            acknowledge = rows
+        if acknowledge is not None:
+            keys = [(int(product_id), alert_date.to_pydatetime())
+                    for product_id, alert_date in zip(acknowledge["PRODUCT_ID"], acknowledge["ALERT_DATE"])]
+            mark_alerts.mark_alerts_as_processed(keys)
+            st.rerun()
+
+    col_prev, col_page_no, col_next = st.columns([2, 6, 2])
+    col_page_no.caption(f"Page {len(page_starts)}")
+    if col_prev.button("⬅️ Previous", key="alerts_prev", disabled=len(page_starts) == 1):
+        page_starts.pop()
+        st.rerun()
+    if col_next.button("Next ➡️", key="alerts_next", disabled=page["next_after"] is None):
+        page_starts.append(page["next_after"])
+        st.rerun()
+
+def recommendation_section(product_names, category_names):
+    with st.expander("📦 Product Recommendations"):
+        with st.form("recommendation_form"):
+            category = st.selectbox("Enter Product Name or Category", product_names+category_names, key="user_category")
+            col1, col2 = st.columns([3, 1])
+            sort_label = col1.selectbox("Sort by", list(RECOMMENDATION_SORTS), key="user_recommendation_sort")
+            k = col2.number_input("Per page", min_value=5, max_value=prod_cluster.MAX_K, value=20, step=5,
+                                  key="user_recommendation_k")
+            submitted = st.form_submit_button("Recommend Items")
+
+        # Stack of page cursors, as in the transaction history; a new search starts over
+        if submitted and category:
+            st.session_state["rec_query"] = (category, RECOMMENDATION_SORTS[sort_label], int(k))
+            st.session_state["rec_cursors"] = [None]
+        if "rec_query" not in st.session_state:
+            return
+        category, sort, k = st.session_state["rec_query"]
+        cursors = st.session_state["rec_cursors"]
+
+        if sort == "similarity" and category not in product_names:
+            st.info("Pick a product name to sort by similarity.")
+            return
+        page = prod_cluster.get_ranked_recommendations(category, k=k, sort=sort, cursor=cursors[-1])
+        if "error" in page:
+            st.error(page["error"])
+            return
+        if page["items"]:
+            st.markdown(f"### 📋 Recommended Items for {category}:")
+            st.dataframe(ranked_rows(page["items"], sort), use_container_width=True)
+        else:
+            st.info("No recommendations found for that category.")
+
+        col_prev, col_page, col_next = st.columns([2, 6, 2])
+        col_page.caption(f"Page {len(cursors)}")
+        if col_prev.button("⬅️ Previous", key="rec_prev", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+        if col_next.button("Next ➡️", key="rec_next", disabled=page["next_cursor"] is None):
+            cursors.append(page["next_cursor"])
+            st.rerun()
+
 if not st.session_state['is_user'] and not st.session_state['is_admin']:
     st.title("🔐 Smart Inventory Management System")
     mode = st.radio("Choose Mode:", ["Login", "Signup"])
@@ -145,34 +327,14 @@ if not st.session_state['is_user'] and not st.session_state['is_admin']:
                         st.error("Incorrect password.")
                         
 
-def fetch_all_product_names():
-    with create_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM Products")
-        return [row[0] for row in cursor.fetchall()]
-    
-def fetch_all_categories():
-    with create_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT DISTINCT category FROM Products")
-        return [row[0] for row in cursor.fetchall()]
-    
-def fetch_all_cluster_ids():
-    with create_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT DISTINCT cluster_id FROM Products")
-        return [row[0] for row in cursor.fetchall()]
-    
-def fetch_all_suppliers():
-    with create_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM Suppliers")
-        return [row[0] for row in cursor.fetchall()]
-
-product_names = fetch_all_product_names()  
-category_names = fetch_all_categories()
-cluster_ids = fetch_all_cluster_ids()
-supplier_names = fetch_all_suppliers()
+# Selectbox lists are only needed once someone is logged in, so the login page does no queries.
+# They come from a process-wide snapshot that is reloaded only when the catalog changes.
+if st.session_state['is_admin'] or st.session_state['is_user']:
+    snapshot = catalog.get_snapshot()
+    product_names = snapshot.product_names
+    category_names = snapshot.category_names
+    cluster_ids = snapshot.cluster_ids
+    supplier_names = snapshot.supplier_names
 
 if st.session_state['is_admin']:
     st.title("🔐 Smart Inventory Management System")
@@ -180,7 +342,8 @@ if st.session_state['is_admin']:
 
     # Logout functionality
     if st.button("Logout"):
-        for key in ["is_user", "is_admin", "username", "role", "supplier_output"]:
+        for key in ["is_user", "is_admin", "username", "role", "supplier_output", "tx_filters", "tx_page_starts",
+                    "alert_shown", "alert_page_starts"]:
             if key in st.session_state:
                 del st.session_state[key]
         st.rerun()
@@ -195,9 +358,14 @@ if st.session_state['is_admin']:
         with supplier_tabs[0]:
             supplier_name = st.text_input("Enter Supplier Name", key="supplier_name")
             if st.button("Get Supplier Info", key="btn_supplier_info"):
-                output = supplier_data.fetch_supplier_info(supplier_name)
-                for line in output:
-                    st.text(line)
+                supplier = supplier_data.get_supplier_info(supplier_name)
+                if isinstance(supplier, dict):
+                    st.error(supplier["error"])
+                elif supplier is None:
+                    st.error(f'❌ Supplier "{supplier_name}" not found.')
+                else:
+                    for line in supplier_lines(supplier):
+                        st.text(line)
 
         with supplier_tabs[1]:
             if st.button("Show Grouped Supplier Counts", key="btn_grouped"):
@@ -209,9 +377,13 @@ if st.session_state['is_admin']:
             city = st.text_input("City (optional)", key="city_input")
             country = st.text_input("Country (optional)", key="country_input")
             if st.button("Search by Location", key="btn_search_location"):
-                data = supplier_loc.fetch_suppliers_by_location(city if city else None, country if country else None)
-                for line in data:
-                    st.text(line)
+                data = supplier_loc.get_suppliers_by_location(city if city else None, country if country else None)
+                if isinstance(data, dict):
+                    st.error(data["error"])
+                elif data:
+                    st.dataframe(supplier_rows(data), use_container_width=True)
+                else:
+                    st.info("No suppliers found for that location.")
 
 
         with supplier_tabs[3]:
@@ -259,15 +431,20 @@ if st.session_state['is_admin']:
             min_clusters = st.text_input("Minimum number of items", key="num_clusters")
 
             if st.button("Run Cluster Filter", key="btn_run_cluster_filter"):
-                results = cluster_analysis.filter_clusters(
+                results = cluster_analysis.get_filtered_clusters(
                     float(min_quantity) if min_quantity else None,
                     float(min_price) if min_price else None,
                     float(min_sales) if min_sales else None,
                     float(min_popularity)/100 if min_popularity else None,
                     float(min_clusters) if min_clusters else None
                 )
-                for line in results:
-                    st.text(line)
+                if isinstance(results, dict):
+                    st.error(results["error"])
+                elif results:
+                    st.markdown("📊 Matching Clusters:")
+                    st.dataframe(cluster_rows(results), use_container_width=True)
+                else:
+                    st.info("No clusters match these filters.")
 
         with cluster_tabs[1]:
             cluster_id = st.text_input("Enter Cluster ID", key="cluster_id")
@@ -307,6 +484,30 @@ if st.session_state['is_admin']:
                         st.success(result["success"])
                 else:
                     st.warning("Please enter both Product ID and New Cluster ID.")
+
+            st.markdown("### 📤 Bulk Reassignment")
+            reassign_file = st.file_uploader(
+                "CSV with product_id and new_cluster_id columns", type="csv", key="cluster_reassign_csv"
+            )
+            if st.button("Apply Reassignments", key="btn_bulk_reassign"):
+                if reassign_file is None:
+                    st.warning("Please upload a CSV file.")
+                else:
+                    try:
+                        pairs, bad_rows = update_product_cluster.read_reassignment_csv(reassign_file)
+                    except ValueError as e:
+                        st.error(f"❌ {e}")
+                    else:
+                        result = update_product_cluster.reassign_product_clusters(pairs, bad_rows)
+                        if "error" in result:
+                            st.error(result["error"])
+                        else:
+                            st.success(result["success"])
+                            if result["failures"]:
+                                st.dataframe([{
+                                    "Product ID": product_id, "New Cluster ID": new_cluster_id, "Reason": reason
+                                } for product_id, new_cluster_id, reason in result["failures"]],
+                                    use_container_width=True)
                     
 
 
@@ -354,12 +555,16 @@ if st.session_state['is_admin']:
             new_sales = st.number_input("Sales", min_value=0)
             new_rating = st.number_input("Rating")
             selected_supplier_create = st.selectbox("Supplier", supplier_names)
-            selected_cluster_create = st.selectbox("Cluster", cluster_ids)  
+            selected_cluster_create = st.selectbox(
+                "Cluster", (AUTO_CLUSTER,) + cluster_ids,
+                help="Auto places the product in the nearest cluster of the latest clustering run."
+            )
             
             if st.button("Add Product"):
                 supplier_id = add_products.get_supplier_id_from_name(selected_supplier_create)
                 if new_name and supplier_id and new_category:
-                    result = add_products.add_product(new_name, new_category, float(new_price), int(new_qty), int(new_sales), float(new_rating)/100, supplier_id, selected_cluster_create)
+                    result = add_products.add_product(new_name, new_category, float(new_price), int(new_qty), int(new_sales), float(new_rating)/100, supplier_id,
+                                                      None if selected_cluster_create == AUTO_CLUSTER else selected_cluster_create)
                     if "success" in result:
                         st.success(result["success"])
                     else:
@@ -399,6 +604,22 @@ if st.session_state['is_admin']:
                 except Exception as e:
                     st.error(str(e))
 
+            st.markdown("#### 🔥 Hot Product Stock")
+            stripe_id = st.text_input("Product ID", key="stripe_product_id")
+            stripes = st.number_input(
+                "Stock stripes", min_value=0, max_value=64, value=8, key="stripe_count",
+                help="Splits the stock across this many rows so concurrent buyers lock different ones. 0 turns it off."
+            )
+            if st.button("Apply Striping", key="btn_stripe_product"):
+                try:
+                    result = update_products.set_stock_stripes(int(stripe_id), int(stripes))
+                    if "success" in result:
+                        st.success(result["success"])
+                    else:
+                        st.error(result["error"])
+                except ValueError:
+                    st.error("Enter a numeric Product ID.")
+
 
         # --- ❌ Delete Product ---
         with product_tabs[4]:
@@ -432,49 +653,41 @@ if st.session_state['is_admin']:
         else:
             st.info("No non-admin users found.")
     
-    with st.expander("📜 View Transactions"):
-        transactions = view.fetch_transactions(
-            user_id=st.session_state['user_id'],
-            is_admin=st.session_state['is_admin']
-        )
-
-        if isinstance(transactions, dict) and "error" in transactions:
-            st.error(transactions["error"])
-        elif transactions:
-            st.dataframe(transactions)
-        else:
-            st.info("No transactions found.")
+    transaction_history_section(product_names)
     
     with st.expander("🔔 Alerts"):
-        df_alerts = view_alerts.fetch_inventory_alerts()
-
-        if df_alerts.empty:
-            st.success("No alerts to show.")
-        else:
-            df_display = df_alerts.copy()
-            df_display["ALERT_DATE"] = df_display["ALERT_DATE"].astype(str)
-            df_display["STATUS"] = df_display["IS_PROCESSED"].apply(lambda x: "✅ Processed" if x else "❗ Pending")
-            df_display = df_display[["PRODUCT_NAME", "ALERT_TYPE", "ALERT_DATE", "MESSAGE", "STATUS"]]
-
-            st.dataframe(df_display, use_container_width=True)
-
-            st.write("---")
-            st.subheader("Pending Alerts")
-            pending_alerts = df_alerts[df_alerts["IS_PROCESSED"] == 0]
-
-            if pending_alerts.empty:
-                st.success("All alerts are processed.")
-            else:
-                for i, row in pending_alerts.iterrows():
-                    col1, col2, col3 = st.columns([3, 6, 2])
-                    col1.markdown(f"**{row['PRODUCT_NAME']}** - {row['ALERT_TYPE']}")
-                    col2.markdown(f"_{row['MESSAGE']} (at {row['ALERT_DATE']})_")
-                    if col3.button("Mark Done", key=f"btn_{i}"):
-                        mark_alerts.mark_alert_as_processed(row["PRODUCT_ID"], row["ALERT_DATE"])
-                        st.success(f"Marked {row['PRODUCT_NAME']} as processed.")
-                        st.rerun()
-
+        alert_queue_section()
+
+        st.write("---")
+        st.subheader("Low-Stock Thresholds")
+        st.caption("A product's own threshold wins over its category's; products with neither alert at 50. "
+                   "Leave the threshold blank to clear it.")
+        col_target, col_value, col_apply = st.columns([4, 2, 2])
+        threshold_target = col_target.selectbox(
+            "Product or category", [f"Category: {c}" for c in category_names] + [f"Product: {p}" for p in product_names],
+            key="threshold_target"
+        )
+        threshold_value = col_value.text_input("Threshold", key="threshold_value")
+        if col_apply.button("Apply", key="btn_threshold"):
+            try:
+                threshold = int(threshold_value) if threshold_value.strip() else None
+                kind, name = threshold_target.split(": ", 1)
+                if kind == "Category":
+                    result = alert_thresholds.set_category_threshold(name, threshold)
+                else:
+                    result = alert_thresholds.set_product_threshold(name, threshold)
+                if "success" in result:
+                    st.success(result["success"])
+                else:
+                    st.error(result["error"])
+            except ValueError:
+                st.error("Threshold must be a whole number.")
+        category_thresholds = alert_thresholds.fetch_category_thresholds()
+        if category_thresholds:
+            st.dataframe([{"Category": c, "Threshold": t} for c, t in category_thresholds.items()], use_container_width=True)
 
+    with st.expander("🩺 Connection Pool"):
+        st.json(pool.pool_stats())
 
 
 elif st.session_state['is_user']:
@@ -483,51 +696,39 @@ elif st.session_state['is_user']:
 
     # Logout functionality
     if st.button("Logout"):
-        for key in ["is_user", "is_admin", "username", "role"]:
+        for key in ["is_user", "is_admin", "username", "role", "tx_filters", "tx_page_starts", "rec_query", "rec_cursors", "cart"]:
             if key in st.session_state:
                 del st.session_state[key]
         st.rerun()
 
     st.subheader("🧑‍💼 User Dashboard")
 
-    with st.expander("📦 Product Recommendations"):
-        with st.form("recommendation_form"):
-            category = st.selectbox("Enter Product Name or Category", product_names+category_names, key="user_category")
-            submitted = st.form_submit_button("Recommend Items")
-
-            if submitted and category:
-                results = prod_cluster.recommend_items_by_category(category)
-                if results:
-                    st.markdown("### 📋 Recommended Items:")
-                    for line in results:
-                        st.text(line)
-                else:
-                    st.info("No recommendations found for that category.")
+    recommendation_section(product_names, category_names)
     with st.expander("🛒 Buy Products"):
+        cart = st.session_state.setdefault("cart", [])
         with st.form("buy_product_form"):
             product_name = st.selectbox("Select Product", product_names, key="user_product_name")
             quantity = st.number_input("Quantity", min_value=1, key="user_quantity")
-            submitted = st.form_submit_button("Buy Product")
+            added = st.form_submit_button("Add to Cart")
 
-            if submitted and product_name and quantity:
-                result = conduct.call_conduct_transaction(product_name, -int(quantity), st.session_state["user_id"])
+            if added and product_name and quantity:
+                cart.append((product_name, int(quantity)))
+
+        if cart:
+            st.dataframe([{"Product": name, "Quantity": qty} for name, qty in cart], use_container_width=True)
+            col_buy, col_clear = st.columns(2)
+            if col_buy.button("Checkout", key="btn_checkout"):
+                result = conduct.checkout_cart(cart, st.session_state["user_id"])
                 if "error" in result:
                     st.error(result["error"])
                 else:
                     st.success(result["success"])
+                    cart.clear()
+            if col_clear.button("Clear Cart", key="btn_clear_cart"):
+                cart.clear()
+                st.rerun()
 
-    with st.expander("📜 View Transactions"):
-        transactions = view.fetch_transactions(
-            user_id=st.session_state['user_id'],
-            is_admin=st.session_state['is_admin']
-        )
-
-        if isinstance(transactions, dict) and "error" in transactions:
-            st.error(transactions["error"])
-        elif transactions:
-            st.dataframe(transactions)
-        else:
-            st.info("No transactions found.")
+    transaction_history_section(product_names)
 
     change_password_section(st.session_state["user_id"])
 